@@ -0,0 +1,84 @@
+"""
+/images 이미지 서빙 (main.py, app/main.py 공용)
+카탈로그 이미지는 적재 후 바뀌지 않으므로 파일 지문(경로·크기·수정 시각) 기반 강한 ETag, Last-Modified,
+1년 immutable Cache-Control을 붙이고, If-None-Match / If-Modified-Since가 맞으면 파일을 열지 않고 304를 돌려줍니다.
+Range 요청(부분 전송, If-Range)은 Starlette FileResponse가 처리합니다.
+"""
+import hashlib
+import os
+from email.utils import formatdate, parsedate_to_datetime
+
+from fastapi import APIRouter, Request, Response
+from fastapi.responses import FileResponse, JSONResponse
+
+from app.services.image_derivatives import derivative_key, get_derivative, parse_derivative_params, source_fingerprint
+from app.services.image_paths import resolve_served_image
+
+router = APIRouter()
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match 목록 중 하나가 etag와 같은지 (약한 비교: W/ 무시)."""
+    if if_none_match.strip() == "*":
+        return True
+    return etag in [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+
+
+def _not_modified(request: Request, etag: str, mtime: float) -> bool:
+    """If-None-Match 우선, 없으면 If-Modified-Since(초 단위)로 판단."""
+    inm = request.headers.get("if-none-match")
+    if inm is not None:
+        return _etag_matches(inm, etag)
+    ims = request.headers.get("if-modified-since")
+    if ims:
+        try:
+            return int(mtime) <= int(parsedate_to_datetime(ims).timestamp())
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+@router.get("/images/{file_path:path}")
+def serve_image(request: Request, file_path: str, w: int | None = None, fmt: str | None = None):
+    """
+    이미지 파일 서빙 (로컬 images/ 또는 국내 여행로그 데이터 photo 폴더). 경로는 미리 훑어 둔 파일명 인덱스에서 조회.
+    ?w=(160|320|480|960)&fmt=(webp|jpeg): 축소본/형식 변환본을 한 번 만들어 image_cache/에 두고 이후 재사용.
+    재요청 시 ETag/Last-Modified로 304, Range 요청은 206 부분 응답.
+    """
+    try:
+        width, fmt_key = parse_derivative_params(w, fmt)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"detail": str(e)})
+    resolved = resolve_served_image(file_path)
+    if not resolved:
+        return JSONResponse(status_code=404, content={"detail": "Not found"})
+    try:
+        st = os.stat(resolved)
+    except OSError:
+        return JSONResponse(status_code=404, content={"detail": "Not found"})
+
+    # 축소본 ETag는 캐시 키 그대로, 원본은 지문 해시 → 304일 때는 축소본 생성·파일 열기 모두 생략
+    if width or fmt_key:
+        tag = derivative_key(resolved, width, fmt_key, st)
+    else:
+        tag = hashlib.sha1(source_fingerprint(resolved, st).encode("utf-8")).hexdigest()
+    etag = f'"{tag[:24]}"'
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(st.st_mtime, usegmt=True),
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+    }
+    if _not_modified(request, etag, st.st_mtime):
+        return Response(status_code=304, headers=headers)
+
+    if width or fmt_key:
+        try:
+            path, mt = get_derivative(resolved, width, fmt_key, st)
+        except Exception as e:
+            print(f"이미지 변환 실패 ({file_path}): {e}")
+            return JSONResponse(status_code=422, content={"detail": "이미지를 변환할 수 없습니다."})
+        return FileResponse(path, media_type=mt, headers=headers)
+    mt = "image/png" if file_path.lower().endswith(".png") else "image/jpeg"
+    return FileResponse(resolved, media_type=mt, headers=headers, stat_result=st)
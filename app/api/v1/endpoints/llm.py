@@ -0,0 +1,19 @@
+"""
+LLM 게이트웨이 상태 (Gemini 모델별 서킷 브레이커·호출 한도, 분류 캐시·의미 캐시 적중률)
+"""
+from fastapi import APIRouter
+
+from app.services.classifier_cache import get_classifier_cache
+from app.services.llm_guard import metrics
+from app.services.semantic_cache import get_semantic_cache
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+def llm_metrics():
+    """
+    모델별 회로 상태(closed/open/half_open), 최근 오류율, 남은 토큰·동시 호출 수, 통과/거절/실패 누적 건수,
+    여행 분류 캐시 적중률(메모리/디스크 계층별, 의미 캐시).
+    """
+    return {**metrics(), "classifier_cache": get_classifier_cache().stats(), "semantic_cache": get_semantic_cache().stats()}
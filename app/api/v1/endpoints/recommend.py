@@ -1,37 +1,226 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Form, Request
+from typing import List, Optional
 
-from app.schemas.recommend import RecommendAnalyzeResponse
-from app.services.recommend_service import recommend_service
+from fastapi import APIRouter, UploadFile, File, HTTPException, Form, Query, Request, Response
+from fastapi.responses import JSONResponse
+
+from app.schemas.recommend import RecommendAnalyzeResponse, RecommendSessionNextRequest
+from app.services.image_derivatives import thumbnail_query
+from app.services.recommend_service import MAX_QUERY_IMAGES, recommend_service
 
 router = APIRouter()
 
 
 def _ensure_image_url(result: dict, base_url: str) -> dict:
-    """result에 image_url 없으면 base_url + /images/ + image_file 로 채움."""
+    """
+    result에 image_url 없으면 base_url + /images/ + image_file 로 채우고, 같은 경로의 축소본 URL을 thumbnail_url로.
+    DB image_url(외부 URL)이 있으면 서버에서 줄일 수 없으므로 thumbnail_url은 그 URL 그대로.
+    """
     if result.get("image_url"):
+        result.setdefault("thumbnail_url", result["image_url"])
         return result
     base = base_url.rstrip("/")
     result["image_url"] = f"{base}/images/{result.get('image_file', '')}"
+    result["thumbnail_url"] = result["image_url"] + thumbnail_query()
     return result
 
 
+def _parse_bbox(bbox: str):
+    """'min_lat,min_lng,max_lat,max_lng' 문자열 → 튜플. 비어 있으면 None."""
+    if not (bbox or "").strip():
+        return None
+    try:
+        values = tuple(float(v) for v in bbox.split(","))
+    except ValueError:
+        values = ()
+    if len(values) != 4:
+        raise HTTPException(status_code=400, detail="bbox는 'min_lat,min_lng,max_lat,max_lng' 형식이어야 합니다.")
+    return values
+
+
+def _parse_csv(value: str) -> list[str]:
+    """'a,b' → ['a', 'b'] (빈 항목 제외)"""
+    return [v.strip() for v in (value or "").split(",") if v.strip()]
+
+
 @router.post("/analyze", response_model=RecommendAnalyzeResponse)
 async def analyze_travel_image(
     request: Request,
     file: UploadFile = File(...),
     preference: str = Form(default=""),
+    lat: Optional[float] = Form(default=None),
+    lng: Optional[float] = Form(default=None),
+    radius_km: Optional[float] = Form(default=None),
+    bbox: str = Form(default=""),
+    use_exif_gps: bool = Form(default=False),
+    visit_area_type: str = Form(default=""),
+    season: str = Form(default=""),
+    place_class: str = Form(default=""),
 ):
     """
     사용자가 올린 사진을 받아 추천 서비스를 실행합니다.
     성공 시: success, count, results[] (place_name, address, score, image_file, image_url, guide)
     이미지는 image_url(전체 URL)로 사용.
+    위치 필터(선택): lat/lng(+radius_km) 또는 bbox, use_exif_gps=true면 사진 EXIF GPS 기준 반경 검색.
+    패싯 필터(선택, 쉼표 구분): visit_area_type(유형코드), season(spring|summer|autumn|winter), place_class(beach|restaurant|other).
     """
+    if (lat is None) != (lng is None):
+        raise HTTPException(status_code=400, detail="lat, lng는 함께 지정해야 합니다.")
+    bbox_values = _parse_bbox(bbox)
+    facets = {
+        "visit_area_type": _parse_csv(visit_area_type),
+        "season": _parse_csv(season),
+        "place_class": _parse_csv(place_class),
+    }
     try:
         contents = await file.read()
-        result = recommend_service.analyze_image(contents, preference=preference or "")
+        result = recommend_service.analyze_image(
+            contents,
+            preference=preference or "",
+            lat=lat,
+            lng=lng,
+            radius_km=radius_km,
+            bbox=bbox_values,
+            use_exif_gps=use_exif_gps,
+            facets=facets,
+        )
         if result.get("results"):
             base_url = str(request.base_url)
             result["results"] = [_ensure_image_url(r, base_url) for r in result["results"]]
         return RecommendAnalyzeResponse(**result)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/analyze-multi", response_model=RecommendAnalyzeResponse)
+async def analyze_travel_images(
+    request: Request,
+    files: List[UploadFile] = File(...),
+    preference: str = Form(default=""),
+    fusion: str = Form(default="mean"),
+    lat: Optional[float] = Form(default=None),
+    lng: Optional[float] = Form(default=None),
+    radius_km: Optional[float] = Form(default=None),
+    bbox: str = Form(default=""),
+    use_exif_gps: bool = Form(default=False),
+    visit_area_type: str = Form(default=""),
+    season: str = Form(default=""),
+    place_class: str = Form(default=""),
+):
+    """
+    참고 사진 여러 장(files, 최대 10장)으로 "이런 분위기의 장소"를 추천합니다.
+    fusion=mean: 사진 임베딩 평균 하나로 검색 / fusion=max: 사진별 유사도 중 최댓값 기준.
+    응답 형식과 위치·패싯 필터, session_id 이어보기는 /analyze 와 동일합니다.
+    """
+    # 장수 초과는 파일을 읽기 전에 거절 (업로드 전체를 메모리에 올리지 않음)
+    if len(files) > MAX_QUERY_IMAGES:
+        raise HTTPException(status_code=400, detail=f"사진은 최대 {MAX_QUERY_IMAGES}장까지 올릴 수 있습니다.")
+    if (lat is None) != (lng is None):
+        raise HTTPException(status_code=400, detail="lat, lng는 함께 지정해야 합니다.")
+    bbox_values = _parse_bbox(bbox)
+    facets = {
+        "visit_area_type": _parse_csv(visit_area_type),
+        "season": _parse_csv(season),
+        "place_class": _parse_csv(place_class),
+    }
+    try:
+        contents = [await f.read() for f in files]
+        result = recommend_service.analyze_images(
+            contents,
+            preference=preference or "",
+            fusion=fusion,
+            lat=lat,
+            lng=lng,
+            radius_km=radius_km,
+            bbox=bbox_values,
+            use_exif_gps=use_exif_gps,
+            facets=facets,
+        )
+        if result.get("results"):
+            base_url = str(request.base_url)
+            result["results"] = [_ensure_image_url(r, base_url) for r in result["results"]]
+        return RecommendAnalyzeResponse(**result)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/sessions/{session_id}/next", response_model=RecommendAnalyzeResponse)
+async def next_session_results(request: Request, session_id: str, body: RecommendSessionNextRequest):
+    """
+    /analyze 응답의 session_id로 다음 결과를 받습니다. 사진 재업로드·재분석 없이
+    다음 N개, 장소 제외(exclude_visit_area_ids), 취향 문구 보정(preference_text)을 지원합니다.
+    """
+    result = recommend_service.next_results(
+        session_id,
+        limit=body.limit,
+        exclude_visit_area_ids=body.exclude_visit_area_ids,
+        preference_text=body.preference_text,
+        preference_weight=body.preference_weight,
+        reset=body.reset,
+    )
+    if result.get("session_id") is None:
+        raise HTTPException(status_code=404, detail=result.get("message"))
+    if result.get("results"):
+        base_url = str(request.base_url)
+        result["results"] = [_ensure_image_url(r, base_url) for r in result["results"]]
+    return RecommendAnalyzeResponse(**result)
+
+
+@router.get("/facets")
+def get_facets():
+    """이미지 검색 패싯 필터 옵션 (패싯별 값 → 이미지 수)"""
+    return {"facets": recommend_service.get_facets()}
+
+
+@router.get("/places/{visit_area_id}")
+def place_detail(request: Request, visit_area_id: str):
+    """
+    "상세 정보 보기": 장소별 사진 수, 평균 만족도, 체류 시간 중앙값, 재방문 비율, 대표 사진.
+    카탈로그 로드 시 미리 집계해 둔 값을 반환하며, If-None-Match가 ETag와 같으면 304(본문 없음)를 반환합니다.
+    """
+    found = recommend_service.place_detail(visit_area_id)
+    if found is None:
+        raise HTTPException(status_code=404, detail="장소 정보가 없습니다.")
+    detail, etag = found
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [t.strip().removeprefix("W/") for t in if_none_match.split(",")] or if_none_match.strip() == "*":
+        return Response(status_code=304, headers=headers)
+    base_url = str(request.base_url)
+    body = dict(detail, photos=[_ensure_image_url(dict(p), base_url) for p in detail["photos"]])
+    return JSONResponse(content=body, headers=headers)
+
+
+@router.get("/places/{visit_area_id}/similar", response_model=RecommendAnalyzeResponse)
+def similar_places(
+    request: Request,
+    visit_area_id: str,
+    limit: int = Query(default=10, ge=1, le=50),
+    exclude: str = Query(default="", description="제외할 visit_area_id (쉼표 구분)"),
+):
+    """
+    "비슷한 스타일 더 추천받기": 결과 카드의 visit_area_id와 비슷한 장소를 반환합니다.
+    서버 시작 시 미리 계산한 장소 이웃 목록 조회라 사진 업로드/벡터 검색이 없습니다.
+    """
+    result = recommend_service.similar_places(visit_area_id, limit=limit, exclude_visit_area_ids=_parse_csv(exclude))
+    if not result.get("success") and result.get("message"):
+        raise HTTPException(status_code=404, detail=result["message"])
+    if result.get("results"):
+        base_url = str(request.base_url)
+        result["results"] = [_ensure_image_url(r, base_url) for r in result["results"]]
+    return RecommendAnalyzeResponse(**result)
+
+
+@router.get("/map/clusters")
+def map_clusters(
+    bbox: str = Query(..., description="'min_lat,min_lng,max_lat,max_lng'"),
+    zoom: int = Query(..., ge=0, le=22),
+    limit: Optional[int] = Query(default=None, ge=1, le=1000),
+):
+    """
+    "지도에서 위치 확인하기": 화면 영역(bbox)과 줌 단계의 장소 마커/클러스터를 반환합니다.
+    서버 시작 시 줌 단계별로 미리 묶어 둔 클러스터를 영역으로 잘라 주므로 화면당 마커 수가 제한됩니다.
+    클러스터 마커를 누르면 expansion_zoom으로 확대하면 펼쳐집니다.
+    """
+    parsed = _parse_bbox(bbox)
+    if parsed is None:
+        raise HTTPException(status_code=400, detail="bbox는 'min_lat,min_lng,max_lat,max_lng' 형식이어야 합니다.")
+    return recommend_service.map_clusters(zoom, parsed, limit=limit)
@@ -2,9 +2,11 @@
 여행 추천 그래프 API 엔드포인트
 """
 from fastapi import APIRouter, HTTPException, Depends
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
+from app.core.config import settings
 from app.graph.service import travel_graph_service
+from app.services.itinerary import plan_itinerary
 
 router = APIRouter()
 
@@ -27,6 +29,7 @@ class TravelResponse(BaseModel):
     when_info: Optional[Dict[str, Any]] = None
     conversation_stage: Optional[str] = None
     recommendations: List[dict] = []
+    itinerary: Optional[Dict[str, Any]] = None  # 일정 만들기(plan_trip) 결과
     clarifying_question: Optional[str] = None
     post_actions: List[str] = []
     favorite_items: List[dict] = []
@@ -35,6 +38,23 @@ class TravelResponse(BaseModel):
     error: Optional[str] = None
 
 
+class PlanPlace(BaseModel):
+    """일정에 넣을 후보 장소 (앞쪽일수록 우선, 첫 장소에서 출발)"""
+    name: str
+    lat: Optional[float] = None  # 위도 (Y_COORD)
+    lng: Optional[float] = None  # 경도 (X_COORD)
+    residence_time_min: Optional[float] = None  # 체류 시간(분), 없으면 60분
+    visit_area_id: Optional[str] = None
+
+
+class PlanTripRequest(BaseModel):
+    """일정 만들기 요청"""
+    places: List[PlanPlace]
+    days: int = Field(default=1, ge=1, le=14)
+    day_minutes: Optional[float] = None  # 하루 가용 시간(분), 없으면 설정값
+    speed_kmh: float = 30.0  # 평균 이동 속도
+
+
 @router.post("/travel", response_model=TravelResponse)
 async def process_travel_request(request: TravelRequest):
     """
@@ -61,6 +81,21 @@ async def process_travel_request(request: TravelRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/travel/plan")
+def plan_trip(request: PlanTripRequest):
+    """
+    후보 장소 목록으로 날짜별 동선을 만듭니다. (거리 행렬 + 최근접 이웃 + 2-opt)
+    ITINERARY_DEADLINE_MS 안에 반환하며, 최적화가 마감 전에 끝나지 않으면 optimized=false.
+    """
+    return plan_itinerary(
+        [p.model_dump(exclude_none=True) for p in request.places],
+        days=request.days,
+        day_minutes=request.day_minutes or settings.ITINERARY_DAY_MINUTES,
+        speed_kmh=request.speed_kmh,
+        deadline_ms=settings.ITINERARY_DEADLINE_MS,
+    )
+
+
 @router.get("/travel/graph")
 async def get_graph_structure():
     """
@@ -25,7 +25,7 @@ async def analyze_travel_type(request: InterestRequest):
         raise HTTPException(status_code=400, detail="관심사는 정확히 3개 선택해야 합니다.")
 
     try:
-        result = analyze_interests(request.interests)
+        result = await analyze_interests(request.interests)
         return {"success": True, "analysis": result}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -13,6 +13,48 @@ class Settings(BaseSettings):
     # 타임아웃 (초). LLM·그래프 호출이 이 시간을 넘기면 중단하고 에러 표출
     LLM_TIMEOUT_SEC: int = 25
     GRAPH_TIMEOUT_SEC: int = 60
+    # LLM 게이트웨이(app/services/llm_service.py): 호출부별 타임아웃(초, 없으면 LLM_TIMEOUT_SEC), 커넥션 풀 크기
+    LLM_SITE_TIMEOUTS: dict = {
+        "travel_classifier": 15,
+        "clarifying": 15,
+        "travel_style": 10,
+        "recommend_guide": 25,
+        "image_caption": 20,
+    }
+    LLM_POOL_SIZE: int = 20
+    # Gemini 모델별 서킷 브레이커: 최근 WINDOW 동안 MIN_CALLS건 이상·오류율(429/5xx/타임아웃) ERROR_RATE 이상이면 COOLDOWN 동안 바로 fallback
+    LLM_BREAKER_WINDOW_SEC: float = 30.0
+    LLM_BREAKER_MIN_CALLS: int = 5
+    LLM_BREAKER_ERROR_RATE: float = 0.5
+    LLM_BREAKER_COOLDOWN_SEC: float = 30.0
+    # 모델별 입장 제어: 토큰 버킷(초당 RATE, 최대 BURST), 동시 호출 수. 넘으면 기다리지 않고 fallback
+    LLM_RATE_PER_SEC: float = 5.0
+    LLM_RATE_BURST: float = 10.0
+    LLM_MAX_CONCURRENCY: int = 8
+    # 여행 스타일 분석: 모델 헤징 지연(초), 전체 마감(초). 마감 안에 응답 없으면 키워드 기반 fallback
+    TRAVEL_STYLE_HEDGE_DELAY_SEC: float = 2.0
+    TRAVEL_STYLE_DEADLINE_SEC: float = 12.0
+    # 여행 스타일 사전 계산 테이블 (scripts/precompute_travel_styles.py). 비우면 embedding_cache/travel_style_table.json
+    TRAVEL_STYLE_TABLE_PATH: str = ""
+    TRAVEL_STYLE_TABLE_REFRESH_SEC: float = 60.0
+    # 테이블에 없는 조합의 실시간 결과 보관 수 (INTEREST_OPTIONS 키워드 조합만, LRU)
+    TRAVEL_STYLE_LIVE_MAX: int = 2000
+    # 여행 분류 노드 결과 캐시: 메모리 LRU 크기, TTL(초), LLM 실패 시 만료 항목 사용 한도(초), sqlite 디스크 계층 사용 여부
+    CLASSIFIER_CACHE_MAX: int = 2000
+    CLASSIFIER_CACHE_TTL_SEC: float = 86400.0
+    CLASSIFIER_CACHE_STALE_SEC: float = 604800.0
+    CLASSIFIER_CACHE_DISK: bool = True
+    # 분류 의미 캐시 (all-MiniLM-L6-v2 임베딩 유사도). 임계값은 scripts/eval_semantic_cache.py 결과로 조정
+    # 적중해도 발화의 계절/교통/예산/who/why 키워드와 어긋나면 버리고 LLM 호출 (nodes._semantic_hit_conflicts)
+    SEMANTIC_CACHE_ENABLED: bool = True
+    SEMANTIC_CACHE_THRESHOLD: float = 0.9
+    SEMANTIC_CACHE_MAX: int = 5000
+    # 로컬 분류기(embedding_cache/local_classifier.npz) 확신도가 이 값 이상이면 LLM 호출 생략
+    CLASSIFIER_LOCAL_THRESHOLD: float = 0.85
+
+    # 일정 만들기(plan_trip): 동선 최적화 마감 시간(ms), 하루 가용 시간(분)
+    ITINERARY_DEADLINE_MS: int = 300
+    ITINERARY_DAY_MINUTES: int = 480
     
     # 이미지 추천 전용 DB (도커 MariaDB 3306). 없으면 CSV/이미지 폴더 사용
     MARIADB_HOST: Optional[str] = None
@@ -20,7 +62,39 @@ class Settings(BaseSettings):
     MARIADB_USER: str = "root"
     MARIADB_PASSWORD: str = "1234"
     MARIADB_DATABASE: str = "travel"
-    
+
+    # 이미지 추천 위치 필터. 반경 미지정 시 기본 반경(km), 격자 인덱스 셀 크기(도)
+    GEO_DEFAULT_RADIUS_KM: float = 20.0
+    GEO_GRID_CELL_DEG: float = 0.05
+
+    # 이미지 검색 세션 (재업로드 없이 다음 페이지/장소 제외/취향 보정). 유효 시간(초), 최대 세션 수, 세션당 랭킹 후보 수
+    SEARCH_SESSION_TTL_SEC: int = 600
+    SEARCH_SESSION_MAX: int = 500
+    SEARCH_SESSION_CANDIDATES: int = 200
+
+    # 이미지 추천 검색 방식. two_stage: 장소 중심 벡터로 상위 장소를 고른 뒤 그 장소 사진만 재점수 / flat: 사진 전체 스캔
+    RECOMMEND_RETRIEVAL_MODE: str = "two_stage"
+    RECOMMEND_COARSE_PLACES: int = 100
+    RECOMMEND_COARSE_MEDOIDS: bool = False  # 장소 점수에 중심에 가장 가까운 실제 사진(medoid) 유사도도 함께 사용
+    # "비슷한 스타일 더 추천받기": 장소별로 미리 계산해 두는 비슷한 장소 수
+    PLACE_KNN_K: int = 20
+    # 압축 임베딩 계층: ""(사용 안 함) | pca | int8 | pca_int8. 1차 스캔 후 상위 RECOMMEND_RERANK_N개만 원본 벡터로 재점수
+    RECOMMEND_COMPRESSION: str = ""
+    RECOMMEND_PCA_DIM: int = 128
+    RECOMMEND_RERANK_N: int = 200
+    # embedding_cache/dedup.json(scripts/collapse_near_duplicates.py)이 있으면 근접 중복 묶음의 대표 사진만 검색
+    NEAR_DUP_COLLAPSE: bool = True
+    # "지도에서 위치 확인하기" 마커 클러스터: 클러스터 반경(px), 클러스터를 만드는 최대 줌(초과 시 개별 장소), 응답 최대 마커 수
+    MAP_CLUSTER_RADIUS_PX: int = 60
+    MAP_CLUSTER_MAX_ZOOM: int = 16
+    MAP_MAX_MARKERS: int = 300
+    # 이미지 파일 경로 인덱스: 인덱스에 없는 파일 요청 시 폴더를 다시 훑는 최소 간격(초)
+    IMAGE_INDEX_REFRESH_SEC: int = 60
+    # /images 축소본(?w=&fmt=) 디스크 캐시 위치(빈 값이면 backend-fastapi/image_cache), 검색 결과 thumbnail_url 크기·형식
+    IMAGE_DERIVATIVE_CACHE_DIR: str = ""
+    IMAGE_THUMBNAIL_WIDTH: int = 480
+    IMAGE_THUMBNAIL_FORMAT: str = "webp"
+
     class Config:
         case_sensitive = True
         env_file = ".env"
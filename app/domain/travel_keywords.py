@@ -0,0 +1,78 @@
+"""
+여행 챗봇 키워드 사전 (단일 출처)
+intent_classifier_node, travel_info_extractor_node, _fallback_classify_travel이 쓰는 슬롯별 키워드 표.
+슬롯마다 (값, 키워드 목록)을 우선순위 순으로 둡니다 — 여러 값이 걸리면 앞의 값이 이김.
+app/services/keyword_matcher.py가 이 표 전체(+ place.csv 시/군/구 지명)를 하나의 매처로 컴파일합니다.
+"""
+
+# 의도 (기본값: recommend_place)
+INTENT_KEYWORDS = [
+    ("recommend_place", ["여행지", "관광지", "가볼만한", "추천", "어디"]),
+    ("recommend_accommodation", ["숙소", "호텔", "펜션", "게스트하우스", "예약", "잠자리"]),
+    ("add_favorite", ["찜", "저장", "즐겨찾기", "북마크"]),
+    ("show_favorites", ["찜 목록", "저장한", "즐겨찾기 목록", "찜 보기"]),
+    ("plan_trip", ["일정", "계획", "여행 계획", "스케줄"]),
+]
+
+# 지역 (기본 도시 — place.csv 주소의 시/군/구가 뒤에 추가됨)
+REGION_KEYWORDS = [(r, [r]) for r in ["부산", "제주", "서울", "경주", "강릉", "여수", "전주", "대구", "인천"]]
+
+# 테마 (filters["theme"], 걸린 것 모두)
+THEME_KEYWORDS = [
+    ("바다", ["바다", "해변", "해수욕장", "해안"]),
+    ("감성", ["감성", "로맨틱", "분위기"]),
+    ("힐링", ["힐링", "휴식", "여유"]),
+    ("커플", ["커플", "연인", "데이트"]),
+    ("가족", ["가족", "아이", "어린이"]),
+    ("맛집", ["맛집", "음식", "식당"]),
+    ("야경", ["야경", "밤"]),
+]
+
+# 인원 (filters["people"])
+PEOPLE_KEYWORDS = [
+    ("1명", ["1명", "혼자"]),
+    ("2명", ["2명", "커플", "둘이"]),
+    ("가족", ["가족", "아이"]),
+]
+
+# Who / Why / When / Constraints (LLM 분류 fallback)
+WHO_KEYWORDS = [
+    ("family_with_kids", ["아이", "유모차", "키즈", "가족"]),
+    ("couple", ["커플", "연인", "둘이", "데이트", "신혼"]),
+    ("parents_trip", ["부모님", "효도"]),
+    ("solo", ["나홀", "혼자", "혼밥", "1인"]),
+]
+WHY_KEYWORDS = [
+    ("relaxation", ["힐링", "휴식", "휴양", "감성"]),
+    ("activity", ["서핑", "등산", "체험"]),
+    ("culture", ["유적", "미술관", "문화"]),
+    ("food", ["맛집", "미식", "로컬", "카페"]),
+]
+SEASON_KEYWORDS = [
+    ("spring", ["봄", "벚꽃"]),
+    ("summer", ["여름", "해수욕장"]),
+    ("autumn", ["가을", "단풍"]),
+    ("winter", ["겨울", "눈꽃"]),
+]
+TRANSPORT_KEYWORDS = [
+    ("car", ["자가용", "주차"]),
+    ("public", ["대중교통", "역세권"]),
+]
+# 예산: constraints.budget(value/luxury)과 filters["budget"](저렴/고급)이 같은 표를 씀
+BUDGET_KEYWORDS = [
+    ("value", ["저렴", "가성비", "싼", "경제적"]),
+    ("luxury", ["럭셔리", "고급", "비싼"]),
+]
+BUDGET_LABELS = {"value": "저렴", "luxury": "고급"}
+
+SLOT_TABLES = {
+    "intent": INTENT_KEYWORDS,
+    "region": REGION_KEYWORDS,
+    "theme": THEME_KEYWORDS,
+    "people": PEOPLE_KEYWORDS,
+    "who": WHO_KEYWORDS,
+    "why": WHY_KEYWORDS,
+    "season": SEASON_KEYWORDS,
+    "transport": TRANSPORT_KEYWORDS,
+    "budget": BUDGET_KEYWORDS,
+}
@@ -8,32 +8,36 @@ from app.graph.nodes import (
     intent_classifier_node,
     travel_classifier_llm_node,
     travel_info_extractor_node,
+    info_merge_node,
+    speculative_retrieval_node,
     missing_info_check_node,
     clarifying_question_node,
     retrieval_node,
     recommendation_node,
+    plan_trip_node,
     post_action_node,
     add_favorite_node,
     favorite_list_node
 )
 
 
-def route_intent(state: TravelState) -> str:
+# 여행지 추천/일정 Flow 시작 시 동시에 실행할 분기 (info_merge에서 합류)
+TRAVEL_FLOW_BRANCHES = ["travel_classifier_llm", "info_extractor", "speculative_retrieval"]
+
+
+def route_intent(state: TravelState) -> list:
     """
     Intent에 따라 다음 노드로 라우팅합니다.
+    여행지/숙소 추천과 일정 만들기(후보 검색까지는 같은 플로우)는 LLM 분류·규칙 추출·추측 검색을 병렬로 시작합니다.
     """
     intent = state.get("intent")
     
-    if intent == "recommend_place" or intent == "recommend_accommodation":
-        return "travel_flow"
-    elif intent == "add_favorite":
-        return "add_favorite"
+    if intent == "add_favorite":
+        return ["add_favorite"]
     elif intent == "show_favorites":
-        return "show_favorites"
-    elif intent == "plan_trip":
-        return "plan_trip"
+        return ["show_favorites"]
     else:
-        return "travel_flow"  # 기본값
+        return TRAVEL_FLOW_BRANCHES  # recommend_place, recommend_accommodation, plan_trip, 기본값
 
 
 def route_missing_info(state: TravelState) -> str:
@@ -48,6 +52,13 @@ def route_missing_info(state: TravelState) -> str:
         return "retrieval"
 
 
+def route_after_recommendation(state: TravelState) -> str:
+    """
+    일정 만들기(plan_trip)면 추천 후보로 동선을 짜고, 아니면 바로 후속 액션으로.
+    """
+    return "plan_trip" if state.get("intent") == "plan_trip" else "post_action"
+
+
 def create_travel_graph() -> StateGraph:
     """
     여행 추천 시스템의 전체 그래프를 생성합니다.
@@ -62,13 +73,16 @@ def create_travel_graph() -> StateGraph:
     # Intent 분류
     workflow.add_node("intent_classifier", intent_classifier_node)
     
-    # 여행지/숙소 추천 Flow (LLM 분류 → 정보 추출 → …)
+    # 여행지/숙소 추천 Flow (LLM 분류 ∥ 규칙 추출 ∥ 추측 검색 → 합류 → …)
     workflow.add_node("travel_classifier_llm", travel_classifier_llm_node)
     workflow.add_node("info_extractor", travel_info_extractor_node)
+    workflow.add_node("speculative_retrieval", speculative_retrieval_node)
+    workflow.add_node("info_merge", info_merge_node)
     workflow.add_node("missing_info_check", missing_info_check_node)
     workflow.add_node("clarifying", clarifying_question_node)
     workflow.add_node("retrieval", retrieval_node)
     workflow.add_node("recommendation", recommendation_node)
+    workflow.add_node("plan_trip", plan_trip_node)
     workflow.add_node("post_action", post_action_node)
     
     # 찜 관련 노드
@@ -80,21 +94,16 @@ def create_travel_graph() -> StateGraph:
     workflow.set_entry_point("user_input")
     workflow.add_edge("user_input", "intent_classifier")
     
-    # Intent 분류 → 조건 분기
+    # Intent 분류 → 조건 분기 (여행 Flow는 세 분기 동시 실행)
     workflow.add_conditional_edges(
         "intent_classifier",
         route_intent,
-        {
-            "travel_flow": "travel_classifier_llm",
-            "add_favorite": "add_favorite",
-            "show_favorites": "show_favorites",
-            "plan_trip": "travel_classifier_llm"  # 일정 만들기도 여행지 추천과 동일 플로우
-        }
+        TRAVEL_FLOW_BRANCHES + ["add_favorite", "show_favorites"]
     )
     
-    # 여행지 추천 Flow: LLM 분류 → 정보 추출 → 부족 여부 판단
-    workflow.add_edge("travel_classifier_llm", "info_extractor")
-    workflow.add_edge("info_extractor", "missing_info_check")
+    # 여행지 추천 Flow: 세 분기가 모두 끝나면 합류(분류 결과를 filters에 병합) → 부족 여부 판단
+    workflow.add_edge(TRAVEL_FLOW_BRANCHES, "info_merge")
+    workflow.add_edge("info_merge", "missing_info_check")
     
     # 정보 부족 여부에 따른 분기
     workflow.add_conditional_edges(
@@ -110,9 +119,17 @@ def create_travel_graph() -> StateGraph:
     workflow.add_edge("clarifying", END)  # 실제로는 다시 user_input으로 돌아가야 하지만, 
                                           # 외부에서 새로운 입력을 받아 다시 그래프를 실행해야 함
     
-    # RAG 검색 → 추천 생성 → 후속 액션
+    # RAG 검색 → 추천 생성 → (일정 만들기면 동선 생성) → 후속 액션
     workflow.add_edge("retrieval", "recommendation")
-    workflow.add_edge("recommendation", "post_action")
+    workflow.add_conditional_edges(
+        "recommendation",
+        route_after_recommendation,
+        {
+            "plan_trip": "plan_trip",
+            "post_action": "post_action"
+        }
+    )
+    workflow.add_edge("plan_trip", "post_action")
     workflow.add_edge("post_action", END)
     
     # 찜 추가 → 종료
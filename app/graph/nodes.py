@@ -4,19 +4,18 @@ LangGraph 노드 구현
 LLM·외부 호출에는 타임아웃을 두고, 예외 시 fallback 및 에러 로그를 남깁니다.
 """
 import asyncio
+import hashlib
 import json
 import os
+import re
 from typing import Dict, Any, Optional
-from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
+from langchain_core.messages import HumanMessage, AIMessage
+from app.domain.travel_keywords import BUDGET_LABELS
 from app.graph.state import TravelState
-
-
-def _llm_timeout_sec() -> int:
-    try:
-        from app.core.config import settings
-        return max(10, getattr(settings, "LLM_TIMEOUT_SEC", 25))
-    except Exception:
-        return 25
+from app.services.classifier_cache import context_key, get_classifier_cache
+from app.services.keyword_matcher import match_keywords
+from app.services.local_classifier import get_local_classifier, local_threshold
+from app.services.semantic_cache import get_semantic_cache, semantic_text
 
 
 def _get_google_api_key() -> Optional[str]:
@@ -29,35 +28,26 @@ def _get_google_api_key() -> Optional[str]:
 
 
 def _get_travel_llm():
-    """API 키가 있을 때만 Gemini LLM 인스턴스 반환. 없거나 패키지 미설치 시 None."""
-    key = _get_google_api_key()
-    if not key:
+    """API 키가 있을 때만 공용 LLM 게이트웨이 반환 (커넥션 풀 재사용). 없으면 None."""
+    if not _get_google_api_key():
         return None
     try:
-        from langchain_google_genai import ChatGoogleGenerativeAI
-        return ChatGoogleGenerativeAI(model="gemini-2.5-flash", google_api_key=key, temperature=0)
+        from app.services.llm_service import llm_service
+        return llm_service
     except Exception:
         return None
 
 
 def _fallback_classify_travel(user_message: str) -> Dict[str, Any]:
-    """LLM 없을 때 키워드 기반 Who/Why/Constraints/When/대화단계 추론."""
-    msg = (user_message or "").lower()
-    who, why = "unknown", "unknown"
-    for k, kw in [("family_with_kids", ["아이","유모차","키즈","가족"]), ("couple", ["커플","연인","둘이","데이트","신혼"]), ("parents_trip", ["부모님","효도"]), ("solo", ["나홀","혼자","혼밥","1인"])]:
-        if any(w in msg for w in kw): who = k; break
-    for k, kw in [("relaxation", ["힐링","휴식","휴양","감성"]), ("activity", ["서핑","등산","체험"]), ("culture", ["유적","미술관","문화"]), ("food", ["맛집","미식","로컬","카페"])]:
-        if any(w in msg for w in kw): why = k; break
+    """LLM 없을 때 키워드 기반 Who/Why/Constraints/When/대화단계 추론 (키워드 표: app/domain/travel_keywords.py)."""
+    hits = match_keywords(user_message or "")
     constraints = {}
-    if "자가용" in msg or "주차" in msg: constraints["transport"] = "car"
-    elif "대중교통" in msg or "역세권" in msg: constraints["transport"] = "public"
-    if "저렴" in msg or "가성비" in msg: constraints["budget"] = "value"
-    elif "럭셔리" in msg or "고급" in msg: constraints["budget"] = "luxury"
+    if "transport" in hits: constraints["transport"] = hits.first("transport")
+    if "budget" in hits: constraints["budget"] = hits.first("budget")
     when_info = {}
-    for k, kw in [("spring", ["봄","벚꽃"]), ("summer", ["여름","해수욕장"]), ("autumn", ["가을","단풍"]), ("winter", ["겨울","눈꽃"])]:
-        if any(w in msg for w in kw): when_info["season"] = k; break
-    stage = "refinement" if any(r in msg for r in ["부산","제주","강릉","서울"]) else "exploration"
-    return {"who": who, "why": why, "constraints": constraints, "when_info": when_info, "conversation_stage": stage}
+    if "season" in hits: when_info["season"] = hits.first("season")
+    stage = "refinement" if "region" in hits else "exploration"
+    return {"who": hits.first("who", "unknown"), "why": hits.first("why", "unknown"), "constraints": constraints, "when_info": when_info, "conversation_stage": stage}
 
 
 # ==================== 0. 여행지 추천용 LLM 분류 노드 (Who/Why/Constraints/When/대화단계) ====================
@@ -96,33 +86,115 @@ TRAVEL_CLASSIFIER_SYSTEM = """당신은 여행 추천 봇의 분류기입니다.
 """
 
 
-async def travel_classifier_llm_node(state: TravelState) -> TravelState:
-    """여행지 추천 시 LLM(타임아웃 적용) 또는 키워드 fallback으로 Who/Why/Constraints/When/대화단계를 분류합니다."""
-    user_message = state.get("latest_message", "")
-    llm = _get_travel_llm()
-    timeout_sec = _llm_timeout_sec()
+def _classification_update(data: Dict[str, Any]) -> Dict[str, Any]:
+    """분류 결과 → 상태 부분 업데이트 (병렬 분기에서 filters 등 다른 키를 덮어쓰지 않도록 분류 키만)"""
+    return {
+        "who": data.get("who") or "unknown",
+        "why": data.get("why") or "unknown",
+        "constraints": data.get("constraints") or {},
+        "when_info": data.get("when_info") or {},
+        "conversation_stage": data.get("conversation_stage") or "exploration",
+    }
+
+
+def _local_classification(pred: Dict[str, str], user_message: str) -> Dict[str, Any]:
+    """로컬 분류기 예측(who/why/season/transport) + 예측하지 않는 항목(budget, 대화단계 등)은 키워드 분류로 채움"""
+    base = _fallback_classify_travel(user_message)
+    constraints = {k: v for k, v in (base.get("constraints") or {}).items() if k != "transport"}
+    if pred.get("transport") not in (None, "none"):
+        constraints["transport"] = pred["transport"]
+    when_info = {k: v for k, v in (base.get("when_info") or {}).items() if k != "season"}
+    if pred.get("season") not in (None, "none"):
+        when_info["season"] = pred["season"]
+    return {
+        "who": pred.get("who") or "unknown",
+        "why": pred.get("why") or "unknown",
+        "constraints": constraints,
+        "when_info": when_info,
+        "conversation_stage": base.get("conversation_stage") or "exploration",
+    }
+
+
+def _semantic_cache_enabled() -> bool:
+    try:
+        from app.core.config import settings
+        return bool(getattr(settings, "SEMANTIC_CACHE_ENABLED", True))
+    except Exception:
+        return True
+
+
+def _semantic_hit_conflicts(reused: Dict[str, Any], user_message: str) -> bool:
+    """
+    의미 캐시 적중 결과가 현재 발화의 키워드와 어긋나는지. ("겨울에 강릉 여행" ↔ "여름에 강릉 여행"은 임베딩이 거의 같음)
+    발화에서 who/why/계절/교통/예산 키워드가 잡혔는데 재사용할 값이 그중 어느 것과도 다르면 True → LLM으로.
+    """
+    hits = match_keywords(user_message or "")
+    constraints = reused.get("constraints") or {}
+    when_info = reused.get("when_info") or {}
+    reused_values = {
+        "who": reused.get("who"),
+        "why": reused.get("why"),
+        "season": when_info.get("season"),
+        "transport": constraints.get("transport"),
+        "budget": constraints.get("budget"),
+    }
+    return any(slot in hits and value not in hits.values(slot) for slot, value in reused_values.items())
 
-    if llm is None:
-        data = _fallback_classify_travel(user_message)
-        state["who"] = data.get("who") or "unknown"
-        state["why"] = data.get("why") or "unknown"
-        state["constraints"] = data.get("constraints") or {}
-        state["when_info"] = data.get("when_info") or {}
-        state["conversation_stage"] = data.get("conversation_stage") or "exploration"
-        return state
 
+_CLASSIFIER_CACHE_NS = "travel_classifier:" + hashlib.sha1(TRAVEL_CLASSIFIER_SYSTEM.encode("utf-8")).hexdigest()[:12]
+
+
+async def travel_classifier_llm_node(state: TravelState) -> Dict[str, Any]:
+    """
+    여행지 추천 시 LLM(타임아웃 적용) 또는 키워드 fallback으로 Who/Why/Constraints/When/대화단계를 분류합니다.
+    규칙 추출·추측 검색과 병렬로 실행되므로 분류 키만 부분 업데이트로 반환합니다.
+    순서: 분류 캐시(최근 4턴 + 현재 발화 정규화 키) → 로컬 분류기(확신도 CLASSIFIER_LOCAL_THRESHOLD 이상) → 의미 캐시(임베딩 유사도) → LLM.
+    LLM 호출이 실패하면 만료된 캐시, 로컬 분류기 예측 순으로 쓰고, 둘 다 없을 때만 키워드 fallback.
+    """
+    user_message = state.get("latest_message", "")
     history = state.get("user_input", [])
     recent = history[-4:] if len(history) > 4 else history
-    context = "\n".join(
-        f"{'user' if isinstance(m, HumanMessage) else 'assistant'}: {m.content}"
-        for m in recent
-    ) if recent else "(대화 없음)"
+    turns = [("user" if isinstance(m, HumanMessage) else "assistant", m.content) for m in recent]
+
+    cache = get_classifier_cache()
+    cache_key = context_key(turns, user_message, namespace=_CLASSIFIER_CACHE_NS)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return _classification_update(cached)
+
+    # 로컬 분류기: 확신도가 높으면 LLM 없이 사용 (수십 µs)
+    sem_text = semantic_text([c for r, c in turns if r == "user"], user_message)
+    local_data = None
+    local_model = get_local_classifier()
+    if local_model is not None:
+        pred, confidence = local_model.predict(sem_text)
+        local_data = _local_classification(pred, user_message)
+        if confidence >= local_threshold():
+            return _classification_update(local_data)
+
+    llm = _get_travel_llm()
+    if llm is None:
+        return _classification_update(cache.get_stale(cache_key) or local_data or _fallback_classify_travel(user_message))
+
+    # 의미 캐시: 표현만 다른 비슷한 발화의 분류 재사용 (임베딩은 스레드에서 계산해 이벤트 루프를 막지 않음)
+    semantic, sem_vec = None, None
+    if _semantic_cache_enabled():
+        semantic = get_semantic_cache()
+        sem_vec = await asyncio.to_thread(semantic.encode, sem_text)
+        reused = semantic.lookup(sem_vec)
+        if reused is not None and _semantic_hit_conflicts(reused, user_message):
+            semantic.counters["conflicts"] += 1
+            reused = None
+        if reused is not None:
+            # 근사 적중이므로 정확한 키 캐시에는 넣지 않음. 대화 단계는 다른 대화의 것이라 현재 발화 기준으로 다시 정함
+            reused["conversation_stage"] = _fallback_classify_travel(user_message)["conversation_stage"]
+            return _classification_update(reused)
+
+    context = "\n".join(f"{role}: {content}" for role, content in turns) if turns else "(대화 없음)"
     prompt = f"""대화 맥락:\n{context}\n\n현재 사용자 발화: {user_message}\n\n위 규칙에 따라 JSON만 출력하세요."""
 
     try:
-        msgs = [SystemMessage(content=TRAVEL_CLASSIFIER_SYSTEM), HumanMessage(content=prompt)]
-        response = await asyncio.wait_for(llm.ainvoke(msgs), timeout=timeout_sec)
-        text = response.content if hasattr(response, "content") else str(response)
+        text = await llm.generate(prompt, site="travel_classifier", system=TRAVEL_CLASSIFIER_SYSTEM, temperature=0)
         raw = text.strip()
         if "```" in raw:
             start = raw.find("```") + 3
@@ -131,28 +203,16 @@ async def travel_classifier_llm_node(state: TravelState) -> TravelState:
             end = raw.find("```", start)
             raw = raw[start:end if end > 0 else None].strip()
         data = json.loads(raw)
-        state["who"] = data.get("who") or "unknown"
-        state["why"] = data.get("why") or "unknown"
-        state["constraints"] = data.get("constraints") or {}
-        state["when_info"] = data.get("when_info") or {}
-        state["conversation_stage"] = data.get("conversation_stage") or "exploration"
+        cache.put(cache_key, {k: data.get(k) for k in ("who", "why", "constraints", "when_info", "conversation_stage")})
+        cache.log(sem_text, data)
+        if semantic is not None:
+            semantic.add(sem_vec, sem_text, data)
+        return _classification_update(data)
     except asyncio.TimeoutError:
-        print(f"[graph] LLM 분류 타임아웃 ({timeout_sec}초 초과) → fallback 적용")
-        data = _fallback_classify_travel(user_message)
-        state["who"] = data.get("who") or "unknown"
-        state["why"] = data.get("why") or "unknown"
-        state["constraints"] = data.get("constraints") or {}
-        state["when_info"] = data.get("when_info") or {}
-        state["conversation_stage"] = data.get("conversation_stage") or "exploration"
+        print(f"[graph] LLM 분류 타임아웃 ({llm.timeout_for('travel_classifier')}초 초과) → fallback 적용")
     except Exception as e:
         print(f"[graph] LLM 분류 에러: {type(e).__name__} {e} → fallback 적용")
-        data = _fallback_classify_travel(user_message)
-        state["who"] = data.get("who") or "unknown"
-        state["why"] = data.get("why") or "unknown"
-        state["constraints"] = data.get("constraints") or {}
-        state["when_info"] = data.get("when_info") or {}
-        state["conversation_stage"] = data.get("conversation_stage") or "exploration"
-    return state
+    return _classification_update(cache.get_stale(cache_key) or local_data or _fallback_classify_travel(user_message))
 
 
 # ==================== 1. Entry / Input 노드 ====================
@@ -174,77 +234,57 @@ def intent_classifier_node(state: TravelState) -> TravelState:
     """
     사용자 입력을 분석하여 의도를 분류합니다.
     """
-    user_message = state.get("latest_message", "").lower()
-    
-    # 간단한 키워드 기반 의도 분류 (실제로는 LLM 사용 권장)
-    intent_keywords = {
-        "recommend_place": ["여행지", "관광지", "가볼만한", "추천", "어디"],
-        "recommend_accommodation": ["숙소", "호텔", "펜션", "게스트하우스", "예약", "잠자리"],
-        "add_favorite": ["찜", "저장", "즐겨찾기", "북마크"],
-        "show_favorites": ["찜 목록", "저장한", "즐겨찾기 목록", "찜 보기"],
-        "plan_trip": ["일정", "계획", "여행 계획", "스케줄"]
-    }
-    
-    # 키워드 매칭으로 의도 분류
-    detected_intent = None
-    for intent, keywords in intent_keywords.items():
-        if any(keyword in user_message for keyword in keywords):
-            detected_intent = intent
-            break
-    
-    # 기본값: 여행지 추천
-    if not detected_intent:
-        detected_intent = "recommend_place"
+    # 키워드 기반 의도 분류 (표 순서가 우선순위, 없으면 여행지 추천)
+    hits = match_keywords(state.get("latest_message") or "")
+    detected_intent = hits.first("intent", "recommend_place")
     
     state["intent"] = detected_intent
     return state
 
 
 # ==================== 3. 정보 추출 노드 (NER / 슬롯 추출 + LLM 결과 병합) ====================
-def travel_info_extractor_node(state: TravelState) -> TravelState:
-    """
-    사용자 입력에서 지역/테마 등 규칙 추출 후, LLM 분류 결과(who/why/constraints/when)를 filters에 병합합니다.
-    """
+def _rule_filters(state: TravelState) -> Dict[str, Any]:
+    """이전 filters + 발화에서 규칙으로 뽑은 지역/테마/인원/기간/예산"""
     user_message = state.get("latest_message", "")
     filters = dict(state.get("filters", {}))
     
-    # 지역 추출
-    regions = ["부산", "제주", "서울", "경주", "강릉", "여수", "전주", "대구", "인천"]
-    for region in regions:
-        if region in user_message:
-            filters["region"] = region
-            break
+    hits = match_keywords(user_message or "")
+    
+    # 지역 추출 (기본 도시 + place.csv 시/군/구, 발화에서 먼저 나온 것)
+    region = hits.earliest("region")
+    if region:
+        filters["region"] = region
     
     # 테마 추출
-    themes = []
-    theme_keywords = {
-        "바다": ["바다", "해변", "해수욕장", "해안"],
-        "감성": ["감성", "로맨틱", "분위기"],
-        "힐링": ["힐링", "휴식", "여유"],
-        "커플": ["커플", "연인", "데이트"],
-        "가족": ["가족", "아이", "어린이"],
-        "맛집": ["맛집", "음식", "식당"],
-        "야경": ["야경", "밤", "야경"]
-    }
-    for theme, keywords in theme_keywords.items():
-        if any(keyword in user_message for keyword in keywords):
-            themes.append(theme)
+    themes = hits.values("theme")
     if themes:
         filters["theme"] = themes
     
     # 인원/예산 규칙 추출
-    if "1명" in user_message or "혼자" in user_message:
-        filters["people"] = "1명"
-    elif "2명" in user_message or "커플" in user_message or "둘이" in user_message:
-        filters["people"] = "2명"
-    elif "가족" in user_message or "아이" in user_message:
-        filters["people"] = "가족"
-    if "저렴" in user_message or "싼" in user_message or "경제적" in user_message:
-        filters["budget"] = "저렴"
-    elif "비싼" in user_message or "고급" in user_message or "럭셔리" in user_message:
-        filters["budget"] = "고급"
+    if "people" in hits:
+        filters["people"] = hits.first("people")
+    # 여행 기간: "2박 3일" → 3일, "당일" → 1일, "3일" → 3일
+    m = re.search(r"(\d+)\s*박\s*(\d+)\s*일", user_message)
+    if m:
+        filters["duration"] = f"{m.group(1)}박 {m.group(2)}일"
+        filters["days"] = int(m.group(2))
+    elif "당일" in user_message:
+        filters["duration"] = "당일"
+        filters["days"] = 1
+    else:
+        m = re.search(r"(\d+)\s*일\s*(?:동안|일정|코스|여행)", user_message)
+        if m:
+            filters["duration"] = f"{m.group(1)}일"
+            filters["days"] = int(m.group(1))
+    if "budget" in hits:
+        filters["budget"] = BUDGET_LABELS[hits.first("budget")]
     
-    # LLM 분류 결과 병합: who, why, constraints, when_info → filters
+    return filters
+
+
+def _merge_classification(filters: Dict[str, Any], state: TravelState) -> Dict[str, Any]:
+    """분류 결과(who/why/constraints/when_info/대화단계)를 filters에 병합한 사본"""
+    filters = dict(filters)
     who = state.get("who")
     if who and who != "unknown":
         filters["who"] = who
@@ -262,9 +302,22 @@ def travel_info_extractor_node(state: TravelState) -> TravelState:
     cs = state.get("conversation_stage")
     if cs:
         filters["conversation_stage"] = cs
-    
-    state["filters"] = filters
-    return state
+    return filters
+
+
+def travel_info_extractor_node(state: TravelState) -> Dict[str, Any]:
+    """
+    사용자 입력에서 지역/테마 등을 규칙으로 추출합니다. LLM 분류를 기다리지 않고 병렬로 실행되며,
+    분류 결과 병합은 합류 지점(info_merge_node)에서 합니다.
+    """
+    return {"filters": _rule_filters(state)}
+
+
+def info_merge_node(state: TravelState) -> Dict[str, Any]:
+    """
+    병렬 분기(LLM 분류, 규칙 추출, 추측 검색) 합류: LLM 분류 결과(who/why/constraints/when)를 filters에 병합합니다.
+    """
+    return {"filters": _merge_classification(state.get("filters", {}), state)}
 
 
 # ==================== 4. 정보 부족 여부 판단 노드 ====================
@@ -371,7 +424,6 @@ async def clarifying_question_node(state: TravelState) -> TravelState:
     missing_labels = [m for m in missing_info if m in ("region", "theme", "who", "why", "season", "transport", "budget", "people", "duration", "pet_friendly")]
 
     llm = _get_travel_llm()
-    timeout_sec = _llm_timeout_sec()
 
     if llm and missing_labels:
         try:
@@ -380,9 +432,7 @@ async def clarifying_question_node(state: TravelState) -> TravelState:
 사용자 방금 한 말: {user_message[:150]}
 
 위 규칙대로, **한 문단의 자연스러운 응답만** 작성하세요. 다른 설명이나 JSON·목록 금지."""
-            msgs = [SystemMessage(content=TRAVEL_CONSULTANT_RESPONSE), HumanMessage(content=user_prompt)]
-            response = await asyncio.wait_for(llm.ainvoke(msgs), timeout=timeout_sec)
-            text = (response.content if hasattr(response, "content") else str(response)).strip()
+            text = (await llm.generate(user_prompt, site="clarifying", system=TRAVEL_CONSULTANT_RESPONSE, temperature=0)).strip()
             if text and len(text) > 10:
                 state["clarifying_question"] = text
                 state["response"] = text
@@ -407,6 +457,7 @@ async def clarifying_question_node(state: TravelState) -> TravelState:
 # budget: "value" | "luxury" | "both"
 # pet_friendly: True | False
 # season_ok: ["spring","summer","autumn","winter"] 중 해당 계절
+# lat/lng/residence_time_min: 일정 만들기(plan_trip)용 좌표·권장 체류 시간(분)
 MOCK_DOCS = [
     # 부산·바다·감성·커플/나홀
     {
@@ -421,6 +472,9 @@ MOCK_DOCS = [
         "pet_friendly": False,
         "season_ok": ["spring", "summer", "autumn"],
         "score": 0.95,
+        "lat": 35.1587,
+        "lng": 129.1797,
+        "residence_time_min": 60,
     },
     {
         "name": "감천문화마을",
@@ -434,6 +488,9 @@ MOCK_DOCS = [
         "pet_friendly": False,
         "season_ok": ["spring", "summer", "autumn", "winter"],
         "score": 0.92,
+        "lat": 35.0975,
+        "lng": 129.0106,
+        "residence_time_min": 90,
     },
     {
         "name": "송도 스카이워크",
@@ -447,6 +504,9 @@ MOCK_DOCS = [
         "pet_friendly": False,
         "season_ok": ["summer", "autumn"],
         "score": 0.88,
+        "lat": 35.076,
+        "lng": 129.017,
+        "residence_time_min": 40,
     },
     # 부산·가족·액티비티
     {
@@ -461,6 +521,9 @@ MOCK_DOCS = [
         "pet_friendly": False,
         "season_ok": ["spring", "summer", "autumn", "winter"],
         "score": 0.90,
+        "lat": 35.1595,
+        "lng": 129.1605,
+        "residence_time_min": 90,
     },
     {
         "name": "기장 스카이라인 루지",
@@ -474,6 +537,9 @@ MOCK_DOCS = [
         "pet_friendly": False,
         "season_ok": ["spring", "summer", "autumn"],
         "score": 0.87,
+        "lat": 35.196,
+        "lng": 129.215,
+        "residence_time_min": 90,
     },
     # 부산·효도·휴양
     {
@@ -488,6 +554,9 @@ MOCK_DOCS = [
         "pet_friendly": False,
         "season_ok": ["spring", "autumn", "winter"],
         "score": 0.91,
+        "lat": 35.163,
+        "lng": 129.163,
+        "residence_time_min": 120,
     },
     {
         "name": "영도 한밭한식당",
@@ -501,6 +570,9 @@ MOCK_DOCS = [
         "pet_friendly": False,
         "season_ok": ["spring", "summer", "autumn", "winter"],
         "score": 0.86,
+        "lat": 35.091,
+        "lng": 129.068,
+        "residence_time_min": 60,
     },
     # 제주·나홀·힐링/미식
     {
@@ -515,6 +587,9 @@ MOCK_DOCS = [
         "pet_friendly": True,
         "season_ok": ["summer", "autumn"],
         "score": 0.89,
+        "lat": 33.394,
+        "lng": 126.2396,
+        "residence_time_min": 90,
     },
     {
         "name": "제주 동문시장",
@@ -528,6 +603,9 @@ MOCK_DOCS = [
         "pet_friendly": False,
         "season_ok": ["spring", "summer", "autumn", "winter"],
         "score": 0.88,
+        "lat": 33.5125,
+        "lng": 126.5276,
+        "residence_time_min": 60,
     },
     # 강릉·커플/힐링
     {
@@ -542,6 +620,9 @@ MOCK_DOCS = [
         "pet_friendly": False,
         "season_ok": ["spring", "summer", "autumn"],
         "score": 0.90,
+        "lat": 37.7956,
+        "lng": 128.908,
+        "residence_time_min": 90,
     },
     {
         "name": "강릉 정동진 해돋이",
@@ -555,25 +636,36 @@ MOCK_DOCS = [
         "pet_friendly": False,
         "season_ok": ["spring", "summer", "autumn", "winter"],
         "score": 0.87,
+        "lat": 37.6908,
+        "lng": 129.0344,
+        "residence_time_min": 60,
     },
 ]
 
 
-def retrieval_node(state: TravelState) -> TravelState:
-    """
-    벡터 DB에서 관련 문서를 검색합니다. Who/Why/Constraints/When 조건에 맞는 mock_docs만 반환합니다.
-    """
+def _retrieval_key(state: TravelState) -> tuple:
+    """검색 조건 (이 값이 같으면 검색 결과도 같음)"""
     filters = state.get("filters", {})
-    region = filters.get("region", "")
-    themes = filters.get("theme", [])
+    constraints = state.get("constraints") or {}
+    when_info = state.get("when_info") or {}
     who = state.get("who") or filters.get("who")
     why = state.get("why") or filters.get("why")
-    constraint_transport = (state.get("constraints") or {}).get("transport") or filters.get("constraint_transport")
-    constraint_budget = (state.get("constraints") or {}).get("budget") or filters.get("budget") or filters.get("constraint_budget")
-    pet_friendly = (state.get("constraints") or {}).get("pet_friendly")
-    when_info = state.get("when_info") or {}
-    season = when_info.get("season") or filters.get("season")
-
+    return (
+        filters.get("region", ""),
+        tuple(filters.get("theme", [])),
+        None if who == "unknown" else who,
+        None if why == "unknown" else why,
+        constraints.get("transport") or filters.get("constraint_transport"),
+        constraints.get("budget") or filters.get("budget") or filters.get("constraint_budget"),
+        constraints.get("pet_friendly"),
+        when_info.get("season") or filters.get("season"),
+        10 if state.get("intent") == "plan_trip" else 5,
+    )
+
+
+def _retrieve(key: tuple) -> list:
+    """검색 조건에 맞는 mock_docs (점수순 상위 limit개)"""
+    region, themes, who, why, constraint_transport, constraint_budget, pet_friendly, season, limit = key
     filtered_docs = []
     for doc in MOCK_DOCS:
         doc_who = doc.get("who") or []
@@ -587,9 +679,9 @@ def retrieval_node(state: TravelState) -> TravelState:
             continue
         if themes and not any(t in doc.get("theme", []) for t in themes):
             continue
-        if who and who != "unknown" and who not in doc_who:
+        if who and who not in doc_who:
             continue
-        if why and why != "unknown" and why not in doc_why:
+        if why and why not in doc_why:
             continue
         if constraint_transport and constraint_transport not in doc_transport:
             continue
@@ -603,9 +695,33 @@ def retrieval_node(state: TravelState) -> TravelState:
             continue
         filtered_docs.append(doc)
 
-    # 점수순 정렬 후 상위 5개
+    # 점수순 정렬 후 상위 5개 (일정 만들기는 동선을 짤 후보가 더 필요하므로 10개)
     filtered_docs.sort(key=lambda d: d.get("score", 0), reverse=True)
-    state["retrieved_docs"] = filtered_docs[:5]
+    return filtered_docs[:limit]
+
+
+def speculative_retrieval_node(state: TravelState) -> Dict[str, Any]:
+    """
+    LLM 분류를 기다리지 않고, 이전 턴 분류 + 이번 발화 규칙 추출 filters로 미리 검색합니다 (분류·추출과 병렬).
+    분류 결과가 검색 조건을 바꾸지 않으면(지역만 좁히는 refinement 턴 등) retrieval_node가 이 결과를 그대로 씁니다.
+    """
+    guess = dict(state)
+    guess["filters"] = _merge_classification(_rule_filters(state), state)
+    key = _retrieval_key(guess)
+    return {"speculative_retrieval": {"key": key, "docs": _retrieve(key)}}
+
+
+def retrieval_node(state: TravelState) -> TravelState:
+    """
+    벡터 DB에서 관련 문서를 검색합니다. Who/Why/Constraints/When 조건에 맞는 mock_docs만 반환합니다.
+    추측 검색(speculative_retrieval_node)의 조건과 같으면 그 결과를 재사용합니다.
+    """
+    key = _retrieval_key(state)
+    speculative = state.get("speculative_retrieval") or {}
+    if speculative.get("key") == key:
+        state["retrieved_docs"] = speculative.get("docs") or []
+    else:
+        state["retrieved_docs"] = _retrieve(key)
     return state
 
 
@@ -664,6 +780,50 @@ def recommendation_node(state: TravelState) -> TravelState:
     return state
 
 
+# ==================== 7-1. 일정 생성 노드 (plan_trip) ====================
+_DAY_START_MIN = 9 * 60  # 일정 시작 09:00
+
+
+def _clock(minutes: float) -> str:
+    m = int(round(_DAY_START_MIN + minutes))
+    return f"{m // 60:02d}:{m % 60:02d}"
+
+
+def plan_trip_node(state: TravelState) -> TravelState:
+    """
+    검색된 후보 장소로 날짜별 동선을 만듭니다. (거리 행렬 + 최근접 이웃 + 2-opt, 마감 시간 내 반환)
+    기간은 filters.days(예: "2박 3일" → 3), 없으면 당일.
+    """
+    from app.services.itinerary import plan_itinerary
+
+    try:
+        from app.core.config import settings
+        deadline_ms = getattr(settings, "ITINERARY_DEADLINE_MS", 300)
+        day_minutes = getattr(settings, "ITINERARY_DAY_MINUTES", 480)
+    except Exception:
+        deadline_ms, day_minutes = 300, 480
+
+    filters = state.get("filters", {})
+    docs = state.get("retrieved_docs", [])
+    places = [
+        {"name": d.get("name", ""), "lat": d.get("lat"), "lng": d.get("lng"), "residence_time_min": d.get("residence_time_min")}
+        for d in docs
+    ]
+    itinerary = plan_itinerary(places, days=filters.get("days") or 1, day_minutes=day_minutes, deadline_ms=deadline_ms)
+    state["itinerary"] = itinerary
+
+    if not itinerary["days"]:
+        return state
+    lines = [f"{len(itinerary['days'])}일 일정으로 동선을 짜 봤어요 (총 이동 약 {itinerary['total_distance_km']}km):\n"]
+    for day in itinerary["days"]:
+        stops = " → ".join(f"{s['name']}({_clock(s['arrive_min'])})" for s in day["stops"])
+        lines.append(f"[{day['day']}일차] {stops}")
+    if itinerary["unscheduled"]:
+        lines.append("\n일정에 넣지 못한 곳: " + ", ".join(u["name"] for u in itinerary["unscheduled"]))
+    state["response"] = "\n".join(lines)
+    return state
+
+
 # ==================== 8. 후속 액션 유도 노드 ====================
 def post_action_node(state: TravelState) -> TravelState:
     """
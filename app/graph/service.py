@@ -88,7 +88,9 @@ class TravelGraphService:
             "filters": {k: v for k, v in seed.items() if k not in ("who", "why", "constraints", "when_info", "conversation_stage")},
             "missing_info": [],
             "retrieved_docs": [],
+            "speculative_retrieval": {},
             "recommendations": [],
+            "itinerary": {},
             "user_id": user_id,
             "clarifying_question": None,
             "response": None,
@@ -118,6 +120,7 @@ class TravelGraphService:
                 "when_info": final_state.get("when_info", {}),
                 "conversation_stage": final_state.get("conversation_stage"),
                 "recommendations": final_state.get("recommendations", []),
+                "itinerary": final_state.get("itinerary") or None,
                 "clarifying_question": final_state.get("clarifying_question"),
                 "post_actions": final_state.get("post_actions", []),
                 "favorite_items": final_state.get("favorite_items", []),
@@ -24,7 +24,9 @@ class TravelState(TypedDict):
     
     # RAG 및 추천 결과
     retrieved_docs: List[Dict[str, Any]]  # 벡터 DB에서 검색된 문서들
+    speculative_retrieval: Dict[str, Any]  # LLM 분류 전에 미리 한 검색: key(검색 조건), docs
     recommendations: List[Dict[str, Any]]  # 최종 추천 결과
+    itinerary: Dict[str, Any]  # 일정 만들기(plan_trip) 결과: days[].stops[], unscheduled, total_distance_km
     
     # 사용자 정보
     user_id: Optional[int]  # 로그인한 사용자 ID
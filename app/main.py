@@ -1,9 +1,9 @@
 from fastapi import FastAPI
 from fastapi.responses import RedirectResponse, HTMLResponse
 from app.core.config import settings
+from app.api.images import router as images_router
 from app.api.v1.router import api_router
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 import os
 
@@ -13,6 +13,7 @@ app = FastAPI(
 )
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
+app.include_router(images_router)  # /images (main.py와 같은 서빙: 캐시 헤더, 304, Range, 축소본)
 
 
 @app.get("/")
@@ -38,10 +39,6 @@ def demo_redirect():
 #============================================================================
 
 base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-images_path = os.path.join(base_path, "images")
-
-from fastapi.staticfiles import StaticFiles
-app.mount("/images", StaticFiles(directory=images_path), name="images")
 
 app.add_middleware(
     CORSMiddleware,
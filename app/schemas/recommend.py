@@ -6,6 +6,13 @@ from pydantic import BaseModel
 from typing import Optional, List
 
 
+class AlsoVisitedItem(BaseModel):
+    """결과 장소와 같은 여행에서 가까운 순서로 함께 방문된 장소"""
+    poi_id: str
+    place_name: str
+    weight: float
+
+
 class RecommendResultItem(BaseModel):
     """results 배열 한 항목. 이미지는 image_url(전체 URL) 사용."""
     place_name: str
@@ -13,7 +20,11 @@ class RecommendResultItem(BaseModel):
     score: float
     image_file: str  # 파일명 (하위 호환)
     image_url: str  # 이미지 전체 URL (프론트는 이걸 사용)
+    thumbnail_url: Optional[str] = None  # 결과 카드용 축소본 URL (/images/...?w=480&fmt=webp)
+    placeholder: Optional[str] = None  # 썸네일 로딩 전 표시할 흐린 미리보기(LQIP) data URI
     guide: str
+    visit_area_id: Optional[str] = None  # 장소 ID (검색 세션에서 장소 제외 시 사용)
+    also_visited: Optional[List[AlsoVisitedItem]] = None  # 이곳에 간 사람들이 함께 간 곳 (동시 방문 가중치순)
 
 
 class RecommendAnalyzeResponse(BaseModel):
@@ -23,6 +34,17 @@ class RecommendAnalyzeResponse(BaseModel):
     results: Optional[List[RecommendResultItem]] = None
     ai_analysis: Optional[str] = None
     message: Optional[str] = None
+    session_id: Optional[str] = None  # 검색 세션 ID (다음 결과/제외/취향 보정용)
+    has_more: Optional[bool] = None
 
     class Config:
         extra = "allow"
+
+
+class RecommendSessionNextRequest(BaseModel):
+    """POST /api/v1/recommend/sessions/{session_id}/next 요청 (이미지 재업로드 없음)"""
+    limit: int = 3
+    exclude_visit_area_ids: List[str] = []
+    preference_text: str = ""  # 취향 문구 (질의 벡터를 이쪽으로 보정)
+    preference_weight: float = 0.3
+    reset: bool = False  # True면 처음 결과부터 다시
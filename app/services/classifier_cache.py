@@ -0,0 +1,185 @@
+"""
+여행 분류(travel_classifier_llm_node) 결과 캐시
+최근 4턴 대화 + 현재 발화를 정규화(소문자, 문장부호·공백 정리)해 해시한 키로 Who/Why/Constraints/When 분류 결과를 보관합니다.
+"부산 가족 여행"이나 데모 프리셋처럼 같은(비슷하게 쓴) 발화는 Gemini를 다시 부르지 않습니다.
+- 메모리 계층: LRU(CLASSIFIER_CACHE_MAX) + TTL(CLASSIFIER_CACHE_TTL_SEC)
+- 디스크 계층: sqlite(embedding_cache/classifier_cache.sqlite3) — 여러 워커·재시작 후에도 공유
+- LLM 호출이 실패하면 만료된 항목이라도 CLASSIFIER_CACHE_STALE_SEC 안이면 키워드 fallback 대신 사용
+- LLM 분류 결과는 classifier_log 테이블에도 남겨 로컬 분류기(local_classifier) 학습 데이터로 씀
+키에는 분류 프롬프트 해시가 들어가 프롬프트가 바뀌면 예전 결과는 자연히 쓰이지 않습니다.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+try:
+    from app.core.config import settings
+except Exception:
+    settings = None
+
+CACHE_FILE_NAME = "classifier_cache.sqlite3"
+_PUNCT = re.compile(r"[^\w\s]")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """NFKC → 소문자 → 문장부호 제거 → 공백 하나로. ("부산  가족여행!!" 와 "부산 가족여행" 같은 키)"""
+    text = unicodedata.normalize("NFKC", str(text or "")).lower()
+    return _SPACES.sub(" ", _PUNCT.sub(" ", text)).strip()
+
+
+def context_key(turns, message: str, namespace: str = "") -> str:
+    """turns: [(role, 내용)] 최근 대화, message: 현재 발화 → sha1 키"""
+    parts = [namespace] + [f"{role}:{normalize_text(content)}" for role, content in turns] + [f"now:{normalize_text(message)}"]
+    return hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+class ClassifierCache:
+    def __init__(self, db_path=None, max_items: int = 2000, ttl_sec: float = 86400.0, stale_sec: float = 604800.0):
+        self.db_path = db_path
+        self.max_items = max(int(max_items), 1)
+        self.ttl_sec = float(ttl_sec)
+        self.stale_sec = max(float(stale_sec), self.ttl_sec)
+        self._memory: OrderedDict[str, tuple[float, dict]] = OrderedDict()  # 키 → (저장 시각, 결과)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stale_hits": 0, "stores": 0, "disk_errors": 0}
+        if db_path:
+            try:
+                with self._conn() as conn:
+                    conn.execute("CREATE TABLE IF NOT EXISTS classifier_cache (k TEXT PRIMARY KEY, ts REAL NOT NULL, v TEXT NOT NULL)")
+                    # LLM 분류 기록 (로컬 분류기 학습용, scripts/train_local_classifier.py)
+                    conn.execute("CREATE TABLE IF NOT EXISTS classifier_log (ts REAL NOT NULL, text TEXT NOT NULL, label TEXT NOT NULL)")
+            except sqlite3.Error as e:
+                print(f"분류 캐시 디스크 계층 사용 안 함: {e}")
+                self.db_path = None
+
+    # ---------- 디스크 계층 ----------
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=1.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _disk_get(self, key: str):
+        if not self.db_path:
+            return None
+        try:
+            row = self._conn().execute("SELECT ts, v FROM classifier_cache WHERE k = ?", (key,)).fetchone()
+        except sqlite3.Error:
+            self.counters["disk_errors"] += 1
+            return None
+        return (row[0], json.loads(row[1])) if row else None
+
+    def _disk_put(self, key: str, ts: float, value: dict) -> None:
+        if not self.db_path:
+            return
+        try:
+            conn = self._conn()
+            conn.execute("INSERT OR REPLACE INTO classifier_cache (k, ts, v) VALUES (?, ?, ?)", (key, ts, json.dumps(value, ensure_ascii=False)))
+            # 가끔 오래된 항목 정리 (stale_sec 지난 것)
+            if self.counters["stores"] % 200 == 0:
+                conn.execute("DELETE FROM classifier_cache WHERE ts < ?", (ts - self.stale_sec,))
+        except sqlite3.Error:
+            self.counters["disk_errors"] += 1
+
+    # ---------- 조회/저장 ----------
+    def _remember(self, key: str, ts: float, value: dict) -> None:
+        with self._lock:
+            self._memory[key] = (ts, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_items:
+                self._memory.popitem(last=False)
+
+    def _lookup(self, key: str):
+        """(저장 시각, 결과, 계층) 또는 None. 메모리 → 디스크 순."""
+        with self._lock:
+            item = self._memory.get(key)
+            if item is not None:
+                self._memory.move_to_end(key)
+                return item[0], item[1], "memory"
+        item = self._disk_get(key)
+        return (item[0], item[1], "disk") if item else None
+
+    def get(self, key: str):
+        """TTL 안의 결과(dict 사본) 또는 None"""
+        item = self._lookup(key)
+        if item is None or time.time() - item[0] > self.ttl_sec:
+            self.counters["misses"] += 1
+            return None
+        ts, value, tier = item
+        if tier == "disk":
+            self._remember(key, ts, value)
+        self.counters[f"{tier}_hits"] += 1
+        return json.loads(json.dumps(value))
+
+    def get_stale(self, key: str):
+        """LLM 실패 시용: 만료됐어도 stale_sec 안의 결과 또는 None"""
+        item = self._lookup(key)
+        if item is None or time.time() - item[0] > self.stale_sec:
+            return None
+        self.counters["stale_hits"] += 1
+        return json.loads(json.dumps(item[1]))
+
+    def put(self, key: str, value: dict) -> None:
+        ts = time.time()
+        self.counters["stores"] += 1
+        self._remember(key, ts, value)
+        self._disk_put(key, ts, value)
+
+    def log(self, text: str, label: dict) -> None:
+        """LLM 분류 결과 기록 (디스크 계층이 있을 때만)"""
+        if not self.db_path or not text:
+            return
+        try:
+            self._conn().execute(
+                "INSERT INTO classifier_log (ts, text, label) VALUES (?, ?, ?)", (time.time(), text, json.dumps(label, ensure_ascii=False))
+            )
+        except sqlite3.Error:
+            self.counters["disk_errors"] += 1
+
+    def read_log(self) -> list:
+        """[(텍스트, 분류 dict)] 기록 전체 (같은 텍스트는 마지막 결과만)"""
+        if not self.db_path:
+            return []
+        rows = self._conn().execute("SELECT text, label FROM classifier_log ORDER BY ts").fetchall()
+        return list({text: json.loads(label) for text, label in rows}.items())
+
+    def stats(self) -> dict:
+        hits = self.counters["memory_hits"] + self.counters["disk_hits"]
+        lookups = hits + self.counters["misses"]
+        return {
+            "memory_items": len(self._memory),
+            "max_items": self.max_items,
+            "ttl_sec": self.ttl_sec,
+            "disk": bool(self.db_path),
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            **self.counters,
+        }
+
+
+_default_cache = None
+
+
+def get_classifier_cache() -> ClassifierCache:
+    """프로세스 공용 분류 캐시 (CLASSIFIER_CACHE_DISK=False면 메모리만)"""
+    global _default_cache
+    if _default_cache is None:
+        base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        use_disk = getattr(settings, "CLASSIFIER_CACHE_DISK", True) if settings else True
+        _default_cache = ClassifierCache(
+            os.path.join(base_dir, "embedding_cache", CACHE_FILE_NAME) if use_disk else None,
+            max_items=getattr(settings, "CLASSIFIER_CACHE_MAX", 2000) if settings else 2000,
+            ttl_sec=getattr(settings, "CLASSIFIER_CACHE_TTL_SEC", 86400) if settings else 86400,
+            stale_sec=getattr(settings, "CLASSIFIER_CACHE_STALE_SEC", 604800) if settings else 604800,
+        )
+    return _default_cache
@@ -0,0 +1,138 @@
+"""
+이미지 추천용 압축 임베딩 계층 (PCA 투영 / int8 스칼라 양자화)
+1차 스캔은 작은 코드(예: 128차원 int8 = 원본 512차원 float32의 1/16)로 근사 점수를 계산하고,
+근사 상위 N개만 원본 float32 벡터(features.npy, mmap)로 정확히 다시 점수화합니다.
+"""
+import json
+import os
+
+import numpy as np
+
+COMPRESSION_MODES = ("pca", "int8", "pca_int8")
+_PCA_FIT_SAMPLE = 20000
+_SCAN_BLOCK = 2048
+
+
+def _normalize(x):
+    x = np.asarray(x, dtype=np.float32)
+    return x / np.clip(np.linalg.norm(x, axis=-1, keepdims=True), 1e-12, None)
+
+
+def fit_pca(features, dim: int, seed: int = 0):
+    """
+    비중심(uncentered) PCA: 정규화 벡터의 내적을 가장 잘 보존하는 상위 dim개 방향 (dim × d).
+    행이 많으면 _PCA_FIT_SAMPLE개만 뽑아 SVD.
+    """
+    n = features.shape[0]
+    if n > _PCA_FIT_SAMPLE:
+        sample = np.random.default_rng(seed).choice(n, _PCA_FIT_SAMPLE, replace=False)
+        x = np.asarray(features[np.sort(sample)], dtype=np.float32)
+    else:
+        x = np.asarray(features, dtype=np.float32)
+    _, _, vt = np.linalg.svd(_normalize(x), full_matrices=False)
+    return vt[: min(int(dim), vt.shape[0])].astype(np.float32)
+
+
+def quantize_int8(x):
+    """차원별 대칭 스칼라 양자화 → (int8 코드, 차원별 scale). 복원값 = 코드 × scale."""
+    x = np.asarray(x, dtype=np.float32)
+    scale = np.abs(x).max(axis=0) / 127.0
+    scale[scale == 0] = 1.0
+    codes = np.clip(np.rint(x / scale), -127, 127).astype(np.int8)
+    return codes, scale.astype(np.float32)
+
+
+class CompressedIndex:
+    """
+    mode: pca(투영만, float32) | int8(원본 차원 양자화) | pca_int8(투영 후 양자화)
+    codes: 행별 압축 벡터, projection: (dim × d) 또는 None, scale: 차원별 scale 또는 None
+    """
+
+    def __init__(self, codes, projection=None, scale=None, mode: str = "pca_int8"):
+        self.codes = codes
+        self.projection = projection
+        self.scale = scale
+        self.mode = mode
+
+    @classmethod
+    def build(cls, features, mode: str = "pca_int8", dim: int = 128):
+        if mode not in COMPRESSION_MODES:
+            raise ValueError(f"지원하지 않는 압축 방식: {mode} ({', '.join(COMPRESSION_MODES)})")
+        projection = fit_pca(features, dim) if mode in ("pca", "pca_int8") else None
+        # 큰 mmap 배열도 한 번에 올리지 않도록 블록 단위로 변환
+        blocks = []
+        for s in range(0, features.shape[0], 65536):
+            x = _normalize(features[s:s + 65536])
+            blocks.append(x @ projection.T if projection is not None else x)
+        reduced = np.concatenate(blocks) if blocks else np.empty((0, 0), dtype=np.float32)
+        if mode in ("int8", "pca_int8"):
+            codes, scale = quantize_int8(reduced)
+        else:
+            codes, scale = reduced.astype(np.float32), None
+        return cls(codes, projection=projection, scale=scale, mode=mode)
+
+    @property
+    def nbytes(self) -> int:
+        extra = (self.projection.nbytes if self.projection is not None else 0) + (self.scale.nbytes if self.scale is not None else 0)
+        return int(self.codes.nbytes + extra)
+
+    def approx_scores(self, query_emb, rows=None):
+        """근사 유사도 (rows 순서, 없으면 전체). 질의가 여러 벡터면 행별 최댓값."""
+        q = np.atleast_2d(_normalize(query_emb))
+        if self.projection is not None:
+            q = q @ self.projection.T
+        if self.scale is not None:
+            q = q * self.scale  # 코드 × scale · q = 코드 · (scale × q)
+        codes = self.codes if rows is None else self.codes[rows]
+        q = q.T.astype(np.float32)
+        if codes.dtype == np.float32:
+            sims = codes @ q
+        else:
+            # int8 @ float32는 numpy가 행렬 전체를 float로 복사하므로, 캐시에 들어가는 블록 단위로 변환 후 곱셈
+            sims = np.empty((codes.shape[0], q.shape[1]), dtype=np.float32)
+            buf = np.empty((min(_SCAN_BLOCK, codes.shape[0]), codes.shape[1]), dtype=np.float32)
+            for s in range(0, codes.shape[0], _SCAN_BLOCK):
+                block = codes[s:s + _SCAN_BLOCK]
+                n = block.shape[0]
+                np.copyto(buf[:n], block, casting="unsafe")
+                np.dot(buf[:n], q, out=sims[s:s + n])
+        sims = sims.T
+        return sims.max(axis=0) if sims.shape[0] > 1 else sims[0]
+
+    def shortlist(self, query_emb, n: int, rows=None):
+        """근사 점수 상위 n개 행 번호 (rows가 있으면 그 안에서)."""
+        scores = self.approx_scores(query_emb, rows)
+        n = min(int(n), scores.shape[0])
+        if n <= 0:
+            return np.empty(0, dtype=np.int64)
+        top = np.argpartition(-scores, n - 1)[:n]
+        return (rows[top] if rows is not None else top).astype(np.int64)
+
+    def save(self, path: str, meta: dict) -> None:
+        """codes/projection/scale을 npz로, meta(원본 건수·설정)를 같은 이름 .json으로 저장."""
+        arrays = {"codes": self.codes}
+        if self.projection is not None:
+            arrays["projection"] = self.projection
+        if self.scale is not None:
+            arrays["scale"] = self.scale
+        np.savez(path, **arrays)
+        with open(os.path.splitext(path)[0] + ".json", "w", encoding="utf-8") as f:
+            json.dump(dict(meta, mode=self.mode), f)
+
+    @classmethod
+    def load(cls, path: str, expected_meta: dict):
+        """저장된 meta가 expected_meta와 모두 같을 때만 로드, 아니면 None."""
+        meta_path = os.path.splitext(path)[0] + ".json"
+        if not os.path.isfile(path) or not os.path.isfile(meta_path):
+            return None
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if any(meta.get(k) != v for k, v in expected_meta.items()):
+            return None
+        with np.load(path) as z:
+            return cls(
+                z["codes"],
+                projection=z["projection"] if "projection" in z.files else None,
+                scale=z["scale"] if "scale" in z.files else None,
+                mode=meta.get("mode", "pca_int8"),
+            )
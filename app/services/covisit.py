@@ -0,0 +1,167 @@
+"""
+"이곳에 간 사람들이 함께 간 곳" 동시 방문 인덱스
+방문지정보(TRAVEL_ID, VISIT_ORDER, POI_ID, DGSTFN, REVISIT_INTENTION)로 여행 안에서 가까운 순서로 함께 방문한 장소 쌍에
+가중치를 주어 희소 행렬(CSR: indptr/indices/weights)로 만들고, 적재 시점에 파일로 저장해 둡니다.
+요청 시에는 집계 없이 행 하나만 읽습니다.
+
+장소 식별: VISIT_AREA_ID는 방문 기록 단위(날짜+순번)라 여행마다 달라지므로 POI_ID로 묶습니다.
+POI_ID가 없는 방문(집·지인 집 등)은 제외합니다.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+COVISIT_FILE_NAME = "covisit.npz"
+# 집/사무실/지인 집 (VISIT_AREA_TYPE_CD) — 함께 방문한 곳으로 추천할 의미가 없음
+_EXCLUDED_TYPE_CD = {"21", "22", "23"}
+_NEUTRAL_SATISFACTION = 0.6
+
+
+def _code(v) -> str:
+    if v is None or (isinstance(v, float) and np.isnan(v)):
+        return ""
+    s = str(v).strip()
+    return s[:-2] if s.endswith(".0") else s
+
+
+def source_fingerprint(path) -> str:
+    """원본 파일(data/place.csv) 크기·수정 시각 → 문자열. 파일이 없으면 빈 문자열."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return ""
+    return f"{st.st_size}|{st.st_mtime_ns}"
+
+
+def _satisfaction(dgstfn, revisit):
+    """만족도·재방문 의향(1~5) 평균 → 0.2~1.0. 값이 없으면 중립(0.6)."""
+    vals = pd.DataFrame({"d": pd.to_numeric(dgstfn, errors="coerce"), "r": pd.to_numeric(revisit, errors="coerce")})
+    return (vals.mean(axis=1) / 5.0).fillna(_NEUTRAL_SATISFACTION).clip(0.2, 1.0).to_numpy(dtype=np.float32)
+
+
+class CovisitIndex:
+    """
+    장소 키(POI_ID) 번호 기준 CSR 행렬. 행 p의 indices[indptr[p]:indptr[p+1]]는 가중치 내림차순.
+    names: 장소 키별 대표 장소명, aliases: VISIT_AREA_ID → 장소 번호 (검색 결과의 visit_area_id로 조회용)
+    source: 만들 때의 data/place.csv 지문(source_fingerprint). 로드 측에서 현재 파일과 다르면 다시 만듦.
+    """
+
+    def __init__(self, keys, names, indptr, indices, weights, aliases=None, source=""):
+        self.keys = [str(k) for k in keys]
+        self.names = [str(n) for n in names]
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self._pos = {k: i for i, k in enumerate(self.keys)}
+        self.aliases = dict(aliases or {})
+        self.source = str(source or "")
+
+    def __len__(self):
+        return len(self.keys)
+
+    @property
+    def nnz(self) -> int:
+        return int(self.indices.size)
+
+    @classmethod
+    def build(cls, place_df, window: int = 3, top_n: int = 20, id_column: str = "VISIT_AREA_ID"):
+        """
+        방문지정보 DataFrame → CovisitIndex.
+        같은 여행에서 방문 순서 차이 d(≤ window)인 두 장소 A→B에 (1/d) × B의 만족도 가중치를 더하고, 양방향으로 모두 누적.
+        장소별 상위 top_n개만 보관.
+        """
+        df = place_df.copy()
+        df["_key"] = df["POI_ID"].map(_code) if "POI_ID" in df.columns else ""
+        df["_type"] = df["VISIT_AREA_TYPE_CD"].map(_code) if "VISIT_AREA_TYPE_CD" in df.columns else ""
+        df = df[(df["_key"] != "") & ~df["_type"].isin(_EXCLUDED_TYPE_CD)]
+        df = df.assign(_order=pd.to_numeric(df["VISIT_ORDER"], errors="coerce")).dropna(subset=["_order"])
+        df = df.sort_values(["TRAVEL_ID", "_order"], kind="stable")
+
+        keys, key_idx = np.unique(df["_key"].to_numpy(dtype=object).astype(str), return_inverse=True)
+        name_col = df["POI_NM"] if "POI_NM" in df.columns else df["VISIT_AREA_NM"]
+        area_col = df["VISIT_AREA_NM"] if "VISIT_AREA_NM" in df.columns else name_col
+        names_by_key = {}
+        for k, poi_nm, area_nm in zip(df["_key"], name_col, area_col):
+            if k not in names_by_key:
+                names_by_key[k] = next((str(v).strip() for v in (area_nm, poi_nm) if pd.notna(v) and str(v).strip()), "")
+        names = [names_by_key.get(k, "") for k in keys]
+        aliases = {}
+        for vid, p in zip(df[id_column if id_column in df.columns else "VISIT_AREA_ID"].map(_code), key_idx):
+            if vid:
+                aliases.setdefault(vid, int(p))
+
+        missing = pd.Series(np.nan, index=df.index)
+        sat = _satisfaction(df.get("DGSTFN", missing), df.get("REVISIT_INTENTION", missing))
+        trip = df["TRAVEL_ID"].astype(str).to_numpy()
+        src, dst, w = [], [], []
+        # 같은 여행 안에서 d칸 떨어진 방문 쌍 (정렬된 배열을 d만큼 밀어서 한 번에 비교)
+        for d in range(1, max(int(window), 1) + 1):
+            same = trip[d:] == trip[:-d]
+            a, b = key_idx[:-d][same], key_idx[d:][same]
+            keep = a != b
+            a, b = a[keep], b[keep]
+            sa, sb = sat[:-d][same][keep], sat[d:][same][keep]
+            src += [a, b]
+            dst += [b, a]
+            w += [sb / d, sa / d]
+        n = len(keys)
+        if not src or sum(x.size for x in src) == 0:
+            return cls(keys, names, np.zeros(n + 1, dtype=np.int64), [], [], aliases)
+        src, dst, w = np.concatenate(src), np.concatenate(dst), np.concatenate(w)
+
+        # (src, dst) 쌍별 합산
+        pair = src.astype(np.int64) * n + dst
+        uniq, inv = np.unique(pair, return_inverse=True)
+        summed = np.zeros(uniq.size, dtype=np.float32)
+        np.add.at(summed, inv, w)
+        src, dst = (uniq // n).astype(np.int64), (uniq % n).astype(np.int32)
+
+        # 행별 가중치 내림차순 정렬 후 상위 top_n개
+        order = np.lexsort((-summed, src))
+        src, dst, summed = src[order], dst[order], summed[order]
+        starts = np.searchsorted(src, np.arange(n))
+        rank = np.arange(src.size) - starts[src]
+        keep = rank < top_n
+        src, dst, summed = src[keep], dst[keep], summed[keep]
+        indptr = np.concatenate([[0], np.cumsum(np.bincount(src, minlength=n))])
+        return cls(keys, names, indptr, dst, summed, aliases)
+
+    def lookup(self, visit_area_id: str = "", poi_id: str = ""):
+        """POI_ID 우선, 없으면 VISIT_AREA_ID 별칭으로 장소 번호. 없으면 None."""
+        if poi_id and str(poi_id) in self._pos:
+            return self._pos[str(poi_id)]
+        return self.aliases.get(str(visit_area_id)) if visit_area_id else None
+
+    def also_visited(self, visit_area_id: str = "", poi_id: str = "", limit: int = 5):
+        """함께 방문한 장소 [{poi_id, place_name, weight}] 가중치 내림차순."""
+        p = self.lookup(visit_area_id, poi_id)
+        if p is None:
+            return []
+        s, e = self.indptr[p], min(self.indptr[p + 1], self.indptr[p] + max(int(limit), 0))
+        return [
+            {"poi_id": self.keys[j], "place_name": self.names[j], "weight": round(float(wt), 3)}
+            for j, wt in zip(self.indices[s:e].tolist(), self.weights[s:e].tolist())
+        ]
+
+    def save(self, path: str) -> None:
+        alias_ids = list(self.aliases.keys())
+        np.savez(
+            path,
+            keys=np.array(self.keys, dtype=str),
+            names=np.array(self.names, dtype=str),
+            indptr=self.indptr,
+            indices=self.indices,
+            weights=self.weights,
+            alias_ids=np.array(alias_ids, dtype=str),
+            alias_pos=np.array([self.aliases[a] for a in alias_ids], dtype=np.int32),
+            source=np.array(self.source),
+        )
+
+    @classmethod
+    def load(cls, path: str):
+        """source가 없는 예전 파일은 source=""로 읽음 (지문이 있는 place.csv와는 불일치 → 재생성 대상)."""
+        with np.load(path) as z:
+            aliases = dict(zip(z["alias_ids"].tolist(), z["alias_pos"].tolist()))
+            source = str(z["source"]) if "source" in z.files else ""
+            return cls(z["keys"].tolist(), z["names"].tolist(), z["indptr"], z["indices"], z["weights"], aliases, source)
@@ -0,0 +1,117 @@
+"""
+이미지 추천용 패싯 비트맵 인덱스
+서버 시작 시 db_features 행마다 장소유형(VISIT_AREA_TYPE_CD)·촬영 계절·장소 분류(해변/맛집)를 비트맵으로 만들어 두고,
+검색 시 요청한 패싯에 맞는 행만 골라 유사도를 계산합니다. (top-k 이후 거르는 방식이 아니라 미리 거름)
+"""
+import numpy as np
+
+FACET_VISIT_AREA_TYPE = "visit_area_type"
+FACET_SEASON = "season"
+FACET_PLACE_CLASS = "place_class"
+
+# 그래프 when_info.season 과 같은 값 사용
+_MONTH_TO_SEASON = {
+    3: "spring", 4: "spring", 5: "spring",
+    6: "summer", 7: "summer", 8: "summer",
+    9: "autumn", 10: "autumn", 11: "autumn",
+    12: "winter", 1: "winter", 2: "winter",
+}
+
+_BEACH_KEYWORDS = ("해수욕장", "해변", "바다", "해안", "비치")
+_RESTAURANT_KEYWORDS = ("피자", "맛집", "식당", "카페", "음식점", "도우개러지", "빵", "커피")
+
+
+def month_to_season(month) -> str:
+    """월(1~12) → spring/summer/autumn/winter. 알 수 없으면 빈 문자열."""
+    try:
+        return _MONTH_TO_SEASON.get(int(month), "")
+    except (TypeError, ValueError):
+        return ""
+
+
+def place_fit_score(name) -> int:
+    """해변 사진과 어울리는 장소명일수록 높은 점수 (해수욕장·해변 2, 펜션·리조트·비치 1)."""
+    if not name:
+        return 0
+    n = name
+    if "해수욕장" in n or "해변" in n or "바다" in n or "해안" in n:
+        return 2
+    if "펜션" in n or "리조트" in n or "비치" in n:
+        return 1
+    return 0
+
+
+def is_restaurant_place(name) -> bool:
+    """장소명이 맛집/카페 계열인지."""
+    if not name:
+        return False
+    return any(kw in name for kw in _RESTAURANT_KEYWORDS)
+
+
+def is_beach_place(name) -> bool:
+    """장소명이 해변/바다 계열인지."""
+    if not name:
+        return False
+    return any(kw in name for kw in _BEACH_KEYWORDS)
+
+
+def place_class_of(name) -> str:
+    """장소 분류 패싯 값: beach | restaurant | other"""
+    if is_beach_place(name):
+        return "beach"
+    if is_restaurant_place(name):
+        return "restaurant"
+    return "other"
+
+
+class FacetIndex:
+    """
+    패싯 이름 → {값 → 행 비트맵(np.packbits)}.
+    같은 패싯 안의 값들은 OR, 서로 다른 패싯끼리는 AND 로 결합합니다.
+    """
+
+    def __init__(self, n_rows: int):
+        self.n_rows = int(n_rows)
+        self._bitmaps: dict[str, dict[str, np.ndarray]] = {}
+        self._counts: dict[str, dict[str, int]] = {}
+
+    def add_facet(self, facet: str, values) -> None:
+        """행 순서대로 값 목록을 받아 값별 비트맵 생성. 빈 값(None/'')인 행은 어떤 값에도 속하지 않음."""
+        arr = np.array(["" if v is None else str(v).strip() for v in values], dtype=object)
+        bitmaps, counts = {}, {}
+        for value in sorted(set(arr.tolist()) - {""}):
+            mask = arr == value
+            bitmaps[value] = np.packbits(mask)
+            counts[value] = int(mask.sum())
+        self._bitmaps[facet] = bitmaps
+        self._counts[facet] = counts
+
+    def facets(self) -> dict[str, dict[str, int]]:
+        """패싯별 값 → 행 수 (프론트 필터 옵션용)."""
+        return {f: dict(c) for f, c in self._counts.items()}
+
+    def bitmap(self, selected: dict) -> np.ndarray | None:
+        """
+        selected: {패싯: [값, ...]}. 선택이 없으면 None(필터 없음).
+        알 수 없는 패싯/값만 고른 경우 모든 비트가 0인 비트맵을 반환합니다.
+        """
+        result = None
+        for facet, values in (selected or {}).items():
+            values = [str(v).strip() for v in (values or []) if str(v).strip()]
+            if not values:
+                continue
+            per_value = self._bitmaps.get(facet, {})
+            facet_bits = np.zeros((self.n_rows + 7) // 8, dtype=np.uint8)
+            for v in values:
+                bits = per_value.get(v)
+                if bits is not None:
+                    facet_bits |= bits
+            result = facet_bits if result is None else (result & facet_bits)
+        return result
+
+    def rows(self, selected: dict) -> np.ndarray | None:
+        """선택 패싯에 맞는 행 번호 (오름차순). 선택이 없으면 None."""
+        bits = self.bitmap(selected)
+        if bits is None:
+            return None
+        return np.flatnonzero(np.unpackbits(bits, count=self.n_rows))
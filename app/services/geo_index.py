@@ -0,0 +1,133 @@
+"""
+이미지 추천용 위치 인덱스 (격자 버킷)
+서버 시작 시 db_features 행별 좌표로 한 번 만들어 두고,
+반경/영역 조회는 버킷 조회 + 버킷 내부 거리 확인만으로 후보 행을 돌려줍니다.
+"""
+import io
+import math
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEG_LAT = 111.32
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """두 지점(또는 배열) 사이 대원 거리(km). numpy 브로드캐스팅 지원."""
+    lat1 = np.radians(lat1)
+    lat2 = np.radians(lat2)
+    dlat = lat2 - lat1
+    dlng = np.radians(lng2) - np.radians(lng1)
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def extract_exif_gps(image_bytes: bytes):
+    """업로드 이미지 EXIF의 GPS 정보를 (lat, lng)로 반환. 없거나 읽기 실패 시 None."""
+    try:
+        from PIL import Image
+        img = Image.open(io.BytesIO(image_bytes))
+        gps = img.getexif().get_ifd(0x8825)  # GPSInfo IFD
+    except Exception:
+        return None
+    if not gps:
+        return None
+
+    def _to_deg(dms):
+        try:
+            d, m, s = (float(x) for x in dms)
+            return d + m / 60.0 + s / 3600.0
+        except Exception:
+            return None
+
+    lat = _to_deg(gps.get(2) or ())
+    lng = _to_deg(gps.get(4) or ())
+    if lat is None or lng is None:
+        return None
+    if str(gps.get(1) or "N").upper().startswith("S"):
+        lat = -lat
+    if str(gps.get(3) or "E").upper().startswith("W"):
+        lng = -lng
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180) or (lat == 0 and lng == 0):
+        return None
+    return lat, lng
+
+
+class GeoGridIndex:
+    """
+    위경도 격자(cell_deg 단위) → 행 번호 배열.
+    좌표 없는 행은 인덱스에 들어가지 않으므로 위치 필터 사용 시 후보에서 제외됩니다.
+    """
+
+    def __init__(self, lats, lngs, cell_deg: float = 0.05):
+        self.cell_deg = float(cell_deg) if cell_deg and cell_deg > 0 else 0.05
+        lats = np.asarray(lats, dtype=np.float64)
+        lngs = np.asarray(lngs, dtype=np.float64)
+        self._lats = lats
+        self._lngs = lngs
+        valid = (
+            np.isfinite(lats) & np.isfinite(lngs)
+            & (np.abs(lats) <= 90) & (np.abs(lngs) <= 180)
+            & ~((lats == 0) & (lngs == 0))
+        )
+        rows = np.nonzero(valid)[0]
+        self._size = int(rows.size)
+        self._buckets: dict[tuple[int, int], np.ndarray] = {}
+        if rows.size == 0:
+            return
+        cy = np.floor(lats[rows] / self.cell_deg).astype(np.int64)
+        cx = np.floor(lngs[rows] / self.cell_deg).astype(np.int64)
+        order = np.lexsort((rows, cx, cy))
+        rows, cy, cx = rows[order], cy[order], cx[order]
+        boundaries = np.nonzero((np.diff(cy) != 0) | (np.diff(cx) != 0))[0] + 1
+        starts = np.concatenate(([0], boundaries))
+        ends = np.concatenate((boundaries, [rows.size]))
+        for s, e in zip(starts, ends):
+            self._buckets[(int(cy[s]), int(cx[s]))] = rows[s:e]
+
+    def __len__(self):
+        return self._size
+
+    def _collect(self, min_lat, min_lng, max_lat, max_lng) -> np.ndarray:
+        """영역에 걸치는 버킷의 행 번호를 모음 (경계 버킷은 아직 정밀 확인 전)."""
+        y0, y1 = math.floor(min_lat / self.cell_deg), math.floor(max_lat / self.cell_deg)
+        x0, x1 = math.floor(min_lng / self.cell_deg), math.floor(max_lng / self.cell_deg)
+        parts = []
+        if (y1 - y0 + 1) * (x1 - x0 + 1) > len(self._buckets):
+            # 영역이 버킷 수보다 넓으면 버킷을 직접 훑는 편이 빠름
+            for (cy, cx), rows in self._buckets.items():
+                if y0 <= cy <= y1 and x0 <= cx <= x1:
+                    parts.append(rows)
+        else:
+            for cy in range(y0, y1 + 1):
+                for cx in range(x0, x1 + 1):
+                    rows = self._buckets.get((cy, cx))
+                    if rows is not None:
+                        parts.append(rows)
+        if not parts:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(parts)
+
+    def query_bbox(self, min_lat, min_lng, max_lat, max_lng) -> np.ndarray:
+        """영역(min_lat, min_lng, max_lat, max_lng) 안의 행 번호 (오름차순)."""
+        if min_lat > max_lat:
+            min_lat, max_lat = max_lat, min_lat
+        if min_lng > max_lng:
+            min_lng, max_lng = max_lng, min_lng
+        rows = self._collect(min_lat, min_lng, max_lat, max_lng)
+        if rows.size == 0:
+            return rows
+        la, ln = self._lats[rows], self._lngs[rows]
+        keep = (la >= min_lat) & (la <= max_lat) & (ln >= min_lng) & (ln <= max_lng)
+        return np.sort(rows[keep])
+
+    def query_radius(self, lat, lng, radius_km) -> np.ndarray:
+        """중심(lat, lng)에서 radius_km 이내 행 번호 (오름차순)."""
+        radius_km = max(float(radius_km or 0), 0.0)
+        dlat = radius_km / KM_PER_DEG_LAT
+        dlng = radius_km / (KM_PER_DEG_LAT * max(math.cos(math.radians(lat)), 1e-6))
+        rows = self._collect(lat - dlat, lng - dlng, lat + dlat, lng + dlng)
+        if rows.size == 0:
+            return rows
+        dist = haversine_km(lat, lng, self._lats[rows], self._lngs[rows])
+        return np.sort(rows[dist <= radius_km])
@@ -0,0 +1,170 @@
+"""
+/images 축소본(썸네일)·WebP 변환 디스크 캐시
+원본(4032x3024, 2~4MB JPEG)을 요청마다 보내지 않도록 ?w=480&fmt=webp 요청 시 한 번만 만들어 image_cache/에 저장하고,
+이후에는 저장된 파일을 그대로 서빙합니다.
+캐시 키는 원본 지문(경로·크기·수정 시각) + 너비 + 형식의 해시라 원본이 바뀌면 자동으로 새 파일이 만들어집니다.
+허용된 너비(ALLOWED_WIDTHS)만 받으므로 임의 크기 요청으로 캐시가 늘어나지 않습니다.
+"""
+import hashlib
+import json
+import os
+import threading
+
+try:
+    from app.core.config import settings
+except Exception:
+    settings = None
+
+ALLOWED_WIDTHS = (160, 320, 480, 960)
+# 요청 fmt → (PIL 저장 형식, 확장자, media_type)
+FORMATS = {
+    "webp": ("WEBP", "webp", "image/webp"),
+    "jpeg": ("JPEG", "jpg", "image/jpeg"),
+    "jpg": ("JPEG", "jpg", "image/jpeg"),
+}
+_QUALITY = {"WEBP": 80, "JPEG": 82}
+# 적재 시 만든 사진별 LQIP (scripts/precompute_image_placeholders.py → embedding_cache/)
+PLACEHOLDERS_FILE_NAME = "placeholders.json"
+
+_key_locks = {}
+_key_locks_guard = threading.Lock()
+
+
+def source_fingerprint(path: str, st=None) -> str:
+    """원본 파일 지문 (절대 경로, 크기, 수정 시각 ns). 내용을 읽지 않음."""
+    st = st or os.stat(path)
+    return f"{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}"
+
+
+def derivative_cache_dir() -> str:
+    base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    custom = getattr(settings, "IMAGE_DERIVATIVE_CACHE_DIR", "") if settings else ""
+    return os.path.abspath(custom or os.path.join(base_dir, "image_cache"))
+
+
+def parse_derivative_params(w, fmt):
+    """
+    (width, fmt) 검증 → (width 또는 None, fmt 키 또는 None). 허용되지 않는 값이면 ValueError.
+    w만 주면 원본 형식(JPEG), fmt만 주면 원본 크기로 형식만 변환.
+    """
+    width = None
+    if w is not None:
+        width = int(w)
+        if width not in ALLOWED_WIDTHS:
+            raise ValueError(f"w는 {', '.join(str(x) for x in ALLOWED_WIDTHS)} 중 하나여야 합니다.")
+    key = None
+    if fmt:
+        key = str(fmt).strip().lower()
+        if key not in FORMATS:
+            raise ValueError("fmt는 webp, jpeg 중 하나여야 합니다.")
+    return width, key
+
+
+def _open_oriented(src_path: str, max_width=None):
+    """원본 열기 + EXIF 회전 적용. max_width가 있으면 JPEG 디코딩 단계에서 1/2~1/8로 줄여 읽음 (원본 전체 디코딩 생략)."""
+    from PIL import Image, ImageOps
+
+    with Image.open(src_path) as img:
+        if max_width:
+            img.draft("RGB", (max_width, max_width))
+        # exif_transpose는 디코딩된 사본을 돌려주므로 원본 파일은 여기서 닫힘
+        return ImageOps.exif_transpose(img)
+
+
+def _resized(img, width):
+    from PIL import Image
+
+    if width and img.width > width:
+        img = img.copy()
+        img.thumbnail((width, max(1, round(img.height * width / img.width))), Image.LANCZOS)
+    return img
+
+
+def _save_atomic(img, dst_path: str, fmt_key: str) -> None:
+    pil_format = FORMATS[fmt_key][0]
+    if img.mode not in ("RGB", "L") and not (pil_format == "WEBP" and img.mode == "RGBA"):
+        img = img.convert("RGB")
+    os.makedirs(os.path.dirname(dst_path), exist_ok=True)
+    tmp = f"{dst_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    img.save(tmp, format=pil_format, quality=_QUALITY[pil_format], optimize=pil_format == "JPEG")
+    os.replace(tmp, dst_path)
+
+
+def _render(src_path: str, dst_path: str, width, fmt_key: str) -> None:
+    with _open_oriented(src_path, width) as img:
+        _save_atomic(_resized(img, width), dst_path, fmt_key)
+
+
+def derivative_path(digest: str, fmt_key: str) -> str:
+    return os.path.join(derivative_cache_dir(), digest[:2], f"{digest}.{FORMATS[fmt_key][1]}")
+
+
+def derivative_key(src_path: str, width=None, fmt_key=None, st=None) -> str:
+    """축소본 캐시 키 (원본 지문 + 너비 + 형식 해시). 파일을 만들기 전에도 계산 가능 → ETag로도 사용."""
+    return hashlib.sha1(f"{source_fingerprint(src_path, st)}|{width or 0}|{fmt_key or 'jpeg'}".encode("utf-8")).hexdigest()
+
+
+def get_derivative(src_path: str, width=None, fmt_key=None, st=None):
+    """
+    원본 경로 → (축소본 경로, media_type). 캐시에 있으면 그대로, 없으면 만들어 저장 후 반환.
+    같은 키를 동시에 요청하면 한 번만 만듦.
+    """
+    fmt_key = fmt_key or "jpeg"
+    media_type = FORMATS[fmt_key][2]
+    digest = derivative_key(src_path, width, fmt_key, st)
+    dst_path = derivative_path(digest, fmt_key)
+    if os.path.isfile(dst_path):
+        return dst_path, media_type
+    with _key_locks_guard:
+        lock = _key_locks.setdefault(digest, threading.Lock())
+    with lock:
+        if not os.path.isfile(dst_path):
+            _render(src_path, dst_path, width, fmt_key)
+    with _key_locks_guard:
+        _key_locks.pop(digest, None)
+    return dst_path, media_type
+
+
+def thumbnail_query() -> str:
+    """검색 결과 썸네일 URL 쿼리 (?w=...&fmt=...)."""
+    width = getattr(settings, "IMAGE_THUMBNAIL_WIDTH", 480) if settings else 480
+    fmt = getattr(settings, "IMAGE_THUMBNAIL_FORMAT", "webp") if settings else "webp"
+    return f"?w={width}&fmt={fmt}"
+
+
+def precompute_derivatives(src_path: str, widths=ALLOWED_WIDTHS, fmt_key: str = "webp", lqip_width: int = 16):
+    """
+    적재 시 사전 생성: 원본을 한 번만 디코딩해 widths 축소본을 캐시에 저장(이미 있으면 건너뜀)하고
+    LQIP(아주 작은 흐린 미리보기) data URI를 반환. 결과 응답에 바로 넣어 클라이언트가 추가 요청 없이 먼저 그릴 수 있음.
+    """
+    import base64
+    import io
+
+    from PIL import ImageFilter
+
+    st = os.stat(src_path)
+    widths = sorted({int(w) for w in widths if int(w) in ALLOWED_WIDTHS}, reverse=True)
+    with _open_oriented(src_path, widths[0] if widths else lqip_width) as img:
+        base = img
+        for w in widths:
+            dst = derivative_path(derivative_key(src_path, w, fmt_key, st), fmt_key)
+            # 큰 축소본에서 다음 작은 축소본을 만듦 (매번 원본 크기에서 줄이지 않음)
+            base = _resized(base, w)
+            if not os.path.isfile(dst):
+                _save_atomic(base, dst, fmt_key)
+        tiny = _resized(base, lqip_width).convert("RGB").filter(ImageFilter.GaussianBlur(0.6))
+    buf = io.BytesIO()
+    tiny.save(buf, format="JPEG", quality=40, optimize=True)
+    return "data:image/jpeg;base64," + base64.b64encode(buf.getvalue()).decode("ascii")
+
+
+def load_placeholders(path: str) -> dict:
+    """placeholders.json → {사진 파일명: LQIP data URI}. 없거나 읽기 실패 시 빈 dict."""
+    if not os.path.isfile(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return dict(json.load(f).get("items", {}))
+    except Exception as e:
+        print(f"placeholder 목록 로드 실패: {e}")
+        return {}
@@ -0,0 +1,118 @@
+"""
+이미지 파일명 → 절대 경로 인덱스 (serve_image와 임베딩 생성이 함께 사용)
+backend-fastapi/images 와 국내 여행로그 데이터({지역})/Sample/01.원천데이터/photo 폴더를 한 번 훑어 dict로 만들어 두고,
+파일 조회는 dict 조회 한 번으로 끝냅니다. (요청·행마다 폴더 5곳 os.path.isfile 하지 않음)
+카탈로그 로드 시 refresh()로 다시 훑고, 인덱스에 없는 파일 요청은 IMAGE_INDEX_REFRESH_SEC마다 최대 한 번만 다시 훑습니다.
+"""
+import os
+import threading
+import time
+
+try:
+    from app.core.config import settings
+except Exception:
+    settings = None
+
+TRAVEL_REGIONS = ["수도권", "동부권", "서부권", "제주도 및 도서지역"]
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp")
+
+
+def region_photo_dir(travel_data_root: str, region: str) -> str:
+    return os.path.join(travel_data_root, f"국내 여행로그 데이터({region})", "Sample", "01.원천데이터", "photo")
+
+
+def _scan(folder: str) -> dict:
+    """폴더 바로 아래 이미지 파일명 → 절대 경로 (하위 폴더는 보지 않음)."""
+    out = {}
+    try:
+        with os.scandir(folder) as it:
+            for entry in it:
+                if entry.name.lower().endswith(IMAGE_EXTENSIONS) and entry.is_file():
+                    out[entry.name] = os.path.abspath(entry.path)
+    except OSError:
+        pass
+    return out
+
+
+class ImagePathIndex:
+    """
+    local: images/ 폴더 파일, regions: 지역 photo 폴더 파일 (같은 파일명이면 TRAVEL_REGIONS 앞 지역 우선).
+    """
+
+    def __init__(self, images_dir: str, travel_data_root: str, regions=None, refresh_sec: float = 60.0):
+        self.images_dir = os.path.abspath(images_dir)
+        self.travel_data_root = os.path.abspath(travel_data_root)
+        self.regions = list(regions or TRAVEL_REGIONS)
+        self.refresh_sec = float(refresh_sec)
+        self._local = {}
+        self._regions = {}
+        self._paths = set()
+        self._scanned_at = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        self._ensure()
+        return len(self._paths)
+
+    def refresh(self):
+        """폴더를 다시 훑어 인덱스 교체 (카탈로그 동기화 시 호출)."""
+        local = _scan(self.images_dir)
+        regions = {}
+        for region in reversed(self.regions):
+            regions.update(_scan(region_photo_dir(self.travel_data_root, region)))
+        with self._lock:
+            self._local, self._regions = local, regions
+            self._paths = set(local.values()) | set(regions.values())
+            self._scanned_at = time.monotonic()
+        return self
+
+    def _ensure(self):
+        if self._scanned_at is None:
+            self.refresh()
+
+    def _lookup(self, filename: str, local_first: bool):
+        first, second = (self._local, self._regions) if local_first else (self._regions, self._local)
+        return first.get(filename) or second.get(filename)
+
+    def resolve(self, filename: str, local_first: bool = True):
+        """
+        파일명 → 절대 경로 (없으면 None). local_first=True면 images/ 우선(serve_image), False면 지역 폴더 우선(임베딩 생성).
+        인덱스에 없으면 마지막 스캔 후 refresh_sec이 지났을 때만 다시 훑고 한 번 더 찾음.
+        """
+        if not filename or ".." in filename or "/" in filename.replace("\\", "/"):
+            return None
+        self._ensure()
+        path = self._lookup(filename, local_first)
+        if path is None and time.monotonic() - self._scanned_at >= self.refresh_sec:
+            self.refresh()
+            path = self._lookup(filename, local_first)
+        return path
+
+    def contains_path(self, path: str) -> bool:
+        """절대 경로가 인덱스에 있는 파일인지 (DB image_path 확인용)."""
+        self._ensure()
+        return os.path.abspath(path) in self._paths
+
+
+def resolve_served_image(filename: str, index=None):
+    """
+    /images/{파일명} 요청이 실제로 내보내는 원본 경로 (serve_image와 축소본 사전 생성이 함께 사용).
+    축소본 캐시 키가 원본 절대 경로 기준이므로, 미리 만드는 쪽도 반드시 같은 규칙(images/ 우선)으로 찾아야 함.
+    """
+    return (index or get_image_path_index()).resolve(str(filename or "").strip())
+
+
+_default_index = None
+
+
+def get_image_path_index() -> ImagePathIndex:
+    """프로세스 공용 인덱스 (backend-fastapi/images + TRAVEL_DATA_ROOT). 첫 호출 시 생성."""
+    global _default_index
+    if _default_index is None:
+        base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        _default_index = ImagePathIndex(
+            os.path.join(base_dir, "images"),
+            os.environ.get("TRAVEL_DATA_ROOT") or os.path.join(base_dir, ".."),
+            refresh_sec=getattr(settings, "IMAGE_INDEX_REFRESH_SEC", 60) if settings else 60,
+        )
+    return _default_index
@@ -0,0 +1,173 @@
+"""
+여행 일정(plan_trip) 생성기
+후보 장소 좌표(X_COORD=경도, Y_COORD=위도)로 거리 행렬을 한 번에 계산하고,
+최근접 이웃으로 만든 방문 순서를 2-opt로 다듬은 뒤 체류 시간(RESIDENCE_TIME_MIN)과 하루 가용 시간으로 일자를 나눕니다.
+2-opt는 마감 시간(deadline_ms)이 지나면 그때까지의 순서로 바로 반환합니다. (장소 50개 이상이어도 응답 시간 보장)
+"""
+import math
+import time
+
+import numpy as np
+
+from app.services.geo_index import haversine_km
+
+# 직선거리 → 실제 이동거리 보정 계수 (도로 우회)
+ROAD_FACTOR = 1.3
+DEFAULT_DWELL_MIN = 60.0
+# 하루 가용 시간 중 이동에 쓴다고 보는 비율 (후보를 미리 고를 때 사용)
+TRAVEL_SHARE = 0.25
+
+
+def _to_float(v):
+    try:
+        f = float(v)
+    except (TypeError, ValueError):
+        return None
+    return f if math.isfinite(f) else None
+
+
+def distance_matrix_km(lats, lngs):
+    """(n,) 위도·경도 → (n × n) 대원 거리 행렬 (브로드캐스팅 한 번)."""
+    lats = np.asarray(lats, dtype=np.float64)
+    lngs = np.asarray(lngs, dtype=np.float64)
+    return haversine_km(lats[:, None], lngs[:, None], lats[None, :], lngs[None, :])
+
+
+def nearest_neighbor_order(dist, start: int = 0, deadline: float | None = None):
+    """start에서 출발해 매번 가장 가까운 미방문 장소로 이동하는 순서. deadline이 지나면 남은 장소는 입력 순서대로 붙임."""
+    n = dist.shape[0]
+    visited = np.zeros(n, dtype=bool)
+    order = [start]
+    visited[start] = True
+    for _ in range(n - 1):
+        if deadline is not None and time.monotonic() > deadline:
+            order.extend(np.flatnonzero(~visited).tolist())
+            break
+        d = np.where(visited, np.inf, dist[order[-1]])
+        nxt = int(np.argmin(d))
+        order.append(nxt)
+        visited[nxt] = True
+    return np.asarray(order, dtype=np.int64)
+
+
+def two_opt(order, dist, deadline: float):
+    """
+    열린 경로(출발지 고정, 복귀 없음) 2-opt. 구간 뒤집기 이득을 i마다 모든 j에 대해 벡터로 계산해 가장 좋은 것을 적용.
+    개선이 없거나 deadline(time.monotonic 기준)이 지나면 종료 → (순서, 수렴 여부)
+    """
+    path = np.asarray(order, dtype=np.int64).copy()
+    n = path.size
+    if n < 4:
+        return path, True
+    improved = True
+    while improved:
+        improved = False
+        for i in range(0, n - 2):
+            if time.monotonic() > deadline:
+                return path, False
+            a, b = path[i], path[i + 1]
+            c = path[i + 2:]                      # j = i+2 .. n-1
+            d_next = np.append(path[i + 3:], -1)  # j+1 (마지막 j는 다음 장소 없음)
+            delta = dist[a, c] - dist[a, b]
+            has_next = d_next >= 0
+            delta[has_next] += dist[b, d_next[has_next]] - dist[c[has_next], d_next[has_next]]
+            j = int(np.argmin(delta))
+            if delta[j] < -1e-9:
+                j += i + 2
+                path[i + 1:j + 1] = path[i + 1:j + 1][::-1]
+                improved = True
+    return path, True
+
+
+def plan_itinerary(
+    places: list,
+    days: int = 1,
+    day_minutes: float = 480.0,
+    speed_kmh: float = 30.0,
+    deadline_ms: float = 300.0,
+):
+    """
+    places: [{"name", "lat", "lng", "residence_time_min"?, ...}] (앞쪽일수록 우선순위 높음, 첫 장소에서 출발)
+    반환: {"days": [{"day", "stops": [...], "total_min", "distance_km"}], "unscheduled": [...],
+           "total_distance_km", "optimized"(2-opt 수렴 여부), "elapsed_ms"}
+    """
+    started = time.monotonic()
+    deadline = started + max(float(deadline_ms), 1.0) / 1000.0
+    days = max(int(days or 1), 1)
+    day_minutes = max(float(day_minutes or 480.0), 30.0)
+    speed_kmh = max(float(speed_kmh or 30.0), 1.0)
+
+    valid, unscheduled = [], []
+    for p in places or []:
+        lat, lng = _to_float(p.get("lat")), _to_float(p.get("lng"))
+        if lat is None or lng is None:
+            unscheduled.append({"name": p.get("name", ""), "reason": "좌표 없음"})
+        else:
+            valid.append((p, lat, lng))
+    # 후보가 일정보다 많으면 우선순위(입력 순서)대로, 체류 시간 합이 이동 몫(TRAVEL_SHARE)을 뺀 가용 시간 안에 들도록 먼저 고름
+    budget = days * day_minutes * (1.0 - TRAVEL_SHARE)
+    picked, used = [], 0.0
+    for v in valid:
+        d = _to_float(v[0].get("residence_time_min")) or DEFAULT_DWELL_MIN
+        if picked and used + d > budget:
+            unscheduled.append({"name": v[0].get("name", ""), "reason": "일정 시간 부족"})
+            continue
+        picked.append(v)
+        used += d
+    valid = picked
+    if not valid:
+        return {"days": [], "unscheduled": unscheduled, "total_distance_km": 0.0, "optimized": True,
+                "elapsed_ms": round((time.monotonic() - started) * 1000, 1)}
+
+    lats = np.array([v[1] for v in valid])
+    lngs = np.array([v[2] for v in valid])
+    dist = distance_matrix_km(lats, lngs) * ROAD_FACTOR
+    dwell = np.array([_to_float(v[0].get("residence_time_min")) or DEFAULT_DWELL_MIN for v in valid])
+    travel_min = dist / speed_kmh * 60.0
+
+    order, converged = two_opt(nearest_neighbor_order(dist, 0, deadline), dist, deadline)
+
+    # 방문 순서대로 하루 가용 시간 안에 넣고, 넘치면 다음 날로 (다음 날은 그 장소 근처 숙소에서 출발한다고 보고 이동 0분)
+    plan_days, cur, elapsed, prev = [], [], 0.0, None
+    for idx in order.tolist():
+        move = float(travel_min[prev, idx]) if prev is not None and cur else 0.0
+        need = move + float(dwell[idx])
+        if cur and elapsed + need > day_minutes:
+            plan_days.append(cur)
+            cur, elapsed, move = [], 0.0, 0.0
+            need = float(dwell[idx])
+        if len(plan_days) >= days:
+            unscheduled.append({"name": valid[idx][0].get("name", ""), "reason": "일정 시간 부족"})
+            continue
+        p = valid[idx][0]
+        stop = {k: v for k, v in p.items() if k not in ("lat", "lng")}
+        stop.update({
+            "lat": valid[idx][1],
+            "lng": valid[idx][2],
+            "travel_min": round(move, 1),
+            "distance_km": round(float(dist[prev, idx]) if prev is not None and cur else 0.0, 2),
+            "arrive_min": round(elapsed + move, 1),
+            "leave_min": round(elapsed + need, 1),
+            "dwell_min": round(float(dwell[idx]), 1),
+        })
+        cur.append(stop)
+        elapsed += need
+        prev = idx
+    if cur and len(plan_days) < days:
+        plan_days.append(cur)
+
+    out_days = []
+    for d, stops in enumerate(plan_days, 1):
+        out_days.append({
+            "day": d,
+            "stops": stops,
+            "total_min": stops[-1]["leave_min"] if stops else 0.0,
+            "distance_km": round(sum(s["distance_km"] for s in stops), 2),
+        })
+    return {
+        "days": out_days,
+        "unscheduled": unscheduled,
+        "total_distance_km": round(sum(d["distance_km"] for d in out_days), 2),
+        "optimized": converged,
+        "elapsed_ms": round((time.monotonic() - started) * 1000, 1),
+    }
@@ -0,0 +1,230 @@
+"""
+여행 챗봇 키워드 매처 (Aho-Corasick)
+의도·지역·테마·인원·who·why·계절·교통·예산·여행 타입 키워드 표(app/domain)를 서버 시작 후 한 번만 오토마톤으로 컴파일하고,
+발화는 한 번만 훑어서 모든 슬롯의 적중을 한꺼번에 돌려줍니다. (노드마다 키워드 목록을 돌며 `in` 검사하던 것을 대체)
+- 지역 사전: 기본 9개 도시 + data/place.csv 주소의 시/군/구 전부 (키워드 수가 늘어도 발화당 비용은 발화 길이에만 비례)
+  광역시·특별시·제주·세종의 구/군은 해당 시로("해운대구"/"해운대" → 부산), 도의 시/군은 그 이름으로("진주시"/"진주" → 진주)
+- 같은 슬롯에서 더 긴 키워드 안에 들어 있는 짧은 적중은 버림 ("비싼" 안의 "싼", "찜 목록" 안의 "찜")
+- 접미사를 뗀 지명 약칭("고양", "진주")은 뒤에 한글이 이어지면 조사·여행 명사일 때만 인정 ("고양이랑"의 "고양"은 무시)
+"""
+import csv
+import os
+import threading
+from functools import lru_cache
+
+from app.domain.travel_keywords import REGION_KEYWORDS, SLOT_TABLES
+from app.domain.travel_style import KEYWORD_TO_TYPE, TRAVEL_TYPES
+
+# 주소 첫 토큰 → 시/도 (약칭·정식 명칭 모두)
+SIDO_NAMES = {
+    "서울": "서울", "서울시": "서울", "서울특별시": "서울",
+    "부산": "부산", "부산시": "부산", "부산광역시": "부산",
+    "대구": "대구", "대구시": "대구", "대구광역시": "대구",
+    "인천": "인천", "인천시": "인천", "인천광역시": "인천",
+    "광주": "광주", "광주시": "광주", "광주광역시": "광주",
+    "대전": "대전", "대전시": "대전", "대전광역시": "대전",
+    "울산": "울산", "울산시": "울산", "울산광역시": "울산",
+    "세종": "세종", "세종시": "세종", "세종특별자치시": "세종",
+    "제주": "제주", "제주도": "제주", "제주특별자치도": "제주",
+    "경기": "경기", "경기도": "경기",
+    "강원": "강원", "강원도": "강원", "강원특별자치도": "강원",
+    "충북": "충북", "충청북도": "충북", "충남": "충남", "충청남도": "충남",
+    "전북": "전북", "전라북도": "전북", "전북특별자치도": "전북", "전남": "전남", "전라남도": "전남",
+    "경북": "경북", "경상북도": "경북", "경남": "경남", "경상남도": "경남",
+}
+# 구/군(제주는 시)을 지역값 대신 시 이름으로 묶는 시/도
+METRO_SIDO = {"서울", "부산", "대구", "인천", "광주", "대전", "울산", "세종", "제주"}
+# 접미사를 뗀 약칭이 일반 명사와 겹치는 지명 (전체 이름으로만 인식. 예: "예산" → 예산군만)
+SHORT_NAME_STOPWORDS = {"수영", "연수", "예산", "장수", "구미", "음성", "상주"}
+# 지명 약칭 바로 뒤에 와도 되는 말 (그 외 한글이 붙으면 다른 단어의 일부로 봄. "이"는 "고양이"와 겹쳐 제외)
+ALIAS_SUFFIXES = (
+    "에서", "으로", "에", "로", "랑", "까지", "부터", "쪽", "근처", "여행", "시내", "역", "맛집", "숙소", "호텔", "바다", "해변", "해수욕장",
+)
+
+
+def travel_type_table():
+    """KEYWORD_TO_TYPE → [(타입, 키워드 목록)] (TRAVEL_TYPES 순서)"""
+    return [(t, [kw for kw, kt in KEYWORD_TO_TYPE.items() if kt == t]) for t in TRAVEL_TYPES if t in KEYWORD_TO_TYPE.values()]
+
+
+def load_region_gazetteer(place_path: str) -> list:
+    """
+    place.csv 도로명/지번 주소 → [(지역값, [지명...])] (주소 첫 등장 순).
+    "경남 진주시 ..." → ("진주", ["진주시", "진주"]), "부산 해운대구 ..." → ("부산", ["해운대구", "해운대"])
+    여러 시에 있는 이름("중구", "동구")은 어느 지역인지 알 수 없으므로 제외.
+    """
+    owners: dict[str, set] = {}
+    order: dict[str, list] = {}
+    try:
+        with open(place_path, "r", encoding="utf-8-sig", newline="") as f:
+            for row in csv.DictReader(f):
+                for col in ("ROAD_NM_ADDR", "LOTNO_ADDR"):
+                    tokens = str(row.get(col) or "").split()
+                    if len(tokens) < 2 or tokens[0] not in SIDO_NAMES or tokens[1][-1:] not in ("시", "군", "구"):
+                        continue
+                    sido, name = SIDO_NAMES[tokens[0]], tokens[1]
+                    value = sido if sido in METRO_SIDO else name[:-1]
+                    for n in (name, name[:-1]):
+                        if len(n) >= 2 and n not in SHORT_NAME_STOPWORDS:
+                            owners.setdefault(n, set()).add(value)
+                            if n not in order.setdefault(value, []):
+                                order[value].append(n)
+    except OSError as e:
+        print(f"지역 사전(place.csv) 로드 실패, 기본 도시만 사용: {e}")
+    regions = [(value, [n for n in names if len(owners[n]) == 1]) for value, names in order.items()]
+    return [(value, names) for value, names in regions if names]
+
+
+def clipped_aliases(table) -> set:
+    """[(값, 지명 목록)] 중 다른 지명에서 시/군/구를 뗀 약칭 ("진주시" 옆의 "진주")"""
+    out = set()
+    for _, names in table:
+        full = set(names)
+        out.update(n for n in names if any(n + suffix in full for suffix in ("시", "군", "구")))
+    return out
+
+
+def _is_hangul(ch: str) -> bool:
+    return "가" <= ch <= "힣"
+
+
+class KeywordHits:
+    """슬롯 → [(시작, 끝, 값)] 적중 목록 (발화 내 위치 순)"""
+
+    def __init__(self, hits: dict, priority: dict):
+        self._hits = hits
+        self._priority = priority
+
+    def __contains__(self, slot: str) -> bool:
+        return bool(self._hits.get(slot))
+
+    def values(self, slot: str) -> list:
+        """적중한 값 전체 (표 우선순위 순, 중복 없음)"""
+        found = {v for _, _, v in self._hits.get(slot, ())}
+        return sorted(found, key=self._priority[slot].__getitem__)
+
+    def first(self, slot: str, default=None):
+        """표에서 가장 앞선 적중 값 (기존 `for ... if any(...): break`와 같은 규칙)"""
+        found = self.values(slot)
+        return found[0] if found else default
+
+    def earliest(self, slot: str, default=None):
+        """발화에서 가장 먼저 나온 적중 값 (같은 위치면 긴 키워드)"""
+        hits = self._hits.get(slot)
+        return min(hits, key=lambda h: (h[0], -h[1]))[2] if hits else default
+
+
+class KeywordMatcher:
+    def __init__(self, tables: dict, bounded=()):
+        """
+        tables: 슬롯 → [(값, 키워드 목록)] (우선순위 순). 키워드는 소문자로 비교.
+        bounded: 뒤에 한글이 이어지면 ALIAS_SUFFIXES로 시작할 때만 인정하는 키워드 (지명 약칭)
+        """
+        self.priority = {}
+        bounded = {str(kw).lower() for kw in bounded}
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+        n_patterns = 0
+        for slot, table in tables.items():
+            order = self.priority.setdefault(slot, {})
+            for value, keywords in table:
+                order.setdefault(value, len(order))
+                for kw in keywords:
+                    kw = str(kw).lower()
+                    if kw:
+                        self._add(kw, (slot, value, len(kw), kw in bounded))
+                        n_patterns += 1
+        self._build()
+        self.n_patterns = n_patterns
+
+    def _add(self, pattern: str, output) -> None:
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = nxt
+        if output not in self._out[state]:
+            self._out[state] = self._out[state] + (output,)
+
+    def _build(self) -> None:
+        """BFS로 실패 링크 계산, 출력은 실패 링크 쪽 것까지 미리 합쳐 둠"""
+        queue = list(self._goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for ch, nxt in self._goto[state].items():
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+                queue.append(nxt)
+
+    def match(self, text: str) -> KeywordHits:
+        """발화를 한 번 훑어 모든 슬롯의 적중 반환"""
+        goto, fail, out = self._goto, self._fail, self._out
+        hits: dict[str, list] = {}
+        state = 0
+        text = str(text or "").lower()
+        for end, ch in enumerate(text, 1):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for slot, value, length, bounded in out[state]:
+                if bounded and end < len(text) and _is_hangul(text[end]) and not text.startswith(ALIAS_SUFFIXES, end):
+                    continue
+                hits.setdefault(slot, []).append((end - length, end, value))
+        for slot, found in hits.items():
+            if len(found) > 1:  # 같은 슬롯의 더 긴 적중 안에 든 짧은 적중 제거
+                hits[slot] = [h for h in found if not any(o[0] <= h[0] and h[1] <= o[1] and o[1] - o[0] > h[1] - h[0] for o in found)]
+        return KeywordHits(hits, self.priority)
+
+
+def default_tables(place_path=None) -> dict:
+    """도메인 키워드 표 + 여행 타입 + place.csv 지역 사전"""
+    tables = dict(SLOT_TABLES)
+    tables["travel_type"] = travel_type_table()
+    if place_path is None:
+        base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        place_path = os.path.join(base_dir, "data", "place.csv")
+    known = {kw for _, kws in REGION_KEYWORDS for kw in kws}
+    # 다른 슬롯 키워드와 겹치는 지명 약칭은 제외 (예: 관심사 "수영")
+    reserved = {kw for slot, table in tables.items() if slot != "region" for _, kws in table for kw in kws}
+    gazetteer = []
+    for value, names in load_region_gazetteer(place_path):
+        names = [n for n in names if n not in known and n not in reserved]
+        if names:
+            gazetteer.append((value, names))
+            known.update(names)
+    tables["region"] = list(REGION_KEYWORDS) + gazetteer
+    return tables
+
+
+_default_matcher = None
+_default_lock = threading.Lock()
+
+
+def get_keyword_matcher() -> KeywordMatcher:
+    """프로세스 공용 매처 (첫 호출 시 한 번 컴파일)"""
+    global _default_matcher
+    if _default_matcher is None:
+        with _default_lock:
+            if _default_matcher is None:
+                tables = default_tables()
+                matcher = KeywordMatcher(tables, bounded=clipped_aliases(tables["region"]))
+                print(f"키워드 매처: 패턴 {matcher.n_patterns}개, 지역 {len(matcher.priority['region'])}개")
+                _default_matcher = matcher
+    return _default_matcher
+
+
+@lru_cache(maxsize=1024)
+def match_keywords(text: str) -> KeywordHits:
+    """공용 매처로 발화 매칭. 같은 턴의 의도·추출·fallback 노드가 같은 발화를 다시 훑지 않도록 결과를 재사용."""
+    return get_keyword_matcher().match(text)
@@ -0,0 +1,199 @@
+"""
+Gemini 모델별 서킷 브레이커 + 토큰 버킷 입장 제어 (LLM 게이트웨이가 호출 전후에 사용)
+429/할당량 초과가 이어지는데도 요청마다 LLM_TIMEOUT_SEC까지 기다린 뒤 fallback하지 않도록,
+- 최근 LLM_BREAKER_WINDOW_SEC 동안 오류율이 LLM_BREAKER_ERROR_RATE 이상이면(최소 LLM_BREAKER_MIN_CALLS건) 회로를 열고
+  LLM_BREAKER_COOLDOWN_SEC(429의 Retry-After가 더 길면 그 값) 동안 호출 없이 바로 거절 → 호출부는 즉시 키워드/템플릿 fallback
+- 쿨다운이 끝나면 시험 호출 1건만 통과(half_open), 성공하면 닫고 실패하면 다시 엶
+- 토큰 버킷(초당 LLM_RATE_PER_SEC, 최대 LLM_RATE_BURST)과 동시 호출 수(LLM_MAX_CONCURRENCY)를 넘는 호출도 기다리지 않고 거절
+상태·카운터는 metrics()로 노출 (GET /api/v1/llm/metrics).
+"""
+import threading
+import time
+from collections import deque
+
+try:
+    from app.core.config import settings
+except Exception:
+    settings = None
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+def _conf(name, default):
+    return getattr(settings, name, default) if settings else default
+
+
+def is_breaker_failure(status) -> bool:
+    """회로 오류율에 넣는 실패: 429(할당량), 5xx, 상태 코드 없음(타임아웃·연결 실패). 400/401/404 등은 호출 쪽 문제라 제외."""
+    return status is None or status == 429 or status >= 500
+
+
+class TokenBucket:
+    """초당 rate개씩 채워지고 최대 burst개까지 쌓이는 토큰. try_acquire는 기다리지 않음."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, now: float) -> bool:
+        self._refill(now)
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return True
+        return False
+
+    def tokens(self, now: float) -> float:
+        self._refill(now)
+        return self._tokens
+
+
+class ModelGuard:
+    """모델 1개의 회로 상태 + 입장 제어. admit() → 통과 여부와 거절 사유, 호출 후 record()."""
+
+    def __init__(
+        self,
+        model: str,
+        window_sec: float = 30.0,
+        min_calls: int = 5,
+        error_rate: float = 0.5,
+        cooldown_sec: float = 30.0,
+        rate_per_sec: float = 5.0,
+        burst: float = 10.0,
+        max_concurrency: int = 8,
+    ):
+        self.model = model
+        self.window_sec = float(window_sec)
+        self.min_calls = int(min_calls)
+        self.error_rate = float(error_rate)
+        self.cooldown_sec = float(cooldown_sec)
+        self.max_concurrency = int(max_concurrency)
+        self.bucket = TokenBucket(rate_per_sec, burst)
+        self._outcomes = deque()  # (시각, 실패 여부)
+        self._state = CLOSED
+        self._opened_until = 0.0
+        self._probe_in_flight = False
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self.counters = {"admitted": 0, "rejected_open": 0, "rejected_rate": 0, "rejected_concurrency": 0, "success": 0, "failure": 0, "opened": 0}
+
+    def _trim(self, now: float) -> None:
+        while self._outcomes and now - self._outcomes[0][0] > self.window_sec:
+            self._outcomes.popleft()
+
+    def _open(self, now: float, cooldown: float) -> None:
+        self._state = OPEN
+        self._opened_until = now + cooldown
+        self._probe_in_flight = False
+        self._outcomes.clear()
+        self.counters["opened"] += 1
+
+    def admit(self):
+        """(통과 여부, 거절 사유). 통과했으면 반드시 record()(취소 시 release())로 결과를 알려야 함."""
+        now = time.monotonic()
+        with self._lock:
+            if self._state == OPEN:
+                if now < self._opened_until:
+                    self.counters["rejected_open"] += 1
+                    return False, "circuit_open"
+                self._state = HALF_OPEN
+            if self._state == HALF_OPEN:
+                if self._probe_in_flight:
+                    self.counters["rejected_open"] += 1
+                    return False, "circuit_open"
+            if self._in_flight >= self.max_concurrency:
+                self.counters["rejected_concurrency"] += 1
+                return False, "concurrency_limit"
+            if not self.bucket.try_acquire(now):
+                self.counters["rejected_rate"] += 1
+                return False, "rate_limited"
+            if self._state == HALF_OPEN:
+                self._probe_in_flight = True
+            self._in_flight += 1
+            self.counters["admitted"] += 1
+            return True, None
+
+    def record(self, status=200, retry_after=None) -> None:
+        """호출 결과 기록. status: HTTP 상태 코드(타임아웃·연결 실패는 None), retry_after: 429 응답의 Retry-After(초)."""
+        now = time.monotonic()
+        failed = is_breaker_failure(status)
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+            self.counters["failure" if failed else "success"] += 1
+            cooldown = max(self.cooldown_sec, float(retry_after or 0))
+            if self._state == HALF_OPEN:
+                if failed:
+                    self._open(now, cooldown)
+                else:
+                    self._state = CLOSED
+                    self._probe_in_flight = False
+                return
+            self._outcomes.append((now, failed))
+            self._trim(now)
+            if failed:
+                n = len(self._outcomes)
+                errors = sum(1 for _, f in self._outcomes if f)
+                if n >= self.min_calls and errors / n >= self.error_rate:
+                    self._open(now, cooldown)
+
+    def release(self) -> None:
+        """결과 없이 끝난 호출(취소됨) 정리. 오류율에 넣지 않음."""
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+            if self._state == HALF_OPEN:
+                self._probe_in_flight = False
+
+    def snapshot(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            self._trim(now)
+            n = len(self._outcomes)
+            errors = sum(1 for _, f in self._outcomes if f)
+            state = self._state
+            if state == OPEN and now >= self._opened_until:
+                state = HALF_OPEN
+            return {
+                "model": self.model,
+                "state": state,
+                "open_remaining_sec": round(max(0.0, self._opened_until - now), 1) if state == OPEN else 0.0,
+                "window_calls": n,
+                "window_error_rate": round(errors / n, 3) if n else 0.0,
+                "in_flight": self._in_flight,
+                "tokens": round(self.bucket.tokens(now), 2),
+                **self.counters,
+            }
+
+
+_guards = {}
+_guards_lock = threading.Lock()
+
+
+def get_guard(model: str) -> ModelGuard:
+    """모델별 공용 가드 (첫 호출 시 config 값으로 생성)."""
+    guard = _guards.get(model)
+    if guard is None:
+        with _guards_lock:
+            guard = _guards.get(model)
+            if guard is None:
+                guard = ModelGuard(
+                    model,
+                    window_sec=_conf("LLM_BREAKER_WINDOW_SEC", 30),
+                    min_calls=_conf("LLM_BREAKER_MIN_CALLS", 5),
+                    error_rate=_conf("LLM_BREAKER_ERROR_RATE", 0.5),
+                    cooldown_sec=_conf("LLM_BREAKER_COOLDOWN_SEC", 30),
+                    rate_per_sec=_conf("LLM_RATE_PER_SEC", 5),
+                    burst=_conf("LLM_RATE_BURST", 10),
+                    max_concurrency=_conf("LLM_MAX_CONCURRENCY", 8),
+                )
+                _guards[model] = guard
+    return guard
+
+
+def metrics() -> dict:
+    """모델별 회로·입장 제어 상태"""
+    return {"models": [g.snapshot() for g in list(_guards.values())]}
@@ -1,26 +1,283 @@
-from app.core.config import settings
+"""
+LLM 게이트웨이 (Gemini REST API 공용 호출부)
+여행 그래프 노드, 여행 스타일 분석, 이미지 추천 가이드가 모두 이 서비스로 Gemini를 호출합니다.
+- 오래 유지되는 httpx 클라이언트(커넥션 풀) 하나를 재사용해 TCP/TLS 연결을 매 호출마다 새로 맺지 않습니다.
+  (비동기 클라이언트는 이벤트 루프별 1개, 동기 호출부용 동기 클라이언트 1개)
+- 호출부(site)별 타임아웃: LLM_SITE_TIMEOUTS, 없으면 LLM_TIMEOUT_SEC
+- generate(비동기), stream(비동기, SSE 조각), generate_sync(동기 호출부용)
+- 모델별 서킷 브레이커·토큰 버킷(app/services/llm_guard.py): 429/할당량 오류가 이어지거나 한도를 넘으면
+  네트워크 호출 없이 바로 LLMUnavailableError → 호출부는 기다리지 않고 fallback
+"""
+import asyncio
+import base64
+import io
+import json
+import os
+import threading
+from typing import Any, AsyncIterator, Optional
+
+import httpx
+
 from app.schemas.chat import ChatRequest, ChatResponse
+from app.services.llm_guard import get_guard
+
+try:
+    from app.core.config import settings
+except Exception:
+    settings = None
+
+GEMINI_BASE = "https://generativelanguage.googleapis.com/v1beta/models"
+DEFAULT_MODEL = "gemini-2.5-flash"
+
+
+class LLMError(Exception):
+    """Gemini 호출 실패. status: HTTP 상태 코드 (네트워크 오류 등은 None)"""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class LLMTimeoutError(LLMError, TimeoutError):
+    """호출부 타임아웃 초과 (asyncio.TimeoutError로도 잡힘)"""
+
+
+class LLMUnavailableError(LLMError):
+    """회로 열림·호출 한도 초과로 호출하지 않고 바로 거절. reason: circuit_open | rate_limited | concurrency_limit"""
+
+    def __init__(self, message: str, reason: str):
+        super().__init__(message, status=503)
+        self.reason = reason
+
+
+def _api_key() -> Optional[str]:
+    key = (getattr(settings, "GOOGLE_API_KEY", None) if settings else None) or os.getenv("GOOGLE_API_KEY") or os.getenv("GEMINI_API_KEY")
+    return (key or "").strip() or None
+
+
+def _part(item) -> dict:
+    """문자열 → text part, 이미지(PIL/bytes) → inline_data(JPEG base64) part"""
+    if isinstance(item, str):
+        return {"text": item}
+    if isinstance(item, (bytes, bytearray)):
+        from PIL import Image
+        item = Image.open(io.BytesIO(item))
+    if hasattr(item, "save"):
+        buf = io.BytesIO()
+        item.convert("RGB").save(buf, format="JPEG", quality=85)
+        return {"inline_data": {"mime_type": "image/jpeg", "data": base64.b64encode(buf.getvalue()).decode("ascii")}}
+    return {"text": str(item)}
+
+
+def _retry_after(response: httpx.Response):
+    try:
+        return float(response.headers.get("retry-after", ""))
+    except ValueError:
+        return None
+
+
+def _extract_text(data: dict) -> str:
+    candidates = data.get("candidates") or []
+    if not candidates:
+        return ""
+    parts = (candidates[0].get("content") or {}).get("parts") or []
+    return "".join(p.get("text", "") for p in parts)
+
 
 class LLMService:
-    def __init__(self):
-        self.api_key = settings.OPENAI_API_KEY
-        # Initialize client here if using OpenAI SDK
-        # self.client = AsyncOpenAI(api_key=self.api_key)
+    def __init__(self, api_key: Optional[str] = None, transport: Optional[httpx.AsyncBaseTransport] = None, sync_transport=None):
+        self._explicit_key = api_key
+        self._transport = transport
+        self._sync_transport = sync_transport
+        self._async_clients = {}  # 이벤트 루프 → AsyncClient
+        self._sync_client = None
+        self._lock = threading.Lock()
+
+    # ---------- 설정 ----------
+    @property
+    def api_key(self) -> Optional[str]:
+        return self._explicit_key or _api_key()
+
+    @property
+    def available(self) -> bool:
+        return bool(self.api_key)
+
+    def timeout_for(self, site: str) -> float:
+        default = getattr(settings, "LLM_TIMEOUT_SEC", 25) if settings else 25
+        per_site = getattr(settings, "LLM_SITE_TIMEOUTS", {}) if settings else {}
+        return float((per_site or {}).get(site, default))
+
+    def _limits(self) -> httpx.Limits:
+        size = getattr(settings, "LLM_POOL_SIZE", 20) if settings else 20
+        return httpx.Limits(max_connections=size, max_keepalive_connections=size, keepalive_expiry=120.0)
+
+    # ---------- 클라이언트 (오래 유지, 커넥션 재사용) ----------
+    def _client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None or client.is_closed:
+            with self._lock:
+                # 닫힌 루프의 클라이언트는 정리
+                for old in [lp for lp in self._async_clients if lp.is_closed()]:
+                    self._async_clients.pop(old, None)
+                client = httpx.AsyncClient(limits=self._limits(), transport=self._transport, http2=False)
+                self._async_clients[loop] = client
+        return client
+
+    def _client_sync(self) -> httpx.Client:
+        if self._sync_client is None or self._sync_client.is_closed:
+            with self._lock:
+                if self._sync_client is None or self._sync_client.is_closed:
+                    self._sync_client = httpx.Client(limits=self._limits(), transport=self._sync_transport)
+        return self._sync_client
+
+    async def aclose(self):
+        for client in list(self._async_clients.values()):
+            await client.aclose()
+        self._async_clients.clear()
+        if self._sync_client is not None:
+            self._sync_client.close()
+
+    # ---------- 요청 구성 ----------
+    def _request(self, contents, system, temperature, json_mode, model, stream=False):
+        key = self.api_key
+        if not key:
+            raise LLMError("GOOGLE_API_KEY(GEMINI_API_KEY)가 설정되지 않았습니다. api key 없음", status=401)
+        items = contents if isinstance(contents, list) else [contents]
+        body: dict[str, Any] = {"contents": [{"role": "user", "parts": [_part(i) for i in items]}]}
+        if system:
+            body["systemInstruction"] = {"parts": [{"text": system}]}
+        config = {}
+        if temperature is not None:
+            config["temperature"] = temperature
+        if json_mode:
+            config["responseMimeType"] = "application/json"
+        if config:
+            body["generationConfig"] = config
+        action = "streamGenerateContent?alt=sse" if stream else "generateContent"
+        url = f"{GEMINI_BASE}/{model or DEFAULT_MODEL}:{action}"
+        return url, {"x-goog-api-key": key, "Content-Type": "application/json"}, body
+
+    @staticmethod
+    def _admit(model: str, site: str):
+        """모델 가드 통과 확인. 거절이면 LLMUnavailableError (네트워크 호출 없음)."""
+        guard = get_guard(model)
+        ok, reason = guard.admit()
+        if not ok:
+            raise LLMUnavailableError(f"Gemini [{model}] {reason} — [{site}] 호출 생략", reason=reason)
+        return guard
+
+    @staticmethod
+    def _check(response: httpx.Response, model: str) -> None:
+        if response.status_code >= 400:
+            raise LLMError(f"Gemini [{model}] HTTP {response.status_code}: {response.text[:300]}", status=response.status_code)
+
+    # ---------- 호출 ----------
+    async def generate(
+        self,
+        contents,
+        *,
+        site: str = "default",
+        system: Optional[str] = None,
+        temperature: Optional[float] = None,
+        json_mode: bool = False,
+        model: Optional[str] = None,
+    ) -> str:
+        """contents(문자열/이미지 또는 그 목록) → 응답 텍스트. 호출부 타임아웃 초과 시 LLMTimeoutError."""
+        model = model or DEFAULT_MODEL
+        url, headers, body = self._request(contents, system, temperature, json_mode, model)
+        timeout = self.timeout_for(site)
+        guard = self._admit(model, site)
+        status, retry_after, cancelled = None, None, False
+        try:
+            response = await self._client().post(url, headers=headers, json=body, timeout=timeout)
+            status, retry_after = response.status_code, _retry_after(response)
+        except asyncio.CancelledError:
+            cancelled = True  # 헤징에서 진 호출 등: 모델 실패로 세지 않음
+            raise
+        except httpx.TimeoutException as e:
+            raise LLMTimeoutError(f"Gemini [{site}] {timeout}초 타임아웃") from e
+        except httpx.HTTPError as e:
+            raise LLMError(f"Gemini [{site}] 연결 실패: {e}") from e
+        finally:
+            guard.release() if cancelled else guard.record(status, retry_after)
+        self._check(response, model)
+        return _extract_text(response.json())
+
+    async def stream(
+        self,
+        contents,
+        *,
+        site: str = "default",
+        system: Optional[str] = None,
+        temperature: Optional[float] = None,
+        model: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        """응답을 조각(SSE) 단위로 yield. 타임아웃은 조각 사이 대기 시간 기준."""
+        model = model or DEFAULT_MODEL
+        url, headers, body = self._request(contents, system, temperature, False, model, stream=True)
+        timeout = self.timeout_for(site)
+        guard = self._admit(model, site)
+        status, retry_after, cancelled = None, None, False
+        try:
+            async with self._client().stream("POST", url, headers=headers, json=body, timeout=timeout) as response:
+                status, retry_after = response.status_code, _retry_after(response)
+                if response.status_code >= 400:
+                    await response.aread()
+                    self._check(response, model)
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    text = _extract_text(json.loads(line[5:].strip() or "{}"))
+                    if text:
+                        yield text
+        except asyncio.CancelledError:
+            cancelled = status is None
+            raise
+        except httpx.TimeoutException as e:
+            status = None  # 조각 사이 타임아웃·연결 끊김도 실패로 기록
+            raise LLMTimeoutError(f"Gemini [{site}] {timeout}초 타임아웃") from e
+        except httpx.HTTPError as e:
+            status = None
+            raise LLMError(f"Gemini [{site}] 연결 실패: {e}") from e
+        finally:
+            guard.release() if cancelled else guard.record(status, retry_after)
+
+    def generate_sync(
+        self,
+        contents,
+        *,
+        site: str = "default",
+        system: Optional[str] = None,
+        temperature: Optional[float] = None,
+        json_mode: bool = False,
+        model: Optional[str] = None,
+    ) -> str:
+        """동기 호출부(이미지 추천 서비스 등)용. 동기 커넥션 풀 재사용."""
+        model = model or DEFAULT_MODEL
+        url, headers, body = self._request(contents, system, temperature, json_mode, model)
+        timeout = self.timeout_for(site)
+        guard = self._admit(model, site)
+        status, retry_after = None, None
+        try:
+            response = self._client_sync().post(url, headers=headers, json=body, timeout=timeout)
+            status, retry_after = response.status_code, _retry_after(response)
+        except httpx.TimeoutException as e:
+            raise LLMTimeoutError(f"Gemini [{site}] {timeout}초 타임아웃") from e
+        except httpx.HTTPError as e:
+            raise LLMError(f"Gemini [{site}] 연결 실패: {e}") from e
+        finally:
+            guard.record(status, retry_after)
+        self._check(response, model)
+        return _extract_text(response.json())
 
     async def generate_response(self, chat_request: ChatRequest) -> ChatResponse:
-        """
-        Logic to send request to LLM and get response.
-        Currently mocking the response for structural demonstration.
-        """
-        # Logic to call actual LLM API would go here
-        # response = await self.client.chat.completions.create(...)
-        
-        # Mock response
-        mock_reply = f"This is a response from the LLM based on input: {chat_request.messages[-1].content}"
-        
-        return ChatResponse(
-            response=mock_reply,
-            usage={"prompt_tokens": 10, "completion_tokens": 20, "total_tokens": 30}
-        )
+        """ChatRequest(대화 목록) → ChatResponse. system 역할은 systemInstruction으로, 나머지는 순서대로 합침."""
+        system = "\n".join(m.content for m in chat_request.messages if m.role == "system") or None
+        convo = "\n".join(f"{m.role}: {m.content}" for m in chat_request.messages if m.role != "system")
+        model = chat_request.model if (chat_request.model or "").startswith("gemini") else None
+        text = await self.generate(convo, site="chat", system=system, temperature=chat_request.temperature, model=model)
+        return ChatResponse(response=text)
+
 
 llm_service = LLMService()
@@ -0,0 +1,208 @@
+"""
+로컬 경량 여행 분류기 (키워드 fallback과 Gemini 사이의 중간 단계)
+Gemini가 분류한 발화 기록(classifier_cache의 classifier_log)으로 학습한 문자 n-gram 로지스틱 회귀가
+who / why / season / transport를 예측하고, 보정된 확신도가 CLASSIFIER_LOCAL_THRESHOLD 이상이면 LLM을 부르지 않습니다.
+- 특징: 정규화 텍스트의 문자 1~3-gram을 crc32로 2^15차원에 해싱(이진, L2 정규화) — 형태소 분석기 없이 한국어 조사·띄어쓰기 변화에 강함
+- 모델: 항목(head)별 다항 로지스틱 회귀(numpy, 희소 행 직접 계산). 확신도는 홀드아웃으로 맞춘 온도(temperature)로 보정
+- 처음 보는 표현(학습 때 본 n-gram 비율이 낮음)은 확신도와 상관없이 LLM으로 넘김
+- 파일: embedding_cache/local_classifier.npz (W_/b_/classes_/temperature_<head>, seen 비트맵, meta JSON) — scripts/train_local_classifier.py가 생성
+"""
+import json
+import os
+import zlib
+
+import numpy as np
+
+from app.services.classifier_cache import normalize_text
+
+try:
+    from app.core.config import settings
+except Exception:
+    settings = None
+
+MODEL_FILE_NAME = "local_classifier.npz"
+HEADS = ("who", "why", "season", "transport")
+N_FEATURES = 1 << 15
+NGRAM_RANGE = (1, 3)
+NONE_LABEL = "none"
+
+
+def featurize(text: str, n_features: int = N_FEATURES, ngram_range=NGRAM_RANGE):
+    """텍스트 → (특징 인덱스 int32, 값 float32). 양 끝 표시(^, $)를 붙여 빈 문장도 특징이 1개 이상."""
+    t = "^" + normalize_text(text).replace(" ", "_") + "$"
+    grams = {t[i:i + n] for n in range(ngram_range[0], ngram_range[1] + 1) for i in range(len(t) - n + 1)}
+    idx = np.unique(np.fromiter((zlib.crc32(g.encode("utf-8")) % n_features for g in grams), dtype=np.int64, count=len(grams)))
+    return idx.astype(np.int32), np.full(len(idx), 1.0 / np.sqrt(len(idx)), dtype=np.float32)
+
+
+def head_labels(label: dict) -> dict:
+    """LLM 분류 결과 → 항목별 정답 (없으면 unknown/none)"""
+    constraints = label.get("constraints") or {}
+    when_info = label.get("when_info") or {}
+    return {
+        "who": label.get("who") or "unknown",
+        "why": label.get("why") or "unknown",
+        "season": when_info.get("season") or NONE_LABEL,
+        "transport": constraints.get("transport") or NONE_LABEL,
+    }
+
+
+class SparseRows:
+    """featurize 결과 여러 개를 CSR 배열로 (indptr, indices, values)"""
+
+    def __init__(self, rows):
+        lengths = np.array([len(i) for i, _ in rows], dtype=np.int64)
+        self.indptr = np.concatenate([[0], np.cumsum(lengths)])
+        self.indices = np.concatenate([i for i, _ in rows]) if rows else np.empty(0, dtype=np.int32)
+        self.values = np.concatenate([v for _, v in rows]) if rows else np.empty(0, dtype=np.float32)
+        self.row_of = np.repeat(np.arange(len(rows)), lengths)
+        self.n_rows = len(rows)
+
+    def take(self, row_ids):
+        return SparseRows([(self.indices[self.indptr[r]:self.indptr[r + 1]], self.values[self.indptr[r]:self.indptr[r + 1]]) for r in row_ids])
+
+    def dot(self, W: np.ndarray, b: np.ndarray) -> np.ndarray:
+        contrib = W[self.indices] * self.values[:, None]
+        return np.add.reduceat(contrib, self.indptr[:-1], axis=0) + b
+
+
+def softmax(z: np.ndarray) -> np.ndarray:
+    z = z - z.max(axis=1, keepdims=True)
+    e = np.exp(z)
+    return e / e.sum(axis=1, keepdims=True)
+
+
+def fit_head(X: SparseRows, y: np.ndarray, n_classes: int, n_features: int = N_FEATURES, l2: float = 1e-4, epochs: int = 300, lr: float = 0.1):
+    """다항 로지스틱 회귀 (전체 배치 Adam). → (W, b)"""
+    W = np.zeros((n_features, n_classes), dtype=np.float32)
+    b = np.zeros(n_classes, dtype=np.float32)
+    Y = np.eye(n_classes, dtype=np.float32)[y]
+    mW, vW = np.zeros_like(W), np.zeros_like(W)
+    mb, vb = np.zeros_like(b), np.zeros_like(b)
+    beta1, beta2, eps = 0.9, 0.999, 1e-8
+    for t in range(1, epochs + 1):
+        G = (softmax(X.dot(W, b)) - Y) / X.n_rows
+        gW = l2 * W
+        weighted = G[X.row_of] * X.values[:, None]
+        for c in range(n_classes):  # 특징별 합산 (np.add.at보다 훨씬 빠름)
+            gW[:, c] += np.bincount(X.indices, weights=weighted[:, c], minlength=n_features).astype(np.float32)
+        gb = G.sum(axis=0)
+        for p, g, m, v in ((W, gW, mW, vW), (b, gb, mb, vb)):
+            m *= beta1
+            m += (1 - beta1) * g
+            v *= beta2
+            v += (1 - beta2) * g * g
+            p -= lr * (m / (1 - beta1 ** t)) / (np.sqrt(v / (1 - beta2 ** t)) + eps)
+    return W, b
+
+
+def fit_temperature(logits: np.ndarray, y: np.ndarray) -> float:
+    """홀드아웃 음의 로그우도가 최소인 온도 (격자 탐색)"""
+    best_t, best_nll = 1.0, np.inf
+    for t in np.exp(np.linspace(np.log(0.05), np.log(10.0), 61)):
+        p = softmax(logits / t)[np.arange(len(y)), y]
+        nll = -np.mean(np.log(np.maximum(p, 1e-12)))
+        if nll < best_nll:
+            best_t, best_nll = float(t), nll
+    return best_t
+
+
+class LocalClassifier:
+    def __init__(self, heads: dict, meta: dict, seen=None):
+        """heads: head → (W, b, classes 목록, temperature), seen: 학습 데이터에 나온 특징 여부(bool 배열)"""
+        self.heads = heads
+        self.meta = meta
+        self.n_features = int(meta.get("n_features", N_FEATURES))
+        self.seen = seen
+        self.min_coverage = float(meta.get("min_coverage", 0.6))
+
+    def predict(self, text: str):
+        """
+        텍스트 → ({head: 예측값}, 확신도). 확신도 = 항목별 보정 확률 중 최솟값 (모든 항목이 확실해야 높음).
+        발화 n-gram 중 학습 때 본 비율이 min_coverage 미만이면(처음 보는 표현) 확신도 0 → LLM으로 넘김.
+        """
+        idx, val = featurize(text, self.n_features)
+        out, confidence = {}, 1.0
+        if self.seen is not None and self.seen[idx].mean() < self.min_coverage:
+            confidence = 0.0
+        for head, (W, b, classes, temperature) in self.heads.items():
+            probs = softmax(((val @ W[idx]) + b)[None, :] / temperature)[0]
+            k = int(np.argmax(probs))
+            out[head] = classes[k]
+            confidence = min(confidence, float(probs[k]))
+        return out, confidence
+
+    def save(self, path: str) -> None:
+        arrays = {"meta": np.array(json.dumps(self.meta, ensure_ascii=False))}
+        if self.seen is not None:
+            arrays["seen"] = np.packbits(self.seen)
+        for head, (W, b, classes, temperature) in self.heads.items():
+            arrays[f"W_{head}"] = W.astype(np.float16)  # 대부분 0, 압축 저장
+            arrays[f"b_{head}"] = b
+            arrays[f"classes_{head}"] = np.array(classes)
+            arrays[f"temperature_{head}"] = np.array(temperature, dtype=np.float32)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez_compressed(tmp, **arrays)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str):
+        with np.load(path, allow_pickle=False) as z:
+            meta = json.loads(str(z["meta"]))
+            heads = {
+                head: (z[f"W_{head}"].astype(np.float32), z[f"b_{head}"], [str(c) for c in z[f"classes_{head}"]], float(z[f"temperature_{head}"]))
+                for head in meta.get("heads", HEADS)
+            }
+            seen = np.unpackbits(z["seen"])[: int(meta.get("n_features", N_FEATURES))].astype(bool) if "seen" in z.files else None
+        return cls(heads, meta, seen)
+
+
+def labeled_rows(extra_files=()) -> list:
+    """
+    학습/평가용 [(텍스트, LLM 분류 dict)]: classifier_log(서비스 운영 중 쌓인 LLM 분류) +
+    embedding_cache/semantic_eval_labels.json(의미 캐시 평가 때 받은 LLM 분류) + extra_files(jsonl: message, label)
+    """
+    from app.services.classifier_cache import get_classifier_cache
+
+    rows = dict(get_classifier_cache().read_log())
+    eval_labels = os.path.join(os.path.dirname(default_model_path()), "semantic_eval_labels.json")
+    if os.path.isfile(eval_labels):
+        with open(eval_labels, "r", encoding="utf-8") as f:
+            rows.update(json.load(f))
+    for path in extra_files:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    r = json.loads(line)
+                    if r.get("label"):
+                        rows[r["message"]] = r["label"]
+    return list(rows.items())
+
+
+def default_model_path() -> str:
+    base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    return os.path.join(base_dir, "embedding_cache", MODEL_FILE_NAME)
+
+
+_default_model = None
+_default_loaded = False
+
+
+def get_local_classifier():
+    """embedding_cache/local_classifier.npz가 있으면 로드한 분류기, 없으면 None (첫 호출 시 한 번만 시도)"""
+    global _default_model, _default_loaded
+    if not _default_loaded:
+        _default_loaded = True
+        path = default_model_path()
+        if os.path.isfile(path):
+            try:
+                _default_model = LocalClassifier.load(path)
+                print(f"로컬 분류기 로드: 학습 {_default_model.meta.get('n_samples')}건, 항목별 정확도 {_default_model.meta.get('accuracy')}")
+            except Exception as e:
+                print(f"로컬 분류기 로드 실패: {e}")
+    return _default_model
+
+
+def local_threshold() -> float:
+    return float(getattr(settings, "CLASSIFIER_LOCAL_THRESHOLD", 0.85) if settings else 0.85)
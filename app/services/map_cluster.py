@@ -0,0 +1,147 @@
+"""
+"지도에서 위치 확인하기"용 서버 측 마커 클러스터 (줌 단계별 격자 계층)
+서버 시작 시 장소 좌표(X_COORD=경도, Y_COORD=위도)를 웹 메르카토르 좌표로 바꾸고,
+가장 높은 줌부터 한 단계씩 올라가며 화면 격자(radius_px) 칸마다 아래 단계 클러스터를 합쳐 둡니다.
+요청 시에는 해당 줌 단계 배열에서 영역(bbox) 안의 클러스터만 잘라 돌려주므로, 화면 하나에 마커 수백 개 이내입니다.
+"""
+import math
+
+import numpy as np
+
+TILE_SIZE = 256
+MAX_LAT = 85.05112878
+
+
+def lng_to_x(lng):
+    """경도 → 메르카토르 x (0~1)"""
+    return np.asarray(lng, dtype=np.float64) / 360.0 + 0.5
+
+
+def lat_to_y(lat):
+    """위도 → 메르카토르 y (0~1, 북쪽이 0)"""
+    s = np.sin(np.radians(np.clip(np.asarray(lat, dtype=np.float64), -MAX_LAT, MAX_LAT)))
+    return 0.5 - 0.25 * np.log((1 + s) / (1 - s)) / math.pi
+
+
+def x_to_lng(x):
+    return (np.asarray(x, dtype=np.float64) - 0.5) * 360.0
+
+
+def y_to_lat(y):
+    return np.degrees(2 * np.arctan(np.exp((0.5 - np.asarray(y, dtype=np.float64)) * 2 * math.pi)) - math.pi / 2)
+
+
+class _Level:
+    """한 줌 단계의 클러스터 배열 (x 오름차순 정렬 → bbox는 x 범위 이진 탐색 + y 확인)."""
+
+    def __init__(self, x, y, count, point, expansion_zoom):
+        order = np.argsort(x, kind="stable")
+        self.x = x[order]
+        self.y = y[order]
+        self.count = count[order]
+        self.point = point[order]              # 대표 장소 번호 (count == 1이면 그 장소)
+        self.expansion_zoom = expansion_zoom[order]
+
+    def __len__(self):
+        return int(self.x.size)
+
+    def query(self, x0, y0, x1, y1):
+        s, e = int(np.searchsorted(self.x, x0, side="left")), int(np.searchsorted(self.x, x1, side="right"))
+        idx = np.arange(s, e)
+        ys = self.y[s:e]
+        return idx[(ys >= y0) & (ys <= y1)]
+
+
+class MapClusterIndex:
+    """
+    points: 장소별 (lat, lng, weight). min_zoom~max_zoom 단계마다 클러스터 배열을 미리 만들어 둡니다.
+    max_zoom보다 큰 줌은 개별 장소(클러스터 없음) 단계로 응답합니다.
+    """
+
+    def __init__(self, lats, lngs, weights=None, min_zoom: int = 0, max_zoom: int = 16, radius_px: float = 60.0):
+        lats = np.asarray(lats, dtype=np.float64)
+        lngs = np.asarray(lngs, dtype=np.float64)
+        valid = (
+            np.isfinite(lats) & np.isfinite(lngs)
+            & (np.abs(lats) <= 90) & (np.abs(lngs) <= 180)
+            & ~((lats == 0) & (lngs == 0))
+        )
+        self.point_ids = np.nonzero(valid)[0]  # 클러스터 장소 번호 → 입력 순서 번호
+        self.min_zoom = max(int(min_zoom), 0)
+        self.max_zoom = max(int(max_zoom), self.min_zoom)
+        self.radius_px = float(radius_px) if radius_px and radius_px > 0 else 60.0
+        w = np.ones(lats.size) if weights is None else np.asarray(weights, dtype=np.float64)
+        w = np.where(np.isfinite(w) & (w > 0), w, 1.0)[valid]
+
+        n = int(self.point_ids.size)
+        x, y = lng_to_x(lngs[valid]), lat_to_y(lats[valid])
+        count = np.ones(n, dtype=np.int64)
+        point = np.arange(n, dtype=np.int64)
+        # 개별 장소 단계 (max_zoom + 1): 펼칠 단계 없음
+        expansion = np.full(n, self.max_zoom + 1, dtype=np.int64)
+        self._levels = {self.max_zoom + 1: _Level(x, y, count, point, expansion)}
+        wx, wy, wsum = x * w, y * w, w.copy()
+
+        for z in range(self.max_zoom, self.min_zoom - 1, -1):
+            if n == 0:
+                self._levels[z] = _Level(x, y, count, point, expansion)
+                continue
+            cells = TILE_SIZE * (2 ** z) / self.radius_px  # 한 변 칸 수
+            cx = np.floor(x * cells).astype(np.int64)
+            cy = np.floor(y * cells).astype(np.int64)
+            key = cy * (int(cells) + 2) + cx
+            uniq, inv = np.unique(key, return_inverse=True)
+            m = uniq.size
+            n_children = np.bincount(inv, minlength=m)
+            sum_wx = np.bincount(inv, weights=wx, minlength=m)
+            sum_wy = np.bincount(inv, weights=wy, minlength=m)
+            sum_w = np.bincount(inv, weights=wsum, minlength=m)
+            new_count = np.bincount(inv, weights=count, minlength=m).astype(np.int64)
+            # 대표 장소: 칸 안에서 가중치가 가장 큰 아래 단계 클러스터의 대표
+            best = np.lexsort((-wsum, inv))
+            first = best[np.searchsorted(inv[best], np.arange(m))]
+            new_point = point[first]
+            # 자식이 하나뿐이면 그 자식이 펼쳐지는 줌을 물려받음
+            new_expansion = np.where(n_children > 1, z + 1, expansion[first])
+            x, y = sum_wx / sum_w, sum_wy / sum_w
+            wx, wy, wsum = sum_wx, sum_wy, sum_w
+            count, point, expansion = new_count, new_point, new_expansion
+            n = m
+            self._levels[z] = _Level(x, y, count, point, expansion)
+
+    def __len__(self):
+        return int(self.point_ids.size)
+
+    def level_sizes(self) -> dict:
+        return {z: len(level) for z, level in sorted(self._levels.items())}
+
+    def get_clusters(self, zoom: int, min_lat, min_lng, max_lat, max_lng, limit: int = 300):
+        """
+        줌·영역 안 클러스터 [{lat, lng, count, point, expansion_zoom}] (count 내림차순, 최대 limit개)와 잘림 여부.
+        point는 입력 순서 기준 장소 번호 (count == 1이면 그 장소, 아니면 대표 장소).
+        """
+        z = min(max(int(zoom), self.min_zoom), self.max_zoom + 1)
+        level = self._levels[z]
+        if min_lat > max_lat:
+            min_lat, max_lat = max_lat, min_lat
+        x0, x1 = float(lng_to_x(min_lng)), float(lng_to_x(max_lng))
+        y0, y1 = float(lat_to_y(max_lat)), float(lat_to_y(min_lat))
+        if x0 <= x1:
+            idx = level.query(x0, y0, x1, y1)
+        else:
+            # 날짜 변경선을 넘는 영역
+            idx = np.concatenate([level.query(x0, y0, 1.0, y1), level.query(0.0, y0, x1, y1)])
+        truncated = idx.size > limit
+        idx = idx[np.argsort(-level.count[idx], kind="stable")[:max(int(limit), 0)]]
+        lats, lngs = y_to_lat(level.y[idx]), x_to_lng(level.x[idx])
+        clusters = [
+            {
+                "lat": round(float(la), 6),
+                "lng": round(float(ln), 6),
+                "count": int(c),
+                "point": int(self.point_ids[p]),
+                "expansion_zoom": int(ez),
+            }
+            for la, ln, c, p, ez in zip(lats, lngs, level.count[idx], level.point[idx], level.expansion_zoom[idx])
+        ]
+        return clusters, bool(truncated)
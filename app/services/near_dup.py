@@ -0,0 +1,104 @@
+"""
+카탈로그 근접 중복(연사·거의 같은 구도) 사진 묶기
+임베딩 코사인 유사도가 threshold 이상인 사진끼리 한 묶음으로 보고, 묶음마다 대표 사진 1장만 검색 인덱스에 남깁니다.
+오프라인: scripts/collapse_near_duplicates.py → embedding_cache/dedup.json
+서버: dedup.json이 현재 임베딩 캐시와 맞으면 대표 행만 로드하고, 행별 대표(rep)로 묶음 구성을 보관 (RecommendService)
+"""
+import hashlib
+import json
+
+import numpy as np
+
+DEDUP_FILE_NAME = "dedup.json"
+
+
+def filenames_digest(filenames) -> str:
+    """db_filenames 목록 지문. dedup.json이 어떤 임베딩 캐시 기준인지 확인용."""
+    return hashlib.sha1(json.dumps(list(filenames), ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def _find(parent, i):
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def _cluster_block(feats, rows, threshold, parent, block: int = 4096):
+    """rows 안에서 유사도 ≥ threshold 인 쌍을 union. 블록 단위 행렬곱으로 메모리 제한."""
+    x = feats[rows]
+    for s in range(0, len(rows), block):
+        sims = x[s:s + block] @ x.T
+        ii, jj = np.nonzero(sims >= threshold)
+        for a, b in zip(ii + s, jj):
+            if a < b:
+                ra, rb = _find(parent, rows[a]), _find(parent, rows[b])
+                if ra != rb:
+                    parent[max(ra, rb)] = min(ra, rb)
+
+
+def _split_by_medoid(feats, members, threshold):
+    """
+    union-find 묶음(단일 연결)을 medoid 기준으로 다시 나눔 → [(대표 행, 묶음 행 배열)].
+    A~B~C처럼 이웃끼리만 비슷한 사슬(천천히 돌린 파노라마 등)이 한 장으로 합쳐지지 않도록,
+    medoid와의 유사도가 threshold 이상인 사진만 남기고 나머지는 같은 방식으로 다시 묶음.
+    """
+    out = []
+    remaining = members
+    while remaining.size > 1:
+        sims = feats[remaining] @ feats[remaining].T
+        m = int(np.argmax(sims.sum(axis=1)))
+        keep = sims[m] >= threshold
+        keep[m] = True
+        out.append((int(remaining[m]), remaining[keep]))
+        remaining = remaining[~keep]
+    if remaining.size:
+        out.append((int(remaining[0]), remaining))
+    return out
+
+
+def cluster_near_duplicates(features, threshold: float = 0.95, group_keys=None):
+    """
+    근접 중복 묶음 → 행별 대표 행 번호 배열 (대표 행은 자기 자신).
+    group_keys(예: 행별 VISIT_AREA_ID)가 있으면 같은 키 안에서만 비교 (연사는 같은 장소 사진이므로 충분하고 O(N²)을 피함).
+    대표는 묶음 안에서 다른 사진들과 유사도 합이 가장 큰 사진(medoid)이고, 묶음의 모든 사진은 대표와 유사도 ≥ threshold.
+    """
+    feats = np.asarray(features, dtype=np.float32)
+    feats = feats / np.clip(np.linalg.norm(feats, axis=1, keepdims=True), 1e-12, None)
+    n = feats.shape[0]
+    parent = np.arange(n)
+    if group_keys is None:
+        groups = [np.arange(n)]
+    else:
+        keys = np.asarray([str(k) for k in group_keys], dtype=object)
+        order = np.argsort(keys, kind="stable")
+        bounds = np.flatnonzero(keys[order][1:] != keys[order][:-1]) + 1
+        groups = np.split(order, bounds)
+    for rows in groups:
+        if len(rows) > 1:
+            _cluster_block(feats, rows, threshold, parent)
+
+    roots = np.array([_find(parent, i) for i in range(n)], dtype=np.int64)
+    rep = np.arange(n)
+    order = np.argsort(roots, kind="stable")
+    bounds = np.flatnonzero(roots[order][1:] != roots[order][:-1]) + 1
+    for members in np.split(order, bounds):
+        if members.size > 1:
+            for medoid, kept in _split_by_medoid(feats, members, threshold):
+                rep[kept] = medoid
+    return rep
+
+
+def load_dedup(path: str, filenames):
+    """
+    dedup.json이 현재 filenames 기준이면 행별 대표 행 번호 배열(cluster_near_duplicates 결과와 같은 형태), 아니면 None.
+    묶음 구성(rep)이 없는 예전 형식도 None (스크립트를 다시 실행해야 함).
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("rows") != len(filenames) or data.get("filenames_sha1") != filenames_digest(filenames):
+        return None
+    rep = np.asarray(data.get("rep", []), dtype=np.int64)
+    if rep.shape != (len(filenames),) or (rep < 0).any() or (rep >= len(filenames)).any() or (rep[rep] != rep).any():
+        return None
+    return rep
@@ -0,0 +1,106 @@
+"""
+이미지 추천용 장소 단위 1차 인덱스 (장소 중심 벡터)
+db_features는 사진 1장당 1행이라 같은 장소(VISIT_AREA_ID) 사진이 여러 행을 차지합니다.
+서버 시작 시 장소별 중심 벡터(정규화 평균, 선택적으로 중심에 가장 가까운 사진=medoid)를 만들어 두고,
+검색은 장소 중심 벡터로 상위 장소를 먼저 고른 뒤 그 장소들의 사진만 다시 점수화합니다.
+"""
+import numpy as np
+
+
+def _normalize(x):
+    x = np.asarray(x, dtype=np.float32)
+    return x / np.clip(np.linalg.norm(x, axis=-1, keepdims=True), 1e-12, None)
+
+
+class PlaceCentroidIndex:
+    """
+    행별 장소 키 → 장소 번호. 장소별 사진 행은 CSR 형태(order + offsets)로 보관합니다.
+    centroids: (장소 수 × d) 정규화 평균, medoids: 중심에 가장 가까운 실제 사진 벡터 (use_medoids일 때만)
+    """
+
+    def __init__(self, features, place_keys, use_medoids: bool = False):
+        feats = _normalize(features) if len(features) else np.empty((0, 0), dtype=np.float32)
+        keys = np.asarray([str(k) for k in place_keys], dtype=object)
+        self.n_rows = int(keys.size)
+        uniq, row_place = np.unique(keys, return_inverse=True) if keys.size else (np.empty(0, dtype=object), np.empty(0, dtype=np.int64))
+        self.place_keys = uniq.tolist()
+        self.row_place = row_place.astype(np.int64)
+        n_places = len(self.place_keys)
+
+        # 장소 번호 순으로 행 정렬 → offsets[p]:offsets[p+1] 이 장소 p의 사진 행
+        self.order = np.argsort(self.row_place, kind="stable")
+        counts = np.bincount(self.row_place, minlength=n_places)
+        self.offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+        dim = feats.shape[1] if feats.ndim == 2 else 0
+        sums = np.zeros((n_places, dim), dtype=np.float32)
+        if n_places:
+            np.add.at(sums, self.row_place, feats)
+        self.centroids = _normalize(sums) if n_places else sums
+        self.medoids = None
+        self.medoid_rows = None
+        if use_medoids and n_places:
+            # 각 사진과 자기 장소 중심의 유사도 → 장소별 최댓값 행
+            sim_to_centroid = np.einsum("ij,ij->i", feats, self.centroids[self.row_place])
+            sorted_sims = sim_to_centroid[self.order]
+            best = np.empty(n_places, dtype=np.int64)
+            for p in range(n_places):
+                s, e = self.offsets[p], self.offsets[p + 1]
+                best[p] = self.order[s + int(np.argmax(sorted_sims[s:e]))]
+            self.medoids = feats[best]
+            self.medoid_rows = best
+
+    def __len__(self):
+        return len(self.place_keys)
+
+    @property
+    def avg_photos_per_place(self) -> float:
+        return self.n_rows / len(self.place_keys) if self.place_keys else 0.0
+
+    def representative_row(self, place: int) -> int:
+        """장소 대표 사진 행 (medoid가 있으면 medoid, 없으면 그 장소 첫 행)."""
+        if self.medoid_rows is not None:
+            return int(self.medoid_rows[place])
+        return int(self.order[self.offsets[place]])
+
+    def place_scores(self, query_emb, places=None):
+        """장소(전체 또는 places) 중심 벡터와 질의의 코사인 유사도. 질의가 여러 벡터면 최댓값, medoid가 있으면 둘 중 큰 값."""
+        q = np.atleast_2d(_normalize(query_emb))
+        cents = self.centroids if places is None else self.centroids[places]
+        sims = (q @ cents.T).max(axis=0)
+        if self.medoids is not None:
+            meds = self.medoids if places is None else self.medoids[places]
+            sims = np.maximum(sims, (q @ meds.T).max(axis=0))
+        return sims
+
+    def candidate_rows(self, query_emb, top_places: int, rows=None):
+        """
+        상위 top_places개 장소의 사진 행 (오름차순). rows(위치/패싯 후보)가 있으면
+        그 후보를 가진 장소만 점수화하고, 돌려주는 행도 후보 안으로 제한합니다.
+        """
+        if rows is None:
+            places = None
+        else:
+            places = np.unique(self.row_place[rows])
+            if places.size == 0:
+                return np.empty(0, dtype=np.int64)
+        scores = self.place_scores(query_emb, places)
+        k = min(int(top_places), scores.shape[0])
+        if k <= 0:
+            return np.empty(0, dtype=np.int64)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top_places_idx = top if places is None else places[top]
+        picked = np.concatenate([self.order[self.offsets[p]:self.offsets[p + 1]] for p in top_places_idx])
+        if rows is not None:
+            allowed = np.zeros(self.n_rows, dtype=bool)
+            allowed[rows] = True
+            picked = picked[allowed[picked]]
+        return np.sort(picked)
+
+    def best_row_per_place(self, ranked_rows, ranked_scores):
+        """점수 내림차순 (행, 점수)에서 장소별 첫 행만 남김 → 결과가 서로 다른 장소로 구성됨."""
+        if len(ranked_rows) == 0:
+            return ranked_rows, ranked_scores
+        _, first = np.unique(self.row_place[ranked_rows], return_index=True)
+        first = np.sort(first)
+        return ranked_rows[first], ranked_scores[first]
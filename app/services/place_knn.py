@@ -0,0 +1,104 @@
+"""
+장소 → 비슷한 장소 top-K 이웃 목록 (미리 계산)
+장소 단위 임베딩(사진 중심 벡터)으로 모든 장소의 이웃 K개를 한 번 계산해 (장소 수 × K) 배열로 저장해 두고,
+"비슷한 스타일 더 추천받기"는 벡터 검색 없이 배열 조회만으로 응답합니다.
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+
+
+def place_ids_digest(place_ids) -> str:
+    """장소 ID 목록 지문. 저장된 이웃 목록이 현재 장소 인덱스 기준인지 확인용."""
+    return hashlib.sha1(json.dumps([str(p) for p in place_ids], ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def vectors_digest(vectors) -> str:
+    """장소 벡터(float32) 지문. 임베딩 재계산·근접 중복 정리로 중심 벡터가 바뀌면 저장된 이웃 목록을 다시 만듦."""
+    x = np.ascontiguousarray(vectors, dtype=np.float32)
+    return hashlib.sha1(repr(x.shape).encode("utf-8") + x.tobytes()).hexdigest()
+
+
+def build_place_knn(vectors, k: int = 20, block: int = 1024):
+    """
+    정규화 장소 벡터 (P × d) → (이웃 번호 int32 P×K, 유사도 float16 P×K). 자기 자신은 제외, 이웃이 모자라면 -1.
+    블록 단위 행렬곱으로 P×P 유사도 행렬 전체를 만들지 않음.
+    """
+    x = np.asarray(vectors, dtype=np.float32)
+    n = x.shape[0]
+    k = max(1, int(k))
+    neighbors = np.full((n, k), -1, dtype=np.int32)
+    scores = np.zeros((n, k), dtype=np.float16)
+    kk = min(k, n - 1)
+    if kk <= 0:
+        return neighbors, scores
+    for s in range(0, n, block):
+        sims = x[s:s + block] @ x.T
+        sims[np.arange(sims.shape[0]), np.arange(s, s + sims.shape[0])] = -np.inf
+        top = np.argpartition(-sims, kk - 1, axis=1)[:, :kk]
+        top_sims = np.take_along_axis(sims, top, axis=1)
+        order = np.argsort(-top_sims, axis=1, kind="stable")
+        neighbors[s:s + sims.shape[0], :kk] = np.take_along_axis(top, order, axis=1)
+        scores[s:s + sims.shape[0], :kk] = np.take_along_axis(top_sims, order, axis=1)
+    return neighbors, scores
+
+
+class PlaceKnn:
+    """장소 ID ↔ 번호, 번호별 이웃 번호/유사도 배열."""
+
+    def __init__(self, place_ids, neighbors, scores, vectors_sha1: str = ""):
+        self.place_ids = [str(p) for p in place_ids]
+        self._pos = {p: i for i, p in enumerate(self.place_ids)}
+        self.neighbors = neighbors
+        self.scores = scores
+        self.vectors_sha1 = vectors_sha1
+
+    def __contains__(self, place_id) -> bool:
+        return str(place_id) in self._pos
+
+    @property
+    def k(self) -> int:
+        return int(self.neighbors.shape[1]) if self.neighbors.ndim == 2 else 0
+
+    def similar(self, place_id, limit: int = 10, exclude=()):
+        """place_id와 비슷한 장소 [(장소 번호, 유사도)] 최대 limit개. 없는 장소면 빈 목록."""
+        pos = self._pos.get(str(place_id))
+        if pos is None:
+            return []
+        exclude = {str(e) for e in exclude or ()}
+        out = []
+        for j, score in zip(self.neighbors[pos].tolist(), self.scores[pos].tolist()):
+            if j < 0:
+                break
+            if self.place_ids[j] in exclude:
+                continue
+            out.append((j, float(score)))
+            if len(out) >= limit:
+                break
+        return out
+
+    def save(self, path: str) -> None:
+        np.savez(
+            path,
+            neighbors=self.neighbors,
+            scores=self.scores,
+            digest=np.array(place_ids_digest(self.place_ids)),
+            vectors_sha1=np.array(self.vectors_sha1),
+        )
+
+    @classmethod
+    def load(cls, path: str, place_ids, k: int, vectors_sha1: str):
+        """저장 파일이 같은 장소 목록·장소 벡터(vectors_digest)·K로 만들어졌을 때만 로드, 아니면 None."""
+        if not os.path.isfile(path):
+            return None
+        with np.load(path) as z:
+            if (
+                str(z["digest"]) != place_ids_digest(place_ids)
+                or "vectors_sha1" not in z.files
+                or str(z["vectors_sha1"]) != vectors_sha1
+                or z["neighbors"].shape != (len(place_ids), k)
+            ):
+                return None
+            return cls(place_ids, z["neighbors"], z["scores"], vectors_sha1)
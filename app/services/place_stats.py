@@ -0,0 +1,108 @@
+"""
+"상세 정보 보기"용 장소별 집계 (카탈로그 로드 시 한 번 계산)
+사진 수, 평균 만족도(DGSTFN), 대표 체류 시간(RESIDENCE_TIME_MIN 중앙값), 재방문 비율(REVISIT_YN), 대표 사진을
+visit_area_id별로 미리 만들어 두고, 요청 시에는 dict 조회만 합니다.
+각 장소 응답 본문의 해시를 ETag로 함께 보관해 클라이언트가 If-None-Match로 재검증할 수 있습니다.
+"""
+import hashlib
+import json
+
+import numpy as np
+import pandas as pd
+
+PLACE_SUMMARY_TABLE = "place_summary"
+MAX_PHOTOS = 5
+
+
+def _ids(series) -> pd.Series:
+    s = series.astype(str).str.strip()
+    s = s.where(~s.str.endswith(".0"), s.str[:-2])
+    return s.where(~series.isna(), "")
+
+
+def _round(v, nd=2):
+    return None if v is None or pd.isna(v) else round(float(v), nd)
+
+
+def aggregate_place_stats(place_df=None, photo_df=None, id_column: str = "VISIT_AREA_ID", max_photos: int = MAX_PHOTOS):
+    """
+    방문 기록(place_df: 방문 1건 1행)과 사진(photo_df: 사진 1장 1행) → visit_area_id별 집계 DataFrame.
+    컬럼: place_name, photo_count, visit_count, avg_dgstfn, median_residence_time_min, revisit_rate, photos(JSON 문자열)
+    place_df가 없으면 방문 통계는 비어 있고, photo_df가 없으면 사진 통계가 비어 있음.
+    """
+    frames = []
+    if place_df is not None and not place_df.empty and id_column in place_df.columns:
+        p = place_df.assign(_vid=_ids(place_df[id_column]))
+        p = p[p["_vid"] != ""]
+        g = p.groupby("_vid", sort=False)
+        visits = pd.DataFrame({"visit_count": g.size()})
+        if "VISIT_AREA_NM" in p.columns:
+            visits["place_name"] = g["VISIT_AREA_NM"].first()
+        if "DGSTFN" in p.columns:
+            visits["avg_dgstfn"] = pd.to_numeric(p["DGSTFN"], errors="coerce").groupby(p["_vid"]).mean()
+        if "RESIDENCE_TIME_MIN" in p.columns:
+            visits["median_residence_time_min"] = pd.to_numeric(p["RESIDENCE_TIME_MIN"], errors="coerce").groupby(p["_vid"]).median()
+        if "REVISIT_YN" in p.columns:
+            yn = p["REVISIT_YN"].astype(str).str.strip().str.upper()
+            known = yn.isin(["Y", "N"])
+            visits["revisit_rate"] = (yn[known] == "Y").groupby(p["_vid"][known]).mean()
+        frames.append(visits)
+    if photo_df is not None and not photo_df.empty and "PHOTO_FILE_NM" in photo_df.columns:
+        vid_col = id_column if id_column in photo_df.columns else "VISIT_AREA_ID"
+        ph = photo_df.assign(_vid=_ids(photo_df[vid_col]), _nm=photo_df["PHOTO_FILE_NM"].astype(str).str.strip())
+        ph = ph[(ph["_vid"] != "") & (ph["_nm"] != "")].drop_duplicates(subset=["_vid", "_nm"])
+        g = ph.groupby("_vid", sort=False)
+        # 장소별 앞쪽 max_photos장만 대표 사진 목록으로 (그룹별 apply 없이 순번으로 자름)
+        head = ph[g.cumcount() < max_photos]
+        urls = head["image_url"] if "image_url" in head.columns else pd.Series("", index=head.index)
+        items = [
+            {"image_file": nm, "image_url": u.strip()} if isinstance(u, str) and u.strip() else {"image_file": nm}
+            for nm, u in zip(head["_nm"], urls)
+        ]
+        photo_lists = pd.Series(items, index=head.index, dtype=object).groupby(head["_vid"], sort=False).agg(list)
+        photos = pd.DataFrame({"photo_count": g.size()})
+        photos["photos"] = photo_lists.map(lambda v: json.dumps(v, ensure_ascii=False))
+        for col in ("VISIT_AREA_NM_y", "VISIT_AREA_NM"):
+            if col in ph.columns:
+                photos["_photo_place_name"] = g[col].first()
+                break
+        frames.append(photos)
+    if not frames:
+        return pd.DataFrame()
+    out = pd.concat(frames, axis=1)
+    if "_photo_place_name" in out.columns:
+        name = out["place_name"] if "place_name" in out.columns else pd.Series(np.nan, index=out.index)
+        out["place_name"] = name.fillna(out.pop("_photo_place_name"))
+    out.index.name = "visit_area_id"
+    return out
+
+
+class PlaceStatsStore:
+    """visit_area_id → (응답 dict, ETag). 조회는 dict 접근 한 번."""
+
+    def __init__(self, stats_df):
+        self._items = {}
+        if stats_df is None or stats_df.empty:
+            return
+        cols = set(stats_df.columns)
+        for vid, r in stats_df.iterrows():
+            photos = r.get("photos") if "photos" in cols else None
+            item = {
+                "visit_area_id": str(vid),
+                "place_name": "" if pd.isna(r.get("place_name")) else str(r.get("place_name")).strip(),
+                "photo_count": int(r["photo_count"]) if "photo_count" in cols and pd.notna(r["photo_count"]) else 0,
+                "visit_count": int(r["visit_count"]) if "visit_count" in cols and pd.notna(r["visit_count"]) else 0,
+                "avg_dgstfn": _round(r.get("avg_dgstfn")),
+                "median_residence_time_min": _round(r.get("median_residence_time_min"), 1),
+                "revisit_rate": _round(r.get("revisit_rate"), 3),
+                "photos": json.loads(photos) if isinstance(photos, str) and photos else [],
+            }
+            body = json.dumps(item, ensure_ascii=False, sort_keys=True).encode("utf-8")
+            self._items[str(vid)] = (item, '"' + hashlib.sha1(body).hexdigest()[:20] + '"')
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, visit_area_id):
+        """(장소 집계 dict, ETag) 또는 None"""
+        return self._items.get(str(visit_area_id).strip())
@@ -7,12 +7,45 @@ import pandas as pd
 import numpy as np
 from PIL import Image
 from sentence_transformers import SentenceTransformer, util
-import google.generativeai as genai
 from dotenv import load_dotenv
 import chromadb
 
+from app.services.covisit import COVISIT_FILE_NAME, CovisitIndex, source_fingerprint
+from app.services.compressed_index import COMPRESSION_MODES, CompressedIndex
+from app.services.geo_index import GeoGridIndex, extract_exif_gps
+from app.services.image_derivatives import PLACEHOLDERS_FILE_NAME, load_placeholders
+from app.services.image_paths import get_image_path_index
+from app.services.llm_service import llm_service
+from app.services.map_cluster import MapClusterIndex
+from app.services.near_dup import DEDUP_FILE_NAME, load_dedup
+from app.services.place_index import PlaceCentroidIndex
+from app.services.place_knn import PlaceKnn, build_place_knn, vectors_digest
+from app.services.place_stats import PLACE_SUMMARY_TABLE, PlaceStatsStore, aggregate_place_stats
+from app.services.search_session import SearchSessionStore
+from app.services.facet_index import (
+    FACET_PLACE_CLASS,
+    FACET_SEASON,
+    FACET_VISIT_AREA_TYPE,
+    FacetIndex,
+    is_restaurant_place,
+    month_to_season,
+    place_class_of,
+    place_fit_score,
+)
+
 load_dotenv()
 
+# 후보 행 비율이 이 값보다 크면 행 복사(gather) 대신 전체 스캔 후 후보 점수만 취함 (scripts/bench_facet_search.py)
+_DENSE_SCAN_RATIO = 0.3
+# 이미지 추천: 유사도 컷, 1차 후보 수(해변 판정 범위), 한 페이지 결과 수
+_MIN_SCORE = 0.6
+_K_CANDIDATES = 20
+_PAGE_SIZE = 3
+# 여러 장 검색 시 한 요청에서 받는 최대 사진 수
+MAX_QUERY_IMAGES = 10
+# 결과마다 붙이는 "함께 방문한 곳" 수
+_ALSO_VISITED_LIMIT = 3
+
 try:
     from app.core.config import settings
 except Exception:
@@ -44,13 +77,8 @@ class RecommendService:
         # 1. 모델 로드
         self.model = SentenceTransformer('clip-ViT-B-32')
         
-        # 2. Gemini 설정
-        api_key = os.getenv("GEMINI_API_KEY")
-        if api_key:
-            genai.configure(api_key=api_key)
-            self.gemini_model = genai.GenerativeModel('gemini-2.5-flash')
-        else:
-            self.gemini_model = None
+        # 2. Gemini 설정 (공용 LLM 게이트웨이, 키 없으면 None)
+        self.llm = llm_service if llm_service.available else None
 
         # 3. 데이터 로드: 3306 도커 DB 우선, 없으면 CSV
         self._db_conn = _get_mariadb_conn()
@@ -66,15 +94,34 @@ class RecommendService:
         # 국내 여행로그 데이터 루트 (image_path 상대 경로 해석용)
         self._base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
         self.travel_data_root = os.path.abspath(os.environ.get("TRAVEL_DATA_ROOT") or os.path.join(self._base_dir, ".."))
-        # image_path 없을 때 국내 여행로그 데이터 폴더에서 찾기 위한 지역 목록
-        self._travel_data_regions = ["수도권", "동부권", "서부권", "제주도 및 도서지역"]
+        # 파일명 → 경로 인덱스 (images/ + 국내 여행로그 데이터 지역 photo 폴더, serve_image와 공용). 카탈로그 로드 시 새로 훑음
+        self.image_paths = get_image_path_index().refresh()
         # 업로드 이미지 임베딩 캐시 (같은 사진 재업로드 시 재사용, 최대 100개)
         self._upload_embedding_cache = OrderedDict()
         self._upload_embedding_cache_max = 100
+        self._text_embedding_cache = OrderedDict()
+        # 검색 세션 (질의 임베딩 + 랭킹 결과 보관 → 재업로드 없이 다음 페이지/제외/취향 보정)
+        self._search_sessions = SearchSessionStore(
+            ttl_sec=getattr(settings, "SEARCH_SESSION_TTL_SEC", 600) if settings else 600,
+            max_sessions=getattr(settings, "SEARCH_SESSION_MAX", 500) if settings else 500,
+        )
+        self._session_candidates = getattr(settings, "SEARCH_SESSION_CANDIDATES", 200) if settings else 200
+        # 2단계 검색 (장소 중심 벡터로 상위 장소 → 그 장소 사진만 재점수). flat이면 사진 전체 스캔
+        self._retrieval_mode = (getattr(settings, "RECOMMEND_RETRIEVAL_MODE", "two_stage") if settings else "two_stage").lower()
+        self._coarse_places = getattr(settings, "RECOMMEND_COARSE_PLACES", 100) if settings else 100
+        # 압축 임베딩 계층 (1차 스캔은 PCA/int8 코드, 상위 N개만 원본 벡터로 재점수). 빈 값이면 사용 안 함
+        self._compression = (getattr(settings, "RECOMMEND_COMPRESSION", "") if settings else "").strip().lower()
+        self._rerank_n = getattr(settings, "RECOMMEND_RERANK_N", 200) if settings else 200
         # 4. [최적화] DB 이미지 임베딩 미리 계산 (Caching)
         self.db_features = []
         self.db_filenames = []
         self._precompute_db_embeddings()
+        # 근접 중복(연사) 묶음이 있으면 대표 사진만 검색 (scripts/collapse_near_duplicates.py)
+        self._dedup_mtime = None
+        self.near_dup_members = {}  # 대표 사진 키 → 함께 묶여 빠진 사진 키 목록
+        self._apply_near_dup_collapse()
+        # db_features 행 → merged_df 행 매핑, 위치 격자 인덱스 (검색 후보 축소용)
+        self._build_search_indexes()
 
         # 5. (정석 RAG용) 텍스트 임베딩 + Chroma 인덱스 준비
         # - 장소 문서(장소명/주소/POI/만족도)를 청크로 만들어 벡터DB에 저장
@@ -116,6 +163,9 @@ class RecommendService:
                         SELECT pp.photo_file_nm AS PHOTO_FILE_NM, pp.visit_area_id AS VISIT_AREA_ID,
                                COALESCE(pp.visit_area_nm, p.visit_area_nm) AS VISIT_AREA_NM,
                                p.road_nm_addr AS ROAD_NM_ADDR, p.lotno_addr AS LOTNO_ADDR,
+                               p.x_coord AS X_COORD, p.y_coord AS Y_COORD,
+                               pp.x_coord AS PHOTO_FILE_X_COORD, pp.y_coord AS PHOTO_FILE_Y_COORD,
+                               pp.photo_file_dt AS PHOTO_FILE_DT,
                                pp.image_url AS image_url
                         FROM place_photo pp
                         LEFT JOIN place p ON p.visit_area_id = pp.visit_area_id
@@ -124,7 +174,10 @@ class RecommendService:
                     cur.execute("""
                         SELECT pp.photo_file_nm AS PHOTO_FILE_NM, pp.visit_area_id AS VISIT_AREA_ID,
                                COALESCE(pp.visit_area_nm, p.visit_area_nm) AS VISIT_AREA_NM,
-                               p.road_nm_addr AS ROAD_NM_ADDR, p.lotno_addr AS LOTNO_ADDR
+                               p.road_nm_addr AS ROAD_NM_ADDR, p.lotno_addr AS LOTNO_ADDR,
+                               p.x_coord AS X_COORD, p.y_coord AS Y_COORD,
+                               pp.x_coord AS PHOTO_FILE_X_COORD, pp.y_coord AS PHOTO_FILE_Y_COORD,
+                               pp.photo_file_dt AS PHOTO_FILE_DT
                         FROM place_photo pp
                         LEFT JOIN place p ON p.visit_area_id = pp.visit_area_id
                     """)
@@ -239,27 +292,17 @@ class RecommendService:
                         if blob:
                             img = Image.open(io.BytesIO(blob))
                         else:
-                            # image_path(국내 여행로그 데이터 상대경로) 우선, 없으면 국내 여행로그 데이터 폴더에서 찾기, 마지막으로 images/
+                            # image_path(국내 여행로그 데이터 상대경로) 우선, 없으면 경로 인덱스에서 파일명으로 (지역 photo 폴더 → images/)
                             path = None
                             rel_path = (row.get("image_path") or "").strip()
-                            if rel_path and os.path.isabs(rel_path):
-                                path = rel_path
-                            elif rel_path:
-                                path = os.path.normpath(os.path.join(self.travel_data_root, rel_path))
-                            if (not path or not os.path.exists(path)) and getattr(self, "_travel_data_regions", None):
-                                # image_path 없거나 파일 없으면 국내 여행로그 데이터(수도권) 등 4개 폴더에서 파일명으로 검색
-                                for region in self._travel_data_regions:
-                                    candidate = os.path.join(
-                                        self.travel_data_root,
-                                        f"국내 여행로그 데이터({region})",
-                                        "Sample", "01.원천데이터", "photo", f
-                                    )
-                                    if os.path.exists(candidate):
-                                        path = candidate
-                                        break
-                            if (not path or not os.path.exists(path)):
-                                path = os.path.join(self._base_dir, self.db_images_folder, f)
-                            if path and os.path.exists(path):
+                            if rel_path:
+                                path = rel_path if os.path.isabs(rel_path) else os.path.normpath(os.path.join(self.travel_data_root, rel_path))
+                                # 인덱스에 있는 경로면 stat 생략, 스캔 폴더 밖 경로만 직접 확인
+                                if not self.image_paths.contains_path(path) and not os.path.exists(path):
+                                    path = None
+                            if not path:
+                                path = self.image_paths.resolve(f, local_first=False)
+                            if path:
                                 img = Image.open(path)
                         if img is not None:
                             emb = self.model.encode(img)
@@ -317,6 +360,414 @@ class RecommendService:
             print(f"총 {len(self.db_filenames)}개의 이미지 분석 완료.")
             self._save_embedding_cache(total_files, source="images_folder")
 
+    def _apply_near_dup_collapse(self):
+        """embedding_cache/dedup.json이 현재 임베딩 캐시 기준이면 db_features/db_filenames를 대표 행만 남김."""
+        enabled = getattr(settings, "NEAR_DUP_COLLAPSE", True) if settings else True
+        path = os.path.join(self._embedding_cache_dir(), DEDUP_FILE_NAME)
+        if not enabled or len(self.db_filenames) == 0 or not os.path.isfile(path):
+            return
+        try:
+            rep = load_dedup(path, self.db_filenames)
+        except Exception as e:
+            print(f"근접 중복 목록 로드 실패: {e}")
+            return
+        if rep is None:
+            print("dedup.json이 현재 임베딩 캐시와 맞지 않아 무시합니다. (scripts/collapse_near_duplicates.py 다시 실행)")
+            return
+        total = len(self.db_filenames)
+        reps = np.unique(rep)
+        self.near_dup_members = {}
+        for row in np.flatnonzero(rep != np.arange(total)).tolist():
+            self.near_dup_members.setdefault(self.db_filenames[rep[row]], []).append(self.db_filenames[row])
+        self.db_features = np.asarray(self.db_features)[reps]
+        self.db_filenames = [self.db_filenames[i] for i in reps]
+        self._dedup_mtime = os.path.getmtime(path)
+        print(f"근접 중복 정리: 사진 {total}장 → 대표 {len(reps)}장 (묶음 {len(self.near_dup_members)}개)")
+
+    def _build_row_place_index(self):
+        """db_filenames 각 행 → merged_df 행 위치 배열 (매칭 안 되면 -1). _get_place_info와 같은 첫 행 기준."""
+        n = len(self.db_filenames)
+        pos = np.full(n, -1, dtype=np.int64)
+        if n == 0 or self.merged_df.empty or "PHOTO_FILE_NM" not in self.merged_df.columns:
+            return pos
+        photos = self.merged_df["PHOTO_FILE_NM"].tolist()
+        if "VISIT_AREA_ID" in self.merged_df.columns:
+            vids = self.merged_df["VISIT_AREA_ID"].astype(str).tolist()
+        else:
+            vids = [""] * len(photos)
+        by_key, by_photo = {}, {}
+        for i, (vid, photo) in enumerate(zip(vids, photos)):
+            by_key.setdefault((vid, photo), i)
+            by_photo.setdefault(photo, i)
+        for r, key in enumerate(self.db_filenames):
+            if "|" in key:
+                vid, photo = key.split("|", 1)
+                pos[r] = by_key.get((vid, photo), -1)
+            else:
+                pos[r] = by_photo.get(key, -1)
+        return pos
+
+    def _row_floats(self, *columns):
+        """db_features 행 순서대로 merged_df 숫자 컬럼 값 (앞 컬럼 우선, 값 없으면 다음 컬럼, 끝까지 없으면 NaN)."""
+        n = len(self.db_filenames)
+        out = np.full(n, np.nan, dtype=np.float64)
+        pos = self._row_place_idx
+        matched = pos >= 0
+        for col in columns:
+            if col not in self.merged_df.columns:
+                continue
+            vals = pd.to_numeric(self.merged_df[col], errors="coerce").to_numpy(dtype=np.float64)
+            fill = matched & np.isnan(out)
+            out[fill] = vals[pos[fill]]
+        return out
+
+    def _row_strings(self, *columns):
+        """db_features 행 순서대로 merged_df 문자열 컬럼 값 (앞 컬럼 우선, 빈 값이면 다음 컬럼, 없으면 '')."""
+        n = len(self.db_filenames)
+        out = np.full(n, "", dtype=object)
+        pos = self._row_place_idx
+        matched = pos >= 0
+        for col in columns:
+            if col not in self.merged_df.columns:
+                continue
+            vals = np.array([self._safe_str(v) for v in self.merged_df[col].tolist()], dtype=object)
+            fill = matched & (out == "")
+            out[fill] = vals[pos[fill]]
+        return out
+
+    def _build_facet_index(self):
+        """장소유형 코드, 촬영월 기준 계절, 장소명 기준 해변/맛집 분류 비트맵. (DB 모드엔 유형 코드 컬럼이 없어 비어 있을 수 있음)"""
+        index = FacetIndex(len(self.db_filenames))
+        type_cd = [v[:-2] if v.endswith(".0") else v for v in self._row_strings("VISIT_AREA_TYPE_CD")]
+        index.add_facet(FACET_VISIT_AREA_TYPE, type_cd)
+        months = pd.to_datetime(pd.Series(self._row_strings("PHOTO_FILE_DT")), errors="coerce").dt.month
+        index.add_facet(FACET_SEASON, [month_to_season(m) if pd.notna(m) else "" for m in months])
+        names = self._row_strings("VISIT_AREA_NM_y", "VISIT_AREA_NM_x", "VISIT_AREA_NM")
+        index.add_facet(FACET_PLACE_CLASS, [place_class_of(nm) if nm else "" for nm in names])
+        return index
+
+    def _build_search_indexes(self):
+        """검색 보조 인덱스 생성. 카탈로그 로드 직후 한 번 실행."""
+        self._row_place_idx = self._build_row_place_index()
+        # 장소 좌표(X=경도, Y=위도) 우선, 없으면 사진 촬영 좌표
+        lats = self._row_floats("Y_COORD", "PHOTO_FILE_Y_COORD")
+        lngs = self._row_floats("X_COORD", "PHOTO_FILE_X_COORD")
+        cell_deg = getattr(settings, "GEO_GRID_CELL_DEG", 0.05) if settings else 0.05
+        self.geo_index = GeoGridIndex(lats, lngs, cell_deg=cell_deg)
+        self.facet_index = self._build_facet_index()
+        self.compressed_index = self._build_compressed_index()
+        self.place_index = self._build_place_index()
+        self.place_knn = self._build_place_knn()
+        self.covisit_index = self._load_covisit_index()
+        self.map_index = self._build_map_index()
+        self.place_stats = self._build_place_stats()
+        # 사진별 LQIP (적재 시 생성, 결과에 바로 포함)
+        self._placeholders = load_placeholders(os.path.join(self._embedding_cache_dir(), PLACEHOLDERS_FILE_NAME))
+        if self._placeholders:
+            print(f"이미지 placeholder: {len(self._placeholders)}개")
+        if len(self.db_filenames):
+            print(f"위치 인덱스: 좌표 있는 이미지 {len(self.geo_index)}/{len(self.db_filenames)}개")
+        if self.place_index is not None:
+            print(f"장소 인덱스: 장소 {len(self.place_index)}개, 장소당 평균 사진 {self.place_index.avg_photos_per_place:.1f}장")
+
+    def _load_place_summary_from_db(self):
+        """scripts/insert_place_data.py가 만든 place_summary 테이블 → 집계 DataFrame (없으면 None)."""
+        if not self._db_conn:
+            return None
+        try:
+            with self._db_conn.cursor() as cur:
+                cur.execute(f"SELECT * FROM {PLACE_SUMMARY_TABLE}")
+                rows = cur.fetchall()
+        except Exception as e:
+            print(f"{PLACE_SUMMARY_TABLE} 로드 실패 (카탈로그에서 집계): {e}")
+            return None
+        if not rows:
+            return None
+        return pd.DataFrame(rows).set_index("visit_area_id")
+
+    def _build_place_stats(self):
+        """
+        "상세 정보 보기"용 장소별 집계. DB 모드는 place_summary 테이블(적재 시 집계), 없으면 카탈로그에서 계산.
+        CSV 모드는 data/place.csv(방문 기록)와 merged_df(사진)로 계산.
+        """
+        stats = self._load_place_summary_from_db() if self.use_recommend_db else None
+        if stats is None:
+            place_df = None
+            place_path = os.path.join(self._base_dir, "data", "place.csv")
+            if not self.use_recommend_db and os.path.isfile(place_path):
+                try:
+                    place_df = pd.read_csv(place_path, encoding="utf-8-sig")
+                except Exception as e:
+                    print(f"방문 기록 로드 실패: {e}")
+            stats = aggregate_place_stats(place_df, self.merged_df)
+        store = PlaceStatsStore(stats)
+        print(f"장소 상세 집계: 장소 {len(store)}개")
+        return store
+
+    def place_detail(self, visit_area_id: str):
+        """장소 상세 집계 (dict, ETag). 없는 장소면 None. 미리 만든 집계 조회만 함."""
+        return self.place_stats.get(visit_area_id) if self.place_stats is not None else None
+
+    def _build_map_index(self):
+        """
+        "지도에서 위치 확인하기"용 마커 클러스터. merged_df 장소(POI_ID, 없으면 VISIT_AREA_ID 기준 1개)를
+        좌표(장소 좌표 우선, 없으면 사진 좌표)로 줌 단계별 클러스터링해 둠. 장소 가중치는 사진 수.
+        """
+        self._map_places = []
+        if self.merged_df.empty:
+            return None
+        df = self.merged_df
+        n = len(df)
+
+        def _col(*names):
+            for name in names:
+                if name in df.columns:
+                    return df[name]
+            return pd.Series([None] * n, index=df.index)
+
+        lat = pd.to_numeric(_col("Y_COORD"), errors="coerce").fillna(pd.to_numeric(_col("PHOTO_FILE_Y_COORD"), errors="coerce"))
+        lng = pd.to_numeric(_col("X_COORD"), errors="coerce").fillna(pd.to_numeric(_col("PHOTO_FILE_X_COORD"), errors="coerce"))
+        vid = _col("VISIT_AREA_ID").map(self._safe_str)
+        poi = _col("POI_ID").map(self._safe_str)
+        name = _col("VISIT_AREA_NM_y", "VISIT_AREA_NM").map(self._safe_str)
+        places = pd.DataFrame({
+            "key": poi.where(poi != "", "v:" + vid),
+            "visit_area_id": vid,
+            "place_name": name,
+            "lat": lat,
+            "lng": lng,
+        }).dropna(subset=["lat", "lng"])
+        places = places[places["key"] != "v:"]
+        if places.empty:
+            return None
+        grouped = places.groupby("key", sort=False)
+        first = grouped.first()
+        first["photo_count"] = grouped.size()
+        self._map_places = [
+            {"visit_area_id": r.visit_area_id, "place_name": r.place_name, "photo_count": int(r.photo_count)}
+            for r in first.itertuples()
+        ]
+        index = MapClusterIndex(
+            first["lat"].to_numpy(),
+            first["lng"].to_numpy(),
+            weights=first["photo_count"].to_numpy(),
+            max_zoom=getattr(settings, "MAP_CLUSTER_MAX_ZOOM", 16) if settings else 16,
+            radius_px=getattr(settings, "MAP_CLUSTER_RADIUS_PX", 60) if settings else 60,
+        )
+        print(f"지도 클러스터: 장소 {len(index)}개, 줌 {index.min_zoom}~{index.max_zoom}")
+        return index
+
+    def map_clusters(self, zoom: int, bbox, limit: int | None = None):
+        """
+        줌·영역(min_lat, min_lng, max_lat, max_lng) 안 지도 마커. 미리 만든 줌 단계 배열 조회만 함. bbox가 None이면 지도 전체.
+        count == 1이면 장소 마커(visit_area_id, place_name), 아니면 클러스터 마커(expansion_zoom으로 확대 시 펼쳐짐).
+        """
+        if limit is None:
+            limit = getattr(settings, "MAP_MAX_MARKERS", 300) if settings else 300
+        if self.map_index is None:
+            return {"zoom": zoom, "count": 0, "truncated": False, "markers": []}
+        clusters, truncated = self.map_index.get_clusters(zoom, *(bbox or (-90.0, -180.0, 90.0, 180.0)), limit=limit)
+        markers = []
+        for c in clusters:
+            place = self._map_places[c.pop("point")]
+            if c["count"] == 1:
+                c.update(type="place", visit_area_id=place["visit_area_id"], place_name=place["place_name"], photo_count=place["photo_count"])
+            else:
+                c.update(type="cluster", top_place_name=place["place_name"])
+            markers.append(c)
+        return {"zoom": zoom, "count": len(markers), "truncated": truncated, "markers": markers}
+
+    def _load_covisit_index(self):
+        """
+        동시 방문 인덱스 로드 (scripts/insert_place_data.py 적재 시 embedding_cache/covisit.npz 생성).
+        파일이 없거나 저장된 data/place.csv 지문(크기·수정 시각)이 현재 파일과 다르면 place.csv로 다시 만들어 저장.
+        """
+        path = os.path.join(self._embedding_cache_dir(), COVISIT_FILE_NAME)
+        place_path = os.path.join(self._base_dir, "data", "place.csv")
+        source = source_fingerprint(place_path)
+        try:
+            index = CovisitIndex.load(path) if os.path.isfile(path) else None
+            if index is not None and source and index.source != source:
+                print("동시 방문 인덱스: data/place.csv 변경 → 다시 생성")
+                index = None
+            if index is None:
+                if not source:
+                    return None
+                index = CovisitIndex.build(pd.read_csv(place_path, encoding="utf-8-sig"))
+                index.source = source
+                os.makedirs(self._embedding_cache_dir(), exist_ok=True)
+                index.save(path)
+        except Exception as e:
+            print(f"동시 방문 인덱스 준비 실패: {e}")
+            return None
+        print(f"동시 방문 인덱스: 장소 {len(index)}개, 쌍 {index.nnz}개")
+        return index
+
+    def _build_place_knn(self):
+        """
+        장소 중심 벡터로 장소별 비슷한 장소 top-K 목록.
+        embedding_cache/place_knn.npz가 같은 장소 목록·같은 중심 벡터(임베딩 재계산, dedup.json 변경 반영)면 재사용.
+        """
+        if self.place_index is None or len(self.place_index) < 2:
+            return None
+        k = getattr(settings, "PLACE_KNN_K", 20) if settings else 20
+        path = os.path.join(self._embedding_cache_dir(), "place_knn.npz")
+        digest = vectors_digest(self.place_index.centroids)
+        try:
+            knn = PlaceKnn.load(path, self.place_index.place_keys, k, digest)
+        except Exception as e:
+            print(f"장소 이웃 목록 로드 실패: {e}")
+            knn = None
+        if knn is None:
+            neighbors, scores = build_place_knn(self.place_index.centroids, k=k)
+            knn = PlaceKnn(self.place_index.place_keys, neighbors, scores, digest)
+            try:
+                os.makedirs(self._embedding_cache_dir(), exist_ok=True)
+                knn.save(path)
+            except Exception as e:
+                print(f"장소 이웃 목록 저장 실패: {e}")
+        print(f"장소 이웃 목록: 장소 {len(knn.place_ids)}개 × {knn.k}개")
+        return knn
+
+    def _build_compressed_index(self):
+        """
+        RECOMMEND_COMPRESSION(pca|int8|pca_int8) 설정 시 압축 코드 생성(embedding_cache/compressed.npz 재사용).
+        원본 벡터는 features.npy를 mmap으로 열어 재점수할 행만 읽도록 바꿉니다.
+        """
+        if not self._compression or len(self.db_features) == 0:
+            return None
+        if self._compression not in COMPRESSION_MODES:
+            print(f"RECOMMEND_COMPRESSION={self._compression} 은 지원하지 않아 압축 계층을 사용하지 않습니다. ({', '.join(COMPRESSION_MODES)})")
+            return None
+        cache_dir = self._embedding_cache_dir()
+        features_path = os.path.join(cache_dir, "features.npy")
+        mmap_path = features_path
+        if self._dedup_mtime is not None and os.path.isfile(features_path):
+            # 근접 중복 정리 후에는 행이 대표 사진만 남아 features.npy와 모양이 다름 → 대표 행 행렬을 따로 저장해 mmap
+            mmap_path = os.path.join(cache_dir, "features_dedup.npy")
+            self._save_collapsed_features(mmap_path, max(os.path.getmtime(features_path), self._dedup_mtime))
+        if os.path.isfile(mmap_path):
+            try:
+                mapped = np.load(mmap_path, mmap_mode="r")
+                if mapped.shape == np.shape(self.db_features):
+                    self.db_features = mapped
+                else:
+                    print(f"{os.path.basename(mmap_path)} 모양이 현재 임베딩과 달라 mmap을 사용하지 않습니다.")
+            except Exception as e:
+                print(f"임베딩 mmap 열기 실패 (메모리 배열 그대로 사용): {e}")
+        pca_dim = getattr(settings, "RECOMMEND_PCA_DIM", 128) if settings else 128
+        meta = {
+            "rows": int(self.db_features.shape[0]),
+            "dim": int(self.db_features.shape[1]),
+            "mode": self._compression,
+            "pca_dim": int(pca_dim),
+            "features_mtime": os.path.getmtime(features_path) if os.path.isfile(features_path) else None,
+            "dedup_mtime": self._dedup_mtime,
+        }
+        compressed_path = os.path.join(cache_dir, "compressed.npz")
+        try:
+            index = CompressedIndex.load(compressed_path, meta)
+        except Exception as e:
+            print(f"압축 코드 캐시 로드 실패: {e}")
+            index = None
+        if index is None:
+            index = CompressedIndex.build(self.db_features, mode=self._compression, dim=pca_dim)
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                index.save(compressed_path, meta)
+            except Exception as e:
+                print(f"압축 코드 캐시 저장 실패: {e}")
+        print(
+            f"압축 임베딩: {self._compression}, {index.codes.shape[1]}차원 {index.codes.dtype} "
+            f"({index.nbytes / 1024 / 1024:.1f} MiB, 원본 {self.db_features.nbytes / 1024 / 1024:.1f} MiB)"
+        )
+        return index
+
+    def _save_collapsed_features(self, path: str, source_mtime: float) -> None:
+        """근접 중복 정리 후 db_features(대표 행)를 path에 저장. 원본 캐시/dedup.json보다 새 파일이 이미 있으면 그대로 둠."""
+        try:
+            if os.path.isfile(path) and os.path.getmtime(path) >= source_mtime:
+                header = np.load(path, mmap_mode="r")
+                if header.shape == np.shape(self.db_features):
+                    return
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                np.save(f, np.asarray(self.db_features))
+            os.replace(tmp, path)
+        except Exception as e:
+            print(f"대표 행 임베딩 저장 실패 (메모리 배열 그대로 사용): {e}")
+
+    def _build_place_index(self):
+        """행별 VISIT_AREA_ID(없으면 db_filenames 키의 vid, 그것도 없으면 행 자체)로 장소 중심 인덱스 생성."""
+        if len(self.db_features) == 0:
+            return None
+        vids = self._row_strings("VISIT_AREA_ID")
+        keys = []
+        for r, key in enumerate(self.db_filenames):
+            vid = vids[r][:-2] if vids[r].endswith(".0") else vids[r]
+            if not vid and "|" in key:
+                vid = key.split("|", 1)[0]
+            keys.append(vid or f"row:{r}")
+        use_medoids = getattr(settings, "RECOMMEND_COARSE_MEDOIDS", False) if settings else False
+        return PlaceCentroidIndex(np.asarray(self.db_features, dtype=np.float32), keys, use_medoids=use_medoids)
+
+    def _geo_candidate_rows(self, image_input, lat=None, lng=None, radius_km=None, bbox=None, use_exif_gps=False):
+        """
+        위치 조건 → (후보 행 배열 | None, 적용 정보). None이면 위치 필터 없음(전체 검색).
+        bbox: (min_lat, min_lng, max_lat, max_lng). lat/lng 미지정 + use_exif_gps면 업로드 EXIF GPS 사용.
+        """
+        if bbox:
+            rows = self.geo_index.query_bbox(*bbox)
+            return rows, {"applied": True, "source": "bbox", "bbox": list(bbox), "candidates": int(rows.size)}
+        source = "query"
+        if (lat is None or lng is None) and use_exif_gps and isinstance(image_input, bytes):
+            gps = extract_exif_gps(image_input)
+            if gps:
+                lat, lng = gps
+                source = "exif"
+        if lat is None or lng is None:
+            if use_exif_gps:
+                return None, {"applied": False, "source": "exif", "reason": "업로드 사진에 GPS 정보가 없습니다."}
+            return None, None
+        if not radius_km or radius_km <= 0:
+            radius_km = getattr(settings, "GEO_DEFAULT_RADIUS_KM", 20.0) if settings else 20.0
+        rows = self.geo_index.query_radius(lat, lng, radius_km)
+        return rows, {
+            "applied": True, "source": source, "lat": lat, "lng": lng,
+            "radius_km": radius_km, "candidates": int(rows.size),
+        }
+
+    def _facet_candidate_rows(self, facets, rows=None):
+        """
+        facets({visit_area_type|season|place_class: [값...]})에 맞는 행만 남김.
+        rows가 있으면(위치 후보) 그 안에서 비트맵으로 거르고, 없으면 비트맵 전체에서 행 번호를 뽑음.
+        """
+        bits = self.facet_index.bitmap(facets or {})
+        if bits is None:
+            return rows
+        mask = np.unpackbits(bits, count=self.facet_index.n_rows).astype(bool)
+        if rows is None:
+            return np.flatnonzero(mask)
+        return rows[mask[rows]]
+
+    def _scores_for_rows(self, query_emb, rows=None):
+        """
+        후보 행(rows, None이면 전체)에 대한 코사인 유사도 1차원 배열 (rows 순서).
+        query_emb가 여러 벡터(m×d)면 한 번의 행렬곱 후 행별 최대 유사도(max-sim)를 사용.
+        """
+        if rows is None:
+            sims = util.cos_sim(query_emb, self.db_features)
+        elif rows.size > _DENSE_SCAN_RATIO * len(self.db_features):
+            sims = np.asarray(util.cos_sim(query_emb, self.db_features), dtype=np.float32)[:, rows]
+        else:
+            sims = util.cos_sim(query_emb, self.db_features[rows])
+        sims = np.asarray(sims, dtype=np.float32)
+        return sims.max(axis=0) if sims.shape[0] > 1 else sims[0]
+
+    def get_facets(self) -> dict:
+        """패싯별 값 → 이미지 수 (필터 옵션 노출용)."""
+        return self.facet_index.facets()
+
     def _ensure_place_docs_index(self):
         """Chroma에 장소 문서가 없으면 CSV 기반으로 생성/저장."""
         try:
@@ -393,52 +844,112 @@ class RecommendService:
         except Exception:
             return []
 
-    def analyze_image(self, image_input, preference: str = ""):
-        """
-        사용자 이미지를 받아 유사 장소를 추천합니다.
-        image_input: 이미지 바이트 스트림 또는 PIL Image 객체
-        """
-        # 1. 사용자 이미지 임베딩 (같은 이미지면 캐시 재사용)
-        user_img_emb = None
+    def _encode_upload(self, image_input):
+        """업로드 이미지 → 임베딩 (바이트면 sha256 기준 캐시 재사용, 같은 사진 재업로드 시 인코딩 생략)."""
         if isinstance(image_input, bytes):
             img_hash = hashlib.sha256(image_input).hexdigest()
             if img_hash in self._upload_embedding_cache:
-                user_img_emb = self._upload_embedding_cache[img_hash].copy()
                 self._upload_embedding_cache.move_to_end(img_hash)  # 최근 사용으로
-            if user_img_emb is None:
-                user_img = Image.open(io.BytesIO(image_input))
-                user_img_emb = self.model.encode(user_img)
-                self._upload_embedding_cache[img_hash] = user_img_emb.copy()
+                return self._upload_embedding_cache[img_hash].copy()
+            user_img_emb = self.model.encode(Image.open(io.BytesIO(image_input)))
+            self._upload_embedding_cache[img_hash] = user_img_emb.copy()
+            self._upload_embedding_cache.move_to_end(img_hash)
+            while len(self._upload_embedding_cache) > self._upload_embedding_cache_max:
+                self._upload_embedding_cache.popitem(last=False)
+            return user_img_emb
+        return self.model.encode(image_input)
+
+    def _encode_uploads(self, images: list):
+        """여러 업로드 이미지 → (m×d) 임베딩. 캐시에 없는 사진만 한 배치로 인코딩."""
+        embs = [None] * len(images)
+        todo_idx, todo_imgs, todo_hash = [], [], []
+        for i, image_input in enumerate(images):
+            if not isinstance(image_input, bytes):
+                todo_idx.append(i)
+                todo_imgs.append(image_input)
+                todo_hash.append(None)
+                continue
+            img_hash = hashlib.sha256(image_input).hexdigest()
+            if img_hash in self._upload_embedding_cache:
                 self._upload_embedding_cache.move_to_end(img_hash)
-                while len(self._upload_embedding_cache) > self._upload_embedding_cache_max:
-                    self._upload_embedding_cache.popitem(last=False)
-        else:
-            user_img = image_input
-            user_img_emb = self.model.encode(user_img)
+                embs[i] = self._upload_embedding_cache[img_hash].copy()
+                continue
+            todo_idx.append(i)
+            todo_imgs.append(Image.open(io.BytesIO(image_input)))
+            todo_hash.append(img_hash)
+        if todo_imgs:
+            encoded = np.asarray(self.model.encode(todo_imgs, batch_size=len(todo_imgs)), dtype=np.float32)
+            for i, img_hash, emb in zip(todo_idx, todo_hash, encoded):
+                embs[i] = emb
+                if img_hash:
+                    self._upload_embedding_cache[img_hash] = emb.copy()
+                    self._upload_embedding_cache.move_to_end(img_hash)
+            while len(self._upload_embedding_cache) > self._upload_embedding_cache_max:
+                self._upload_embedding_cache.popitem(last=False)
+        return np.stack([np.asarray(e, dtype=np.float32) for e in embs])
 
-        # 2. 유사도 계산 (벡터 연산으로 고속 처리)
-        if len(self.db_features) == 0:
-            return {"success": False, "message": "비교할 DB 이미지가 없습니다."}
+    def _encode_text(self, text: str):
+        """취향 문구 → CLIP 텍스트 임베딩 (이미지와 같은 공간, 최근 100개 캐시)."""
+        text = (text or "").strip()
+        if text in self._text_embedding_cache:
+            self._text_embedding_cache.move_to_end(text)
+            return self._text_embedding_cache[text]
+        emb = np.asarray(self.model.encode(text), dtype=np.float32)
+        self._text_embedding_cache[text] = emb
+        while len(self._text_embedding_cache) > self._upload_embedding_cache_max:
+            self._text_embedding_cache.popitem(last=False)
+        return emb
 
-        cos_scores = util.cos_sim(user_img_emb, self.db_features)[0]
-        # 같은 이미지가 여러 장소에 붙어 있을 수 있으므로 후보를 넉넉히 뽑은 뒤, 이미지별로 한 장소만 남김
-        k_candidates = min(20, len(self.db_features))
-        top_candidates = np.argpartition(-cos_scores, range(k_candidates))[:k_candidates]
+    def _rank_rows(self, query_emb, rows=None, k: int = _K_CANDIDATES):
+        """
+        후보 행 중 유사도 상위 k개 → (행 번호 배열, 점수 배열), 점수 내림차순.
+        장소 인덱스가 있으면 상위 장소의 사진만 점수화하고 장소당 가장 비슷한 사진 1장만 남김.
+        """
+        if self.place_index is None or self._retrieval_mode != "two_stage":
+            return self._top_k_rows(query_emb, rows, k)
+        rows = self.place_index.candidate_rows(query_emb, max(self._coarse_places, 1), rows)
+        # 압축 계층이 있으면 상위 장소 사진 중 max(RERANK_N, k)장만 근사 점수로 추린 뒤 재점수, 없으면 후보 전체 정확히 점수화
+        n_ranked = rows.size if self.compressed_index is None else max(self._rerank_n, k)
+        ranked_rows, ranked_scores = self._top_k_rows(query_emb, rows, n_ranked)
+        ranked_rows, ranked_scores = self.place_index.best_row_per_place(ranked_rows, ranked_scores)
+        return ranked_rows[:k], ranked_scores[:k]
+
+    def _top_k_rows(self, query_emb, rows=None, k: int = _K_CANDIDATES):
+        # 압축 계층이 있으면 근사 점수로 상위 N개만 남긴 뒤 원본 벡터로 정확히 재점수
+        n_rows = len(self.db_features) if rows is None else rows.size
+        shortlist_n = max(self._rerank_n, k)
+        if self.compressed_index is not None and n_rows > shortlist_n:
+            rows = self.compressed_index.shortlist(query_emb, shortlist_n, rows)
+        scores = self._scores_for_rows(query_emb, rows)
+        k = min(k, scores.shape[0])
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        top_rows = rows[top] if rows is not None else top
+        return top_rows.astype(np.int64), scores[top]
 
+    def _collect_results(self, ranked_rows, ranked_scores, exclude_place_ids=None):
+        """
+        랭킹된 행 → 결과 dict 목록 (점수 내림차순).
+        점수 컷(_MIN_SCORE), 제외 장소, 해변 검색 시 맛집 제외, 같은 이미지 파일은 어울리는 장소 하나만.
+        """
+        exclude_place_ids = set(exclude_place_ids or ())
         raw_results = []
-        for idx in top_candidates:
-            score = cos_scores[idx].item()
-            key = self.db_filenames[idx]
+        for row, score in zip(ranked_rows, ranked_scores):
+            score = float(score)
+            if score <= _MIN_SCORE:
+                break
+            key = self.db_filenames[int(row)]
             if "|" in key:
                 _, file_name = key.split("|", 1)
             else:
                 file_name = key
-
-            if score <= 0.6:
-                continue
-            place_info = self._get_place_info(key)
+            place_info = self._get_place_info_by_row(int(row))
             if not place_info.get('success'):
                 continue
+            if place_info.get("visit_area_id") in exclude_place_ids:
+                continue
             place_name = (place_info.get('place_name') or "").strip()
             r = {
                 "place_name": place_name,
@@ -451,43 +962,165 @@ class RecommendService:
                 "residence_time_min": place_info.get("residence_time_min", ""),
                 "dgstfn": place_info.get("dgstfn", ""),
                 "visit_area_id": place_info.get("visit_area_id", ""),
+                "poi_id": place_info.get("poi_id", ""),
             }
             if place_info.get("image_url"):
                 r["image_url"] = place_info.get("image_url")
             raw_results.append(r)
 
         # 같은 이미지 파일에 여러 장소가 붙은 경우: 이미지와 어울리는 장소명(해수욕장·해변 등) 우선, 하나만 노출
-        def _image_place_fit_score(name):
-            if not name:
-                return 0
-            n = name
-            if "해수욕장" in n or "해변" in n or "바다" in n or "해안" in n:
-                return 2
-            if "펜션" in n or "리조트" in n or "비치" in n:
-                return 1
-            return 0
-
-        def _is_restaurant_place(name):
-            if not name:
-                return False
-            n = name
-            return any(kw in n for kw in ("피자", "맛집", "식당", "카페", "음식점", "도우개러지", "빵", "커피"))
-
         # 상위 후보가 대부분 해변/해수욕장 계열이면 → 맛집/피자 계열은 잘못 매칭된 데이터로 보고 제외
-        beach_like_count = sum(1 for r in raw_results if _image_place_fit_score(r["place_name"]) >= 1)
+        beach_like_count = sum(1 for r in raw_results[:_K_CANDIDATES] if place_fit_score(r["place_name"]) >= 1)
         search_looks_beach = beach_like_count >= 2
         if search_looks_beach:
-            raw_results = [r for r in raw_results if not _is_restaurant_place(r["place_name"])]
+            raw_results = [r for r in raw_results if not is_restaurant_place(r["place_name"])]
 
         seen_image = {}
         for r in raw_results:
             f = r["image_file"]
-            fit = _image_place_fit_score(r["place_name"])
+            fit = place_fit_score(r["place_name"])
             if f not in seen_image or (fit > seen_image[f][1]) or (fit == seen_image[f][1] and r["score"] > seen_image[f][0]["score"]):
                 seen_image[f] = (r, fit)
         results = [v[0] for v in seen_image.values()]
         results.sort(key=lambda x: x['score'], reverse=True)
-        results = results[:3]
+        if self.covisit_index is not None:
+            for r in results:
+                r["also_visited"] = self.covisit_index.also_visited(
+                    visit_area_id=r.get("visit_area_id", ""), poi_id=r.get("poi_id", ""), limit=_ALSO_VISITED_LIMIT,
+                )
+        return results
+
+    def _short_guide_for(self, r: dict) -> str:
+        return self._generate_short_guide(
+            place_name=r.get("place_name", ""),
+            address=r.get("address", ""),
+            score=r.get("score", 0),
+            poi_name=r.get("poi_name", ""),
+            visit_area_type_cd=r.get("visit_area_type_cd", ""),
+            residence_time_min=r.get("residence_time_min", ""),
+            dgstfn=r.get("dgstfn", ""),
+        )
+
+    def _public_results(self, results: list[dict]) -> list[dict]:
+        """응답에는 프론트가 쓰는 필드만 남김 (부가 필드는 제거). visit_area_id는 세션 장소 제외용으로 유지."""
+        out = []
+        for r in results:
+            r = dict(r)
+            r.pop("poi_name", None)
+            r.pop("visit_area_type_cd", None)
+            r.pop("residence_time_min", None)
+            r.pop("dgstfn", None)
+            r.pop("poi_id", None)
+            placeholder = self._placeholders.get(r.get("image_file", ""))
+            if placeholder:
+                r["placeholder"] = placeholder
+            out.append(r)
+        return out
+
+    def _result_key(self, r: dict) -> tuple:
+        return (r.get("visit_area_id", ""), r.get("image_file", ""))
+
+    def analyze_image(
+        self,
+        image_input,
+        preference: str = "",
+        lat: float | None = None,
+        lng: float | None = None,
+        radius_km: float | None = None,
+        bbox: tuple | None = None,
+        use_exif_gps: bool = False,
+        facets: dict | None = None,
+    ):
+        """
+        사용자 이미지를 받아 유사 장소를 추천합니다.
+        image_input: 이미지 바이트 스트림 또는 PIL Image 객체
+        lat/lng/radius_km 또는 bbox(min_lat, min_lng, max_lat, max_lng)가 있으면 그 범위 안의 이미지만 비교합니다.
+        use_exif_gps: lat/lng 대신 업로드 사진의 EXIF GPS를 중심으로 사용
+        facets: {"visit_area_type": [...], "season": [...], "place_class": [...]} 에 맞는 이미지만 비교
+        응답의 session_id로 next_results()를 호출하면 재업로드 없이 다음 결과/장소 제외/취향 보정이 가능합니다.
+        """
+        # 1. 사용자 이미지 임베딩 (같은 이미지면 캐시 재사용)
+        user_img_emb = self._encode_upload(image_input)
+
+        # 2. 유사도 계산 (벡터 연산으로 고속 처리)
+        if len(self.db_features) == 0:
+            return {"success": False, "message": "비교할 DB 이미지가 없습니다."}
+        candidate_rows, geo_filter, error = self._candidate_rows(
+            image_input, lat=lat, lng=lng, radius_km=radius_km, bbox=bbox, use_exif_gps=use_exif_gps, facets=facets,
+        )
+        if error:
+            return error
+        return self._recommend_for_query(user_img_emb, candidate_rows, geo_filter, preference, image_input)
+
+    def analyze_images(
+        self,
+        images: list,
+        preference: str = "",
+        fusion: str = "mean",
+        lat: float | None = None,
+        lng: float | None = None,
+        radius_km: float | None = None,
+        bbox: tuple | None = None,
+        use_exif_gps: bool = False,
+        facets: dict | None = None,
+    ):
+        """
+        여러 장의 참고 사진으로 "이런 분위기의 장소"를 한 번에 추천합니다.
+        사진들을 한 배치로 인코딩하고, 유사도 계산은 한 번만 수행합니다.
+        fusion: "mean"(정규화 평균 벡터 1개로 검색) | "max"(사진별 유사도 중 최댓값, 한 번의 행렬곱)
+        위치/패싯 조건은 analyze_image와 동일. use_exif_gps면 GPS가 있는 첫 사진 기준.
+        """
+        if not images:
+            return {"success": False, "message": "사진을 한 장 이상 올려 주세요."}
+        if len(images) > MAX_QUERY_IMAGES:
+            return {"success": False, "message": f"사진은 최대 {MAX_QUERY_IMAGES}장까지 올릴 수 있습니다."}
+        if len(self.db_features) == 0:
+            return {"success": False, "message": "비교할 DB 이미지가 없습니다."}
+        fusion = (fusion or "mean").strip().lower()
+        if fusion not in ("mean", "max"):
+            return {"success": False, "message": "fusion은 mean 또는 max 만 지원합니다."}
+
+        embs = self._encode_uploads(images)
+        embs = embs / np.clip(np.linalg.norm(embs, axis=1, keepdims=True), 1e-12, None)
+        if fusion == "mean":
+            query_emb = embs.mean(axis=0)
+            query_emb = query_emb / (np.linalg.norm(query_emb) or 1.0)
+        else:
+            query_emb = embs
+
+        gps_source = images[0]
+        if use_exif_gps and (lat is None or lng is None):
+            gps_source = next((b for b in images if isinstance(b, bytes) and extract_exif_gps(b)), images[0])
+        candidate_rows, geo_filter, error = self._candidate_rows(
+            gps_source, lat=lat, lng=lng, radius_km=radius_km, bbox=bbox, use_exif_gps=use_exif_gps, facets=facets,
+        )
+        if error:
+            return error
+        out = self._recommend_for_query(query_emb, candidate_rows, geo_filter, preference, images[0])
+        out["fusion"] = fusion
+        out["image_count"] = len(images)
+        return out
+
+    def _candidate_rows(self, image_input, lat=None, lng=None, radius_km=None, bbox=None, use_exif_gps=False, facets=None):
+        """위치·패싯 조건 → (후보 행 | None, 위치 필터 정보, 후보가 없을 때의 오류 응답 | None)"""
+        # 위치 조건이 있으면 격자 인덱스로 후보 행만 골라 그 행들만 유사도 계산
+        candidate_rows, geo_filter = self._geo_candidate_rows(
+            image_input, lat=lat, lng=lng, radius_km=radius_km, bbox=bbox, use_exif_gps=use_exif_gps,
+        )
+        if candidate_rows is not None and candidate_rows.size == 0:
+            return None, geo_filter, {"success": False, "message": "지정한 위치 범위 안에 비교할 DB 이미지가 없습니다.", "geo_filter": geo_filter}
+        # 패싯 비트맵으로 한 번 더 후보 축소 (top-k 이전에 적용해야 선택적인 필터에서도 결과가 남음)
+        candidate_rows = self._facet_candidate_rows(facets, candidate_rows)
+        if candidate_rows is not None and candidate_rows.size == 0:
+            return None, geo_filter, {"success": False, "message": "선택한 조건(유형/계절/분류)에 맞는 DB 이미지가 없습니다.", "geo_filter": geo_filter}
+        return candidate_rows, geo_filter, None
+
+    def _recommend_for_query(self, user_img_emb, candidate_rows, geo_filter, preference, image_input):
+        """질의 벡터(들)로 후보 행을 랭킹 → 결과/가이드/검색 세션 생성. image_input은 결과 없을 때 Gemini 설명용."""
+        # 세션 페이지용으로 후보를 넉넉히 랭킹해 두고, 첫 페이지는 그중 상위 3개
+        ranked_rows, ranked_scores = self._rank_rows(user_img_emb, candidate_rows, k=self._session_candidates)
+        all_results = self._collect_results(ranked_rows, ranked_scores)
+        results = [dict(r) for r in all_results[:_PAGE_SIZE]]
 
         if results:
             # Top-1만 Gemini 호출 (429/한도 문제 최소화)
@@ -505,53 +1138,143 @@ class RecommendService:
                 retrieved_chunks=retrieved_chunks,
             )
             if not top1_guide:
-                top1_guide = self._generate_short_guide(
-                    place_name=top1.get("place_name", ""),
-                    address=top1.get("address", ""),
-                    score=top1.get("score", 0),
-                    poi_name=top1.get("poi_name", ""),
-                    visit_area_type_cd=top1.get("visit_area_type_cd", ""),
-                    residence_time_min=top1.get("residence_time_min", ""),
-                    dgstfn=top1.get("dgstfn", ""),
-                )
+                top1_guide = self._short_guide_for(top1)
             results[0]["guide"] = top1_guide
 
             # Top-2/3는 CSV 기반 짧은 설명으로 채움
             for i in range(1, len(results)):
-                r = results[i]
-                r["guide"] = self._generate_short_guide(
-                    place_name=r.get("place_name", ""),
-                    address=r.get("address", ""),
-                    score=r.get("score", 0),
-                    poi_name=r.get("poi_name", ""),
-                    visit_area_type_cd=r.get("visit_area_type_cd", ""),
-                    residence_time_min=r.get("residence_time_min", ""),
-                    dgstfn=r.get("dgstfn", ""),
-                )
+                results[i]["guide"] = self._short_guide_for(results[i])
 
-            # 응답에는 프론트가 쓰는 필드만 남김 (부가 필드는 제거)
-            for r in results:
-                r.pop("visit_area_id", None)
-                r.pop("poi_name", None)
-                r.pop("visit_area_type_cd", None)
-                r.pop("residence_time_min", None)
-                r.pop("dgstfn", None)
-            return {"success": True, "count": len(results), "results": results}
+            session_id = self._search_sessions.create({
+                "query_emb": np.asarray(user_img_emb, dtype=np.float32),
+                "candidate_rows": candidate_rows,
+                "results": all_results,
+                "shown": {self._result_key(r) for r in results},
+                "excluded": set(),
+                "preference_text": "",
+                "preference_weight": 0.0,
+            })
+            out = {
+                "success": True,
+                "count": len(results),
+                "results": self._public_results(results),
+                "session_id": session_id,
+                "has_more": len(all_results) > len(results),
+            }
+            if geo_filter:
+                out["geo_filter"] = geo_filter
+            return out
         else:
             # 유사 장소 없을 시 Gemini로 설명 시도 (429/한도 초과 시 500 방지)
-            if self.gemini_model:
+            out = {"success": False, "ai_analysis": "유사한 여행지를 찾지 못했습니다. 다른 사진을 올려 보세요."}
+            if self.llm:
                 try:
-                    analysis = self.gemini_model.generate_content(["이 사진이 어떤 사진인지 한국어로 한 문장 설명해줘.", user_img])
-                    ai_text = (analysis.text if analysis and hasattr(analysis, "text") else "") or ""
-                    return {"success": False, "ai_analysis": ai_text or "유사한 여행지를 찾지 못했습니다."}
+                    user_img = Image.open(io.BytesIO(image_input)) if isinstance(image_input, bytes) else image_input
+                    ai_text = self.llm.generate_sync(["이 사진이 어떤 사진인지 한국어로 한 문장 설명해줘.", user_img], site="image_caption")
+                    out["ai_analysis"] = ai_text or "유사한 여행지를 찾지 못했습니다."
                 except Exception as e:
                     reason = self._gemini_error_reason(e)
-                    return {"success": False, "ai_analysis": f"유사한 여행지를 찾지 못했습니다. [실패 사유] {reason}"}
-            return {"success": False, "ai_analysis": "유사한 여행지를 찾지 못했습니다. 다른 사진을 올려 보세요."}
+                    out["ai_analysis"] = f"유사한 여행지를 찾지 못했습니다. [실패 사유] {reason}"
+            if geo_filter:
+                out["geo_filter"] = geo_filter
+            return out
+
+    def next_results(
+        self,
+        session_id: str,
+        limit: int = _PAGE_SIZE,
+        exclude_visit_area_ids: list[str] | None = None,
+        preference_text: str = "",
+        preference_weight: float = 0.3,
+        reset: bool = False,
+    ):
+        """
+        검색 세션에서 아직 보여주지 않은 다음 결과를 반환합니다. (이미지 재업로드·재인코딩 없음)
+        exclude_visit_area_ids: 이후 결과에서 뺄 장소 (세션에 누적)
+        preference_text: 취향 문구. 질의 벡터를 텍스트 임베딩 쪽으로 preference_weight만큼 이동해 후보를 다시 랭킹
+        reset: 보여준 목록을 비우고 처음부터 다시
+        """
+        session = self._search_sessions.get(session_id)
+        if session is None:
+            return {"success": False, "message": "검색 세션이 없거나 만료되었습니다. 사진을 다시 올려 주세요."}
+        limit = max(1, min(int(limit or _PAGE_SIZE), 20))
+        session["excluded"].update(str(v) for v in (exclude_visit_area_ids or []) if str(v))
+        if reset:
+            session["shown"] = set()
+
+        preference_text = (preference_text or "").strip()
+        if preference_text and (
+            preference_text != session["preference_text"] or preference_weight != session["preference_weight"]
+        ):
+            # 질의 = 정규화(이미지 벡터) + w × 정규화(텍스트 벡터), 다시 정규화 (여러 장 질의면 각 벡터에 적용)
+            q = session["query_emb"]
+            q = q / np.clip(np.linalg.norm(q, axis=-1, keepdims=True), 1e-12, None)
+            t = self._encode_text(preference_text)
+            t = t / (np.linalg.norm(t) or 1.0)
+            nudged = q + float(preference_weight) * t
+            nudged = nudged / np.clip(np.linalg.norm(nudged, axis=-1, keepdims=True), 1e-12, None)
+            ranked_rows, ranked_scores = self._rank_rows(nudged, session["candidate_rows"], k=self._session_candidates)
+            session["results"] = self._collect_results(ranked_rows, ranked_scores)
+            session["preference_text"] = preference_text
+            session["preference_weight"] = preference_weight
+            session["shown"] = set()
+
+        remaining = [
+            r for r in session["results"]
+            if r.get("visit_area_id") not in session["excluded"] and self._result_key(r) not in session["shown"]
+        ]
+        page = [dict(r) for r in remaining[:limit]]
+        for r in page:
+            r["guide"] = self._short_guide_for(r)
+            session["shown"].add(self._result_key(r))
+        return {
+            "success": bool(page),
+            "count": len(page),
+            "results": self._public_results(page),
+            "session_id": session_id,
+            "has_more": len(remaining) > len(page),
+            "message": None if page else "더 보여드릴 유사 장소가 없습니다.",
+        }
+
+    def similar_places(self, visit_area_id: str, limit: int = 10, exclude_visit_area_ids: list[str] | None = None):
+        """
+        "비슷한 스타일 더 추천받기": 미리 계산한 장소 이웃 목록에서 조회 (벡터 검색 없음).
+        각 결과는 장소 대표 사진 기준. score는 장소 중심 벡터 간 코사인 유사도.
+        """
+        visit_area_id = str(visit_area_id or "").strip()
+        if self.place_knn is None or visit_area_id not in self.place_knn:
+            return {"success": False, "message": "이미지 검색 인덱스에 없는 장소입니다."}
+        limit = max(1, min(int(limit or 10), self.place_knn.k))
+        exclude = set(exclude_visit_area_ids or ()) | {visit_area_id}
+        results = []
+        for place, score in self.place_knn.similar(visit_area_id, limit=limit, exclude=exclude):
+            row = self.place_index.representative_row(place)
+            place_info = self._get_place_info_by_row(row)
+            if not place_info.get("success"):
+                continue
+            key = self.db_filenames[row]
+            r = {
+                "place_name": (place_info.get("place_name") or "").strip(),
+                "address": place_info.get("address", ""),
+                "score": score,
+                "image_file": key.split("|", 1)[1] if "|" in key else key,
+                "poi_name": place_info.get("poi_name", ""),
+                "visit_area_type_cd": place_info.get("visit_area_type_cd", ""),
+                "residence_time_min": place_info.get("residence_time_min", ""),
+                "dgstfn": place_info.get("dgstfn", ""),
+                "visit_area_id": self.place_knn.place_ids[place],
+            }
+            if place_info.get("image_url"):
+                r["image_url"] = place_info.get("image_url")
+            r["guide"] = self._short_guide_for(r)
+            results.append(r)
+        return {"success": bool(results), "count": len(results), "results": self._public_results(results)}
 
     def _gemini_error_reason(self, e: Exception) -> str:
         """Gemini API 예외를 사용자용 한글 사유로 변환"""
         err_msg = (str(e).strip() or "알 수 없는 오류").lower()
+        if "circuit_open" in err_msg or "rate_limited" in err_msg or "concurrency_limit" in err_msg:
+            return "Gemini API 요청이 많아 잠시 AI 응답을 쉬고 있습니다 — 잠시 후 다시 시도해 주세요."
         if "429" in err_msg or "quota" in err_msg or "exceeded" in err_msg:
             return "Gemini API 할당량 초과 — 요금제/결제 확인 후 잠시 후 재시도해 주세요."
         if "billing" in err_msg or "billable" in err_msg:
@@ -580,33 +1303,44 @@ class RecommendService:
         else:
             match = self.merged_df[self.merged_df['PHOTO_FILE_NM'] == file_name_or_key]
         if not match.empty:
-            row = match.iloc[0]
-            # merge 시 place 쪽이 _y, tour 쪽이 _x → 장소명은 place(VISIT_AREA_NM_y) 우선
-            p_name = self._safe_str(
-                row.get('VISIT_AREA_NM_y') or row.get('VISIT_AREA_NM_x') or row.get('VISIT_AREA_NM'),
-                ''
-            )
-            # 도로명 우선, 없으면 지번 주소 (없으면 빈 문자열로 노출 안 함)
-            addr = self._safe_str(row.get('ROAD_NM_ADDR')) or self._safe_str(row.get('LOTNO_ADDR'), '')
-            poi_name = self._safe_str(row.get("POI_NM")) or self._safe_str(row.get("POI_NM_y")) or self._safe_str(row.get("POI_NM_x"))
-            visit_area_type_cd = self._safe_str(row.get("VISIT_AREA_TYPE_CD"))
-            residence_time_min = self._safe_str(row.get("RESIDENCE_TIME_MIN"))
-            dgstfn = self._safe_str(row.get("DGSTFN"))
-            out = {
-                "visit_area_id": self._safe_str(row.get("VISIT_AREA_ID")),
-                "place_name": p_name,
-                "address": addr,
-                "poi_name": poi_name,
-                "visit_area_type_cd": visit_area_type_cd,
-                "residence_time_min": residence_time_min,
-                "dgstfn": dgstfn,
-                "success": True,
-            }
-            if "image_url" in row and row.get("image_url"):
-                out["image_url"] = self._safe_str(row.get("image_url"), "")
-            return out
+            return self._place_info_from_row(match.iloc[0])
         return {"success": False}
 
+    def _get_place_info_by_row(self, row_idx: int):
+        """db_features 행 번호로 장소 정보 (행→merged_df 매핑 사용, DataFrame 스캔 없음)."""
+        pos = self._row_place_idx[row_idx] if row_idx < len(self._row_place_idx) else -1
+        if pos < 0:
+            return {"success": False}
+        return self._place_info_from_row(self.merged_df.iloc[int(pos)])
+
+    def _place_info_from_row(self, row):
+        """merged_df 한 행 → 장소 정보 dict"""
+        # merge 시 place 쪽이 _y, tour 쪽이 _x → 장소명은 place(VISIT_AREA_NM_y) 우선
+        p_name = self._safe_str(
+            row.get('VISIT_AREA_NM_y') or row.get('VISIT_AREA_NM_x') or row.get('VISIT_AREA_NM'),
+            ''
+        )
+        # 도로명 우선, 없으면 지번 주소 (없으면 빈 문자열로 노출 안 함)
+        addr = self._safe_str(row.get('ROAD_NM_ADDR')) or self._safe_str(row.get('LOTNO_ADDR'), '')
+        poi_name = self._safe_str(row.get("POI_NM")) or self._safe_str(row.get("POI_NM_y")) or self._safe_str(row.get("POI_NM_x"))
+        visit_area_type_cd = self._safe_str(row.get("VISIT_AREA_TYPE_CD"))
+        residence_time_min = self._safe_str(row.get("RESIDENCE_TIME_MIN"))
+        dgstfn = self._safe_str(row.get("DGSTFN"))
+        out = {
+            "visit_area_id": self._safe_str(row.get("VISIT_AREA_ID")),
+            "poi_id": self._safe_str(row.get("POI_ID")),
+            "place_name": p_name,
+            "address": addr,
+            "poi_name": poi_name,
+            "visit_area_type_cd": visit_area_type_cd,
+            "residence_time_min": residence_time_min,
+            "dgstfn": dgstfn,
+            "success": True,
+        }
+        if "image_url" in row and row.get("image_url"):
+            out["image_url"] = self._safe_str(row.get("image_url"), "")
+        return out
+
     def _generate_short_guide(
         self,
         place_name: str,
@@ -640,7 +1374,7 @@ class RecommendService:
 
     def _generate_travel_guide(self, place_name, address, poi_name="", dgstfn="", preference: str = "", retrieved_chunks: list[str] | None = None):
         """Gemini 여행 가이드 생성 (근거 + Chroma retrieval 기반)"""
-        if not self.gemini_model:
+        if not self.llm:
             return "가이드를 생성할 수 없습니다. (.env에 GEMINI_API_KEY 설정 후 서버 재시작)"
         retrieved_chunks = retrieved_chunks or []
         evidence_lines = [
@@ -670,8 +1404,8 @@ class RecommendService:
 - 5문장 이내, 한국어.
 """
         try:
-            response = self.gemini_model.generate_content(prompt)
-            return response.text if response and response.text else f"{place_name} 방문을 추천합니다. 주소: {address}"
+            text = self.llm.generate_sync(prompt, site="recommend_guide")
+            return text or f"{place_name} 방문을 추천합니다. 주소: {address}"
         except Exception as e:
             reason = self._gemini_error_reason(e)
             return f"{place_name}({address}) 방문을 추천합니다. [가이드 생성 실패] {reason}"
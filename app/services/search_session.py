@@ -0,0 +1,61 @@
+"""
+이미지 검색 세션 저장소 (서버 메모리, TTL)
+첫 검색 때 만든 질의 임베딩·후보 범위·랭킹 결과를 세션 ID로 보관해 두고,
+다음 페이지/장소 제외/취향 보정 요청은 사진을 다시 올리거나 다시 인코딩하지 않고 이 세션에서 처리합니다.
+"""
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+
+class SearchSessionStore:
+    """
+    세션 ID → 세션 dict. 마지막 접근 후 ttl_sec 지나면 만료, max_sessions 초과 시 오래된 것부터 제거.
+    세션 dict 내용은 호출 측(RecommendService)이 정합니다.
+    """
+
+    def __init__(self, ttl_sec: int = 600, max_sessions: int = 500):
+        self.ttl_sec = max(int(ttl_sec), 1)
+        self.max_sessions = max(int(max_sessions), 1)
+        self._sessions: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _purge_expired(self, now: float) -> None:
+        while self._sessions:
+            sid, (expires_at, _) = next(iter(self._sessions.items()))
+            if expires_at > now:
+                break
+            self._sessions.pop(sid, None)
+
+    def create(self, session: dict) -> str:
+        """세션 저장 후 새 세션 ID 반환."""
+        session_id = uuid.uuid4().hex
+        now = time.monotonic()
+        with self._lock:
+            self._purge_expired(now)
+            self._sessions[session_id] = (now + self.ttl_sec, session)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return session_id
+
+    def get(self, session_id: str) -> dict | None:
+        """세션 조회 (접근 시 만료 시간 연장). 없거나 만료면 None."""
+        now = time.monotonic()
+        with self._lock:
+            self._purge_expired(now)
+            item = self._sessions.pop(session_id, None)
+            if item is None:
+                return None
+            session = item[1]
+            self._sessions[session_id] = (now + self.ttl_sec, session)
+            return session
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def __len__(self):
+        with self._lock:
+            self._purge_expired(time.monotonic())
+            return len(self._sessions)
@@ -0,0 +1,142 @@
+"""
+여행 분류(who/why/constraints/when) 의미 캐시
+정확한 키 캐시(classifier_cache)는 "아이랑 부산" / "부산에서 아이랑 갈 만한 곳"처럼 표현만 다른 발화를 놓칩니다.
+발화(최근 사용자 발화 포함)를 all-MiniLM-L6-v2로 임베딩해 메모리 벡터 인덱스에서 가장 가까운 기존 분류를 찾고,
+코사인 유사도가 SEMANTIC_CACHE_THRESHOLD 이상이면 LLM 없이 그 분류를 재사용합니다.
+(who/why/constraints/when은 지역과 무관하므로 "아이랑 부산"의 분류를 "아이랑 제주"에 재사용해도 됨.
+ 대화 단계는 표현이 아니라 대화 맥락에 달려 있어 저장하지 않고, 재사용 시 현재 발화로 다시 정함)
+임계값은 scripts/eval_semantic_cache.py로 LLM 분류와의 일치율 대비 절약 호출 수를 보고 정합니다.
+- 인덱스: 정규화 임베딩 행렬(최대 SEMANTIC_CACHE_MAX행, 가득 차면 가장 오래된 행부터 덮어씀) + 행별 저장 시각(TTL)
+- 인코더: RecommendService가 이미 로드한 text_model(all-MiniLM-L6-v2)을 공유, 없으면 직접 로드
+"""
+import threading
+import time
+
+import numpy as np
+
+try:
+    from app.core.config import settings
+except Exception:
+    settings = None
+
+CLASSIFICATION_FIELDS = ("who", "why", "constraints", "when_info")
+
+
+def semantic_text(user_turns, message: str, max_turns: int = 2) -> str:
+    """임베딩할 텍스트: 최근 사용자 발화 max_turns개 + 현재 발화 (assistant 발화는 템플릿이라 제외)"""
+    parts = [str(t).strip() for t in list(user_turns)[-max_turns:] if str(t).strip()]
+    parts.append(str(message or "").strip())
+    return " / ".join(p for p in parts if p)
+
+
+class SemanticClassifierCache:
+    def __init__(self, encoder=None, threshold: float = 0.9, max_items: int = 5000, ttl_sec: float = 86400.0):
+        """encoder: 텍스트 목록 → (n×d) 임베딩을 돌려주는 함수. None이면 첫 사용 시 기본 인코더."""
+        self._encoder = encoder
+        self.threshold = float(threshold)
+        self.max_items = max(int(max_items), 1)
+        self.ttl_sec = float(ttl_sec)
+        self._vectors = None  # (max_items × d) float32, 행 정규화
+        self._stored_at = np.full(self.max_items, -np.inf)
+        self._values = [None] * self.max_items
+        self._texts = [None] * self.max_items
+        self._next = 0
+        self._size = 0
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "stores": 0, "encode_errors": 0, "conflicts": 0}  # conflicts: 적중했지만 발화 키워드와 어긋나 버린 수 (분류 노드)
+
+    # ---------- 임베딩 ----------
+    def _encode(self, texts) -> np.ndarray:
+        if self._encoder is None:
+            self._encoder = default_encoder()
+        vecs = np.atleast_2d(np.asarray(self._encoder(list(texts)), dtype=np.float32))
+        norms = np.linalg.norm(vecs, axis=1, keepdims=True)
+        return vecs / np.maximum(norms, 1e-12)
+
+    def encode(self, text: str):
+        """텍스트 → 정규화 임베딩 (실패 시 None)"""
+        try:
+            return self._encode([text])[0]
+        except Exception as e:
+            self.counters["encode_errors"] += 1
+            print(f"[semantic_cache] 임베딩 실패: {type(e).__name__} {e}")
+            return None
+
+    # ---------- 조회/저장 ----------
+    def nearest(self, vec: np.ndarray):
+        """(유사도, 분류 dict, 저장 텍스트) 또는 None. TTL 지난 행은 제외."""
+        with self._lock:
+            if self._size == 0 or self._vectors is None:
+                return None
+            sims = self._vectors[: self._size] @ vec
+            alive = time.time() - self._stored_at[: self._size] <= self.ttl_sec
+            sims = np.where(alive, sims, -np.inf)
+            i = int(np.argmax(sims))
+            if not np.isfinite(sims[i]):
+                return None
+            return float(sims[i]), self._values[i], self._texts[i]
+
+    def lookup(self, vec, threshold=None):
+        """임계값 이상으로 가까운 기존 분류(dict 사본) 또는 None"""
+        if vec is None:
+            return None
+        found = self.nearest(vec)
+        if found is None or found[0] < (self.threshold if threshold is None else threshold):
+            self.counters["misses"] += 1
+            return None
+        self.counters["hits"] += 1
+        return {k: (dict(v) if isinstance(v, dict) else v) for k, v in found[1].items()}
+
+    def add(self, vec, text: str, value: dict) -> None:
+        if vec is None:
+            return
+        value = {k: value.get(k) for k in CLASSIFICATION_FIELDS}
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.max_items, len(vec)), dtype=np.float32)
+            i = self._next
+            self._vectors[i] = vec
+            self._stored_at[i] = time.time()
+            self._values[i] = value
+            self._texts[i] = text
+            self._next = (i + 1) % self.max_items
+            self._size = min(self._size + 1, self.max_items)
+        self.counters["stores"] += 1
+
+    def stats(self) -> dict:
+        lookups = self.counters["hits"] + self.counters["misses"]
+        return {
+            "items": self._size,
+            "max_items": self.max_items,
+            "threshold": self.threshold,
+            "hit_rate": round(self.counters["hits"] / lookups, 3) if lookups else 0.0,
+            **self.counters,
+        }
+
+
+def default_encoder():
+    """RecommendService의 all-MiniLM-L6-v2를 공유 (이미 로드돼 있으면 재사용), 아니면 직접 로드."""
+    try:
+        from app.services.recommend_service import recommend_service
+
+        model = recommend_service.text_model
+    except Exception:
+        from sentence_transformers import SentenceTransformer
+
+        model = SentenceTransformer("all-MiniLM-L6-v2")
+    return lambda texts: model.encode(texts)
+
+
+_default_cache = None
+
+
+def get_semantic_cache() -> SemanticClassifierCache:
+    """프로세스 공용 의미 캐시"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = SemanticClassifierCache(
+            threshold=getattr(settings, "SEMANTIC_CACHE_THRESHOLD", 0.9) if settings else 0.9,
+            max_items=getattr(settings, "SEMANTIC_CACHE_MAX", 5000) if settings else 5000,
+            ttl_sec=getattr(settings, "CLASSIFIER_CACHE_TTL_SEC", 86400) if settings else 86400,
+        )
+    return _default_cache
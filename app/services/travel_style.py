@@ -2,23 +2,19 @@
 여행 스타일 서비스
 선택한 관심사에 따라 타입별 퍼센트(복합) 분석, Gemini API로 여행지 추천
 """
+import asyncio
 import json
 import logging
-import requests
 
-from app.core.config import settings
-
-try:
-    import google.generativeai as genai
-    _HAS_GENAI = True
-except ImportError:
-    _HAS_GENAI = False
 from app.domain.travel_style import TRAVEL_TYPES, KEYWORD_TO_TYPE
+from app.core.config import settings
+from app.services.keyword_matcher import match_keywords
+from app.services.llm_service import LLMUnavailableError, llm_service
+from app.services.travel_style_table import get_travel_style_table
 
 logger = logging.getLogger(__name__)
 
-# === Gemini API (config에서 키 사용) ===
-GEMINI_BASE = "https://generativelanguage.googleapis.com/v1beta/models"
+# === Gemini API (공용 LLM 게이트웨이, 앞 모델부터 시도) ===
 GEMINI_MODELS_ORDER = [
     "gemini-2.5-flash",
     "gemini-2.5-flash-preview-05-20",
@@ -27,12 +23,17 @@ GEMINI_MODELS_ORDER = [
     "gemini-1.0-flash",
     "gemini-pro",
 ]
+# 헤징: 앞 모델 응답이 HEDGE_DELAY_SEC 안에 없으면(또는 실패하면) 다음 모델도 시작, 먼저 온 유효 JSON 사용.
+# 전체는 DEADLINE_SEC 안에 끝내고, 넘기면 키워드 기반 fallback
+HEDGE_DELAY_SEC = getattr(settings, "TRAVEL_STYLE_HEDGE_DELAY_SEC", 2.0)
+DEADLINE_SEC = getattr(settings, "TRAVEL_STYLE_DEADLINE_SEC", 12.0)
 
 def _compute_type_breakdown(interests: list[str]) -> list[dict]:
     """관심사 3개 → 각 타입별 퍼센트 (선택한 것에 따라 복합적으로)"""
     type_counts: dict[str, int] = {}
     for kw in interests:
-        t = KEYWORD_TO_TYPE.get(kw) or "복합형"
+        # 고정 키워드는 dict 조회, 자유 입력("서핑 체험")은 키워드 매처로 포함된 키워드의 타입
+        t = KEYWORD_TO_TYPE.get(kw) or match_keywords(str(kw)).first("travel_type") or "복합형"
         type_counts[t] = type_counts.get(t, 0) + 1
     n = len(interests)
     breakdown = [
@@ -91,10 +92,106 @@ def _fallback_analyze(interests: list[str]) -> dict:
     }
 
 
-def analyze_interests(interests: list[str]) -> dict:
+def _build_result(llm_response: str, interests: list[str]) -> dict:
+    """Gemini 응답 텍스트(JSON) → 분석 결과 dict (타입 비율은 관심사 기준으로 다시 계산)"""
+    try:
+        result = json.loads(llm_response)
+    except json.JSONDecodeError:
+        if "```json" in llm_response:
+            llm_response = llm_response.split("```json")[1].split("```")[0]
+        result = json.loads(llm_response.strip())
+    return _finalize(result, interests)
+
+
+def _finalize(result: dict, interests: list[str]) -> dict:
+    """LLM 결과(또는 사전 계산 테이블 값) + 관심사 기준 타입 비율·설명 → 응답 dict"""
+    breakdown = _compute_type_breakdown(interests)
+    result["matched_type"] = _composite_label(breakdown)
+    primary_type = breakdown[0]["type"] if breakdown else "복합형"
+    type_info = dict(TRAVEL_TYPES.get(primary_type, TRAVEL_TYPES["복합형"]))
+    type_info["description"] = _composite_description(breakdown)
+    type_info["destinations"] = result.get("destinations") or []
+    result["type_info"] = type_info
+    result["user_interests"] = interests
+    return result
+
+
+async def _try_model(prompt: str, model: str, interests: list[str]) -> dict:
+    """모델 1개: JSON 응답 모드 → 일반 모드 순서로 시도. 유효한 결과가 없으면 예외."""
+    last_error = None
+    for json_mode in (True, False):
+        try:
+            llm_response = (await llm_service.generate(
+                prompt, site="travel_style", model=model, temperature=0.3, json_mode=json_mode,
+            )).strip()
+            if llm_response:
+                return _build_result(llm_response, interests)
+            last_error = ValueError("빈 응답")
+        except LLMUnavailableError:
+            raise  # 회로 열림·한도 초과: 같은 모델 재시도 없이 다음 후보로
+        except Exception as e:
+            last_error = e
+    raise last_error
+
+
+async def _hedged_analyze(prompt: str, interests: list[str]):
+    """
+    GEMINI_MODELS_ORDER 순서로 헤징 호출. 첫 모델을 시작하고, HEDGE_DELAY_SEC 동안 결과가 없거나 실패하면 다음 모델을 추가로 시작.
+    가장 먼저 성공한 결과를 반환하고 나머지는 취소. DEADLINE_SEC 안에 성공이 없으면 None.
     """
-    관심사 3개를 받아 Gemini API로 여행 타입을 매칭합니다.
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + DEADLINE_SEC
+    candidates = iter(GEMINI_MODELS_ORDER)
+    tasks = {}  # task → 모델명
+
+    def launch_next() -> bool:
+        model = next(candidates, None)
+        if model is None:
+            return False
+        tasks[asyncio.create_task(_try_model(prompt, model, interests))] = model
+        return True
+
+    launch_next()
+    try:
+        while tasks:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                logger.warning("Gemini 여행 스타일 분석 %.1f초 마감 초과 → fallback", DEADLINE_SEC)
+                return None
+            done, _ = await asyncio.wait(tasks, timeout=min(HEDGE_DELAY_SEC, remaining), return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                model = tasks.pop(task)
+                if task.exception() is None:
+                    return task.result()
+                logger.warning("Gemini [%s] 실패: %s", model, task.exception())
+                launch_next()  # 실패한 후보 대신 바로 다음 후보
+            if not done:
+                launch_next()  # 헤지 지연 경과: 기존 호출은 두고 다음 후보 추가
+        return None
+    finally:
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def analyze_interests(interests: list[str]) -> dict:
     """
+    관심사 3개를 받아 여행 타입을 매칭합니다.
+    사전 계산 테이블에 있는 조합이면 바로 반환하고, 없을 때만 Gemini API를 실시간 호출합니다.
+    """
+    entry = get_travel_style_table().get(interests)
+    if entry is not None:
+        return _finalize(dict(entry), list(interests))
+    result = await analyze_interests_live(interests)
+    if result is None:
+        return _fallback_analyze(interests)
+    get_travel_style_table().put(interests, result)
+    return result
+
+
+def _build_prompt(interests: list[str]) -> str:
+    """관심사 → Gemini 분석 프롬프트"""
     types_description = "\n".join([
         f"- {name}: {info['description']}"
         for name, info in TRAVEL_TYPES.items()
@@ -129,98 +226,16 @@ def analyze_interests(interests: list[str]) -> dict:
 
 규칙: destinations는 반드시 2~3개, 한국 내 여행지만, 선택한 관심사 조합에 맞게 추천.
 """
-    key = (settings.GOOGLE_API_KEY or "").strip()  # config/.env 에서 Gemini 키 불러옴
-    if not key:
+    return prompt
+
+
+async def analyze_interests_live(interests: list[str]):
+    """Gemini 실시간 분석 (모델 헤징, 마감 적용). 키가 없거나 마감 안에 성공하지 못하면 None."""
+    if not llm_service.available:  # config/.env 에서 Gemini 키 불러옴
         logger.warning("GOOGLE_API_KEY 없음. config 또는 .env 에 Gemini API 키를 넣으면 AI 추천이 구동됩니다.")
-        return _fallback_analyze(interests)
+        return None
+    return await _hedged_analyze(_build_prompt(interests), interests)
 
-    # 1) google-generativeai 라이브러리로 시도
-    if _HAS_GENAI:
-        for model_name in ["gemini-1.5-flash", "gemini-1.5-pro", "gemini-pro"]:
-            try:
-                genai.configure(api_key=key)
-                model = genai.GenerativeModel(model_name)
-                try:
-                    response = model.generate_content(
-                        prompt,
-                        generation_config=genai.GenerationConfig(
-                            temperature=0.3,
-                            response_mime_type="application/json",
-                        ),
-                    )
-                except Exception:
-                    response = model.generate_content(
-                        prompt,
-                        generation_config=genai.GenerationConfig(temperature=0.3),
-                    )
-                llm_response = (response.text or "").strip()
-                if not llm_response:
-                    continue
-                try:
-                    result = json.loads(llm_response)
-                except json.JSONDecodeError:
-                    if "```json" in llm_response:
-                        llm_response = llm_response.split("```json")[1].split("```")[0]
-                    result = json.loads(llm_response.strip())
-                breakdown = _compute_type_breakdown(interests)
-                result["matched_type"] = _composite_label(breakdown)
-                primary_type = breakdown[0]["type"] if breakdown else "복합형"
-                type_info = dict(TRAVEL_TYPES.get(primary_type, TRAVEL_TYPES["복합형"]))
-                type_info["description"] = _composite_description(breakdown)
-                type_info["destinations"] = result.get("destinations") or []
-                result["type_info"] = type_info
-                result["user_interests"] = interests
-                return result
-            except Exception as e:
-                logger.warning("Gemini SDK [%s] 실패: %s", model_name, e)
-                continue
-
-    # 2) REST API 직접 호출
-    headers = {
-        "Content-Type": "application/json",
-        "x-goog-api-key": key,
-    }
-    payloads = [
-        {"contents": [{"parts": [{"text": prompt}]}], "generationConfig": {"temperature": 0.3, "responseMimeType": "application/json"}},
-        {"contents": [{"parts": [{"text": prompt}]}], "generationConfig": {"temperature": 0.3}},
-    ]
 
-    for model in GEMINI_MODELS_ORDER:
-        url = f"{GEMINI_BASE}/{model}:generateContent?key={key}"
-        for payload in payloads:
-            try:
-                response = requests.post(url, headers=headers, json=payload, timeout=30)
-                if not response.ok:
-                    err_body = (response.text or "")[:400]
-                    logger.warning("Gemini [%s] HTTP %s: %s", model, response.status_code, err_body)
-                    continue
-                data = response.json()
-                candidates = data.get("candidates") or []
-                if not candidates:
-                    logger.warning("Gemini [%s] 응답에 candidates 없음", model)
-                    continue
-                parts = (candidates[0].get("content") or {}).get("parts") or []
-                if not parts or "text" not in parts[0]:
-                    continue
-                llm_response = parts[0]["text"]
-                try:
-                    result = json.loads(llm_response)
-                except json.JSONDecodeError:
-                    if "```json" in llm_response:
-                        llm_response = llm_response.split("```json")[1].split("```")[0]
-                    result = json.loads(llm_response.strip())
-
-                breakdown = _compute_type_breakdown(interests)
-                result["matched_type"] = _composite_label(breakdown)
-                primary_type = breakdown[0]["type"] if breakdown else "복합형"
-                type_info = dict(TRAVEL_TYPES.get(primary_type, TRAVEL_TYPES["복합형"]))
-                type_info["description"] = _composite_description(breakdown)
-                type_info["destinations"] = result.get("destinations") or []
-                result["type_info"] = type_info
-                result["user_interests"] = interests
-                return result
-            except Exception as e:
-                logger.warning("Gemini [%s] 예외: %s", model, e)
-                continue
-
-    return _fallback_analyze(interests)
+# 서버 시작 시(라우터 import 시) 사전 계산 테이블 로드
+get_travel_style_table()
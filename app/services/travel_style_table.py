@@ -0,0 +1,162 @@
+"""
+여행 스타일 분석 사전 계산 테이블 (관심사 3개 조합 → Gemini 분석 결과)
+관심사는 INTEREST_OPTIONS의 고정 키워드(35개)에서 3개를 고르므로 조합은 수천 개뿐입니다.
+scripts/precompute_travel_styles.py가 모든 조합을 미리 분석해 embedding_cache/travel_style_table.json에 저장하고,
+/travel-style/analyze는 서버 시작 시 읽어 둔 이 테이블을 dict 조회 한 번으로 응답합니다.
+- 키는 순서와 무관 (정렬한 키워드를 "|"로 연결)
+- 값은 LLM이 만든 부분만 저장 (reason, confidence, secondary_type, destinations). 타입 비율·설명은 조회 시 다시 계산
+- 파일 변경 확인·재로드는 백그라운드 스레드가 TRAVEL_STYLE_TABLE_REFRESH_SEC마다 수행 (요청 경로에서는 dict 조회만)
+- 테이블에 없는 조합만 실시간 LLM 호출 → 결과를 메모리 테이블에 추가.
+  단, 키워드가 모두 INTEREST_OPTIONS에 있는 조합만 (자유 입력으로 메모리가 늘지 않게) 최대 TRAVEL_STYLE_LIVE_MAX개 LRU
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from app.domain.travel_style import INTEREST_OPTIONS
+
+try:
+    from app.core.config import settings
+except Exception:
+    settings = None
+
+TABLE_FILE_NAME = "travel_style_table.json"
+STORED_FIELDS = ("confidence", "reason", "secondary_type", "destinations")
+
+
+def combo_key(interests) -> str:
+    """관심사 목록 → 순서 무관 키 (중복 제거, 정렬)"""
+    return "|".join(sorted({str(k).strip() for k in interests if str(k).strip()}))
+
+
+def table_entry(result: dict) -> dict:
+    """analyze 결과 → 테이블 저장용 값 (LLM이 만든 필드만)"""
+    entry = {k: result.get(k) for k in STORED_FIELDS if k != "destinations"}
+    entry["destinations"] = result.get("destinations") or (result.get("type_info") or {}).get("destinations") or []
+    return entry
+
+
+def default_table_path() -> str:
+    base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    return os.path.join(base_dir, "embedding_cache", TABLE_FILE_NAME)
+
+
+def save_table(path: str, items: dict, meta=None) -> None:
+    """원자적 저장 (임시 파일 → 교체). 한 줄 JSON으로 작게 씀."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({**(meta or {}), "items": items}, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def interest_keywords() -> set:
+    """INTEREST_OPTIONS의 고정 키워드 전체"""
+    return {kw for option in INTEREST_OPTIONS for kw in option["keywords"]}
+
+
+class TravelStyleTable:
+    def __init__(self, path: str, refresh_sec: float = 60.0, allowed_keywords=None, max_live: int = 2000):
+        """allowed_keywords: 실시간 결과를 저장해도 되는 키워드 집합 (None이면 제한 없음), max_live: 실시간 결과 LRU 크기"""
+        self.path = path
+        self.refresh_sec = float(refresh_sec)
+        self.allowed_keywords = set(allowed_keywords) if allowed_keywords is not None else None
+        self.max_live = max(int(max_live), 0)
+        self._items = {}
+        self._live = OrderedDict()  # 파일에 없어서 실시간으로 채운 조합 (다시 읽어도 유지)
+        self._mtime = None
+        self._lock = threading.Lock()
+        self._refresher = None
+        self.reload()
+
+    def __len__(self):
+        return len(self._items) + len(self._live)
+
+    def start_refresh(self) -> None:
+        """refresh_sec마다 파일 변경을 확인하는 데몬 스레드 시작 (한 번만)"""
+        if self._refresher is not None or self.refresh_sec <= 0:
+            return
+        def loop():
+            while True:
+                time.sleep(self.refresh_sec)
+                try:
+                    self.reload()
+                except Exception as e:
+                    print(f"여행 스타일 테이블 재로드 실패: {e}")
+
+        self._refresher = threading.Thread(target=loop, name="travel-style-table-refresh", daemon=True)
+        self._refresher.start()
+
+    def reload(self) -> bool:
+        """파일이 바뀌었으면 다시 읽음. 읽었으면 True."""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return False
+        if mtime == self._mtime:
+            return False
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                items = json.load(f).get("items", {})
+        except Exception as e:
+            print(f"여행 스타일 테이블 로드 실패: {e}")
+            return False
+        with self._lock:
+            self._items = items
+            self._live = OrderedDict((k, v) for k, v in self._live.items() if k not in items)
+            self._mtime = mtime
+        print(f"여행 스타일 테이블: 조합 {len(items)}개 로드")
+        return True
+
+    def file_items(self) -> dict:
+        """파일에서 읽은 조합 (적재 작업이 이어서 채울 때 사용)"""
+        return dict(self._items)
+
+    def get(self, interests):
+        """관심사 목록 → 저장된 값(dict) 또는 None (파일 재로드는 백그라운드 스레드 담당)"""
+        key = combo_key(interests)
+        entry = self._items.get(key)
+        if entry is not None:
+            return entry
+        with self._lock:
+            entry = self._live.get(key)
+            if entry is not None:
+                self._live.move_to_end(key)
+        return entry
+
+    def put(self, interests, result: dict) -> bool:
+        """
+        실시간 LLM 결과를 메모리 테이블에 추가 (파일은 적재 작업이 갱신). 저장했으면 True.
+        allowed_keywords 밖의 키워드(자유 입력)가 섞인 조합은 저장하지 않음.
+        """
+        if self.max_live == 0:
+            return False
+        if self.allowed_keywords is not None and not all(str(k).strip() in self.allowed_keywords for k in interests):
+            return False
+        key = combo_key(interests)
+        with self._lock:
+            self._live[key] = table_entry(result)
+            self._live.move_to_end(key)
+            while len(self._live) > self.max_live:
+                self._live.popitem(last=False)
+        return True
+
+
+_default_table = None
+
+
+def get_travel_style_table() -> TravelStyleTable:
+    """프로세스 공용 테이블 (첫 호출 시 로드, 이후 백그라운드 재로드)"""
+    global _default_table
+    if _default_table is None:
+        custom = getattr(settings, "TRAVEL_STYLE_TABLE_PATH", "") if settings else ""
+        _default_table = TravelStyleTable(
+            custom or default_table_path(),
+            refresh_sec=getattr(settings, "TRAVEL_STYLE_TABLE_REFRESH_SEC", 60) if settings else 60,
+            allowed_keywords=interest_keywords(),
+            max_live=getattr(settings, "TRAVEL_STYLE_LIVE_MAX", 2000) if settings else 2000,
+        )
+        _default_table.start_refresh()
+    return _default_table
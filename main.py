@@ -3,8 +3,8 @@ from fastapi.responses import FileResponse, HTMLResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
 import os
 from app.core.config import settings
+from app.api.images import router as images_router
 from app.api.v1.router import api_router
-from app.core.config import settings
 
 
 app = FastAPI(
@@ -13,6 +13,7 @@ app = FastAPI(
 )
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
+app.include_router(images_router)
 
 
 @app.get("/favicon.ico", include_in_schema=False)
@@ -46,35 +47,8 @@ def demo_redirect():
 # =============================================================================
 # 정적 파일 / 이미지 (로컬 없으면 국내 여행로그 데이터 폴더에서 서빙)
 
+# /images 서빙은 app/api/images.py (app/main.py와 공용)
 base_path = os.path.dirname(os.path.abspath(__file__))
-images_path = os.path.join(base_path, "images")
-travel_data_root = os.path.abspath(os.environ.get("TRAVEL_DATA_ROOT") or os.path.join(base_path, ".."))
-_travel_regions = ["수도권", "동부권", "서부권", "제주도 및 도서지역"]
-
-
-def _resolve_image_path(filename: str):
-    """backend-fastapi/images 또는 국내 여행로그 데이터(지역)/Sample/01.원천데이터/photo 에서 파일 경로 반환."""
-    if ".." in filename or "/" in filename.replace("\\", "/"):
-        return None
-    local = os.path.join(images_path, filename)
-    if os.path.isfile(local):
-        return local
-    for region in _travel_regions:
-        path = os.path.join(travel_data_root, f"국내 여행로그 데이터({region})", "Sample", "01.원천데이터", "photo", filename)
-        if os.path.isfile(path):
-            return path
-    return None
-
-
-@app.get("/images/{file_path:path}")
-def serve_image(file_path: str):
-    """이미지 파일 서빙 (로컬 images/ 또는 국내 여행로그 데이터 photo 폴더)."""
-    resolved = _resolve_image_path(file_path.strip())
-    if resolved:
-        mt = "image/png" if file_path.lower().endswith(".png") else "image/jpeg"
-        return FileResponse(resolved, media_type=mt)
-    from fastapi.responses import JSONResponse
-    return JSONResponse(status_code=404, content={"detail": "Not found"})
 
 
 @app.get("/home")
@@ -0,0 +1,103 @@
+"""
+압축 임베딩 계층 벤치마크 — 재현율/지연/메모리 비교용.
+backend-fastapi 폴더에서: python scripts/bench_compressed_index.py
+
+embedding_cache/features.npy(서버가 만든 실제 CLIP 임베딩)가 있으면 그것으로,
+행 수가 BENCH_MIN_ROWS보다 적으면 합성 임베딩(장소별로 뭉친 정규화 512차원 float32)을 덧붙여 측정합니다.
+모드별로 1차 근사 스캔 → 상위 N개 원본(mmap) 재점수 결과를 전체 정확 스캔 top-k와 비교합니다.
+
+환경변수(선택):
+- BENCH_FEATURES: 임베딩 npy 경로 (기본 embedding_cache/features.npy)
+- BENCH_MIN_ROWS: 이보다 적으면 합성 행 추가 (기본 100000)
+- BENCH_QUERIES: 질의 수 (기본 50)
+- BENCH_PCA_DIM: PCA 차원 (기본 128)
+- BENCH_RERANK_N: 재점수 후보 수 (기본 200)
+- BENCH_SYN_DECAY: 합성 임베딩 차원별 표준편차 감소 지수 (기본 0.75)
+"""
+import os
+import sys
+import tempfile
+import time
+
+BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE)
+
+import numpy as np
+
+from app.services.compressed_index import COMPRESSION_MODES, CompressedIndex
+
+FEATURES_PATH = os.environ.get("BENCH_FEATURES") or os.path.join(BASE, "embedding_cache", "features.npy")
+MIN_ROWS = int(os.environ.get("BENCH_MIN_ROWS", "100000"))
+QUERIES = int(os.environ.get("BENCH_QUERIES", "50"))
+PCA_DIM = int(os.environ.get("BENCH_PCA_DIM", "128"))
+RERANK_N = int(os.environ.get("BENCH_RERANK_N", "200"))
+SYN_DECAY = float(os.environ.get("BENCH_SYN_DECAY", "0.75"))
+TOP_K = 20
+
+
+def _load_features(rng):
+    feats = np.empty((0, 512), dtype=np.float32)
+    if os.path.isfile(FEATURES_PATH):
+        feats = np.load(FEATURES_PATH).astype(np.float32)
+        print(f"실제 임베딩: {FEATURES_PATH} ({feats.shape[0]}행 × {feats.shape[1]}차원)")
+    if feats.shape[0] < MIN_ROWS:
+        n_syn = MIN_ROWS - feats.shape[0]
+        dim = feats.shape[1] if feats.shape[0] else 512
+        centers = rng.standard_normal((max(n_syn // 8, 1), dim), dtype=np.float32)
+        syn = centers[rng.integers(len(centers), size=n_syn)] + 0.6 * rng.standard_normal((n_syn, dim), dtype=np.float32)
+        # CLIP 임베딩처럼 분산이 앞쪽 몇몇 방향에 몰리도록 차원별 분산을 멱법칙으로 감소 (등방성 잡음이면 PCA가 의미 없음)
+        syn *= (np.arange(1, dim + 1, dtype=np.float32) ** -SYN_DECAY)
+        feats = np.concatenate([feats, syn])
+        print(f"합성 임베딩 {n_syn}행 추가 (장소 {len(centers)}개 × 평균 8장, 차원별 표준편차 ∝ i^-{SYN_DECAY})")
+    return feats / np.linalg.norm(feats, axis=1, keepdims=True)
+
+
+def _top_k(scores, k):
+    k = min(k, scores.shape[0])
+    idx = np.argpartition(-scores, k - 1)[:k]
+    return idx[np.argsort(-scores[idx])]
+
+
+def _median_ms(samples):
+    samples = sorted(samples)
+    return samples[len(samples) // 2]
+
+
+def main():
+    rng = np.random.default_rng(0)
+    feats = _load_features(rng)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "features.npy")
+        np.save(path, feats)
+        mapped = np.load(path, mmap_mode="r")
+
+        queries = feats[rng.integers(feats.shape[0], size=QUERIES)] + 0.5 * rng.standard_normal((QUERIES, feats.shape[1]), dtype=np.float32)
+        queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+        truth, exact_ms = [], []
+        for q in queries:
+            t0 = time.perf_counter()
+            truth.append(set(_top_k(feats @ q, TOP_K).tolist()))
+            exact_ms.append((time.perf_counter() - t0) * 1000)
+
+        print(f"\n{feats.shape[0]}행, 질의 {QUERIES}개, top-{TOP_K}, 재점수 후보 {RERANK_N}개, PCA {PCA_DIM}차원")
+        print(f"{'방식':<14}{'메모리(MiB)':>12}{'생성(s)':>10}{'지연 ms':>10}{'recall@' + str(TOP_K):>12}")
+        print(f"{'float32 전체':<14}{feats.nbytes / 2**20:>12.1f}{'-':>10}{_median_ms(exact_ms):>10.2f}{1.0:>12.3f}")
+
+        for mode in COMPRESSION_MODES:
+            t0 = time.perf_counter()
+            index = CompressedIndex.build(mapped, mode=mode, dim=PCA_DIM)
+            build_s = time.perf_counter() - t0
+            recalls, lat = [], []
+            for q, true_set in zip(queries, truth):
+                t0 = time.perf_counter()
+                rows = np.sort(index.shortlist(q, RERANK_N))
+                exact = np.asarray(mapped[rows]) @ q
+                found = rows[_top_k(exact, TOP_K)]
+                lat.append((time.perf_counter() - t0) * 1000)
+                recalls.append(len(true_set & set(found.tolist())) / TOP_K)
+            print(f"{mode:<14}{index.nbytes / 2**20:>12.1f}{build_s:>10.2f}{_median_ms(lat):>10.2f}{np.mean(recalls):>12.3f}")
+        del mapped
+
+
+if __name__ == "__main__":
+    main()
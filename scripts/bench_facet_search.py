@@ -0,0 +1,106 @@
+"""
+패싯 사전 필터 검색 벤치마크 — 필터가 매우 선택적일 때도 빠른지 확인용.
+backend-fastapi 폴더에서: python scripts/bench_facet_search.py
+
+합성 임베딩(정규화된 512차원 float32)과 합성 패싯 값으로 FacetIndex를 만든 뒤,
+  - 전체 스캔 후 top-k
+  - 비트맵 → 후보 행 → 후보만 스캔 후 top-k
+를 선택도별로 비교합니다. CLIP/DB 없이 numpy만 사용합니다.
+
+환경변수(선택):
+- BENCH_ROWS: 행 수 (기본 100000)
+- BENCH_DIM: 차원 (기본 512)
+- BENCH_REPEAT: 측정 반복 횟수 (기본 20)
+"""
+import os
+import sys
+import time
+
+BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE)
+
+import numpy as np
+
+from app.services.facet_index import FacetIndex
+
+ROWS = int(os.environ.get("BENCH_ROWS", "100000"))
+DIM = int(os.environ.get("BENCH_DIM", "512"))
+REPEAT = int(os.environ.get("BENCH_REPEAT", "20"))
+TOP_K = 20
+
+# 선택도(전체 대비 후보 비율)별로 패싯 값 하나씩 만들어 둠
+SELECTIVITIES = [0.5, 0.1, 0.01, 0.001, 0.0001]
+# recommend_service 와 동일: 후보 비율이 이보다 크면 행 복사 대신 전체 스캔 후 후보 점수만 취함
+DENSE_SCAN_RATIO = 0.3
+
+
+def _top_k(scores, k):
+    k = min(k, scores.shape[0])
+    if k == 0:
+        return np.empty(0, dtype=np.int64)
+    idx = np.argpartition(-scores, k - 1)[:k]
+    return idx[np.argsort(-scores[idx])]
+
+
+def _timeit(fn):
+    fn()  # warm-up
+    samples = []
+    for _ in range(REPEAT):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2], samples[int(len(samples) * 0.95) - 1]
+
+
+def main():
+    rng = np.random.default_rng(42)
+    print(f"행 {ROWS}개 × {DIM}차원, top-{TOP_K}, 반복 {REPEAT}회 (중앙값/p95 ms)")
+    feats = rng.standard_normal((ROWS, DIM), dtype=np.float32)
+    feats /= np.linalg.norm(feats, axis=1, keepdims=True)
+    query = rng.standard_normal(DIM, dtype=np.float32)
+    query /= np.linalg.norm(query)
+
+    index = FacetIndex(ROWS)
+    u = rng.random(ROWS)
+    for i, sel in enumerate(SELECTIVITIES):
+        index.add_facet(f"f{i}", np.where(u < sel, "hit", ""))
+
+    t0 = time.perf_counter()
+    index.add_facet("season", rng.choice(["spring", "summer", "autumn", "winter"], size=ROWS))
+    build_ms = (time.perf_counter() - t0) * 1000
+    print(f"패싯 1개(값 4개) 비트맵 생성: {build_ms:.1f} ms, 값당 {(ROWS + 7) // 8 / 1024:.1f} KiB")
+
+    full_med, full_p95 = _timeit(lambda: _top_k(feats @ query, TOP_K))
+    print(f"{'필터':<22}{'후보 수':>10}{'중앙값':>10}{'p95':>10}{'전체 대비':>10}")
+    print(f"{'없음 (전체 스캔)':<22}{ROWS:>10}{full_med:>10.2f}{full_p95:>10.2f}{1.0:>10.2f}")
+
+    for i, sel in enumerate(SELECTIVITIES):
+        selected = {f"f{i}": ["hit"]}
+        n_hit = index.rows(selected).size
+
+        def prefiltered():
+            rows = index.rows(selected)
+            if rows.size > DENSE_SCAN_RATIO * ROWS:
+                scores = (feats @ query)[rows]
+            else:
+                scores = feats[rows] @ query
+            return rows[_top_k(scores, TOP_K)]
+
+        med, p95 = _timeit(prefiltered)
+        label = f"선택도 {sel * 100:g}%"
+        print(f"{label:<22}{n_hit:>10}{med:>10.2f}{p95:>10.2f}{med / full_med:>10.2f}")
+
+    # 사후 필터(기존 방식) 비교: 전체 top-20 이후 거르면 선택적인 필터에서 결과가 남지 않음
+    selected = {f"f{len(SELECTIVITIES) - 1}": ["hit"]}
+    hit_mask = np.unpackbits(index.bitmap(selected), count=ROWS).astype(bool)
+    post = _top_k(feats @ query, TOP_K)
+    pre = index.rows(selected)
+    print(
+        f"\n사후 필터(top-{TOP_K} 이후) 결과 수: {int(hit_mask[post].sum())}건 / "
+        f"사전 필터 결과 수: {min(TOP_K, pre.size)}건 (선택도 {SELECTIVITIES[-1] * 100:g}%)"
+    )
+
+
+if __name__ == "__main__":
+    main()
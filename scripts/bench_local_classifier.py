@@ -0,0 +1,67 @@
+"""
+로컬 여행 분류기 벤치마크 — 예측 지연(p50/p95)과 임계값별 LLM 호출률
+backend-fastapi 폴더에서: python scripts/bench_local_classifier.py
+(먼저 scripts/train_local_classifier.py로 embedding_cache/local_classifier.npz 생성)
+
+평가 발화는 학습과 같은 기록(labeled_rows) 또는 BENCH_DATA(jsonl: message, label)입니다.
+학습에 쓴 발화로 재면 정확도가 높게 나오므로, 정확도는 BENCH_DATA로 따로 모은 발화로 보는 것이 좋습니다.
+
+환경변수(선택):
+- BENCH_DATA: 평가 발화 jsonl (쉼표 구분 여러 개)
+- BENCH_REPEAT: 지연 측정 반복 횟수 (기본 20)
+"""
+import json
+import os
+import sys
+import time
+
+BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE)
+
+import numpy as np
+
+from app.services.local_classifier import LocalClassifier, default_model_path, head_labels, labeled_rows
+
+REPEAT = int(os.environ.get("BENCH_REPEAT", "20"))
+THRESHOLDS = [0.5, 0.6, 0.7, 0.8, 0.85, 0.9, 0.95]
+
+
+def main():
+    path = default_model_path()
+    if not os.path.isfile(path):
+        print(f"{path} 없음 → scripts/train_local_classifier.py 먼저 실행")
+        return 1
+    model = LocalClassifier.load(path)
+    files = [p.strip() for p in os.environ.get("BENCH_DATA", "").split(",") if p.strip()]
+    rows = []
+    for p in files:
+        with open(p, "r", encoding="utf-8") as f:
+            rows += [(r["message"], r.get("label")) for r in map(json.loads, filter(str.strip, f))]
+    if not files:
+        rows = labeled_rows()
+    if not rows:
+        print("평가 발화가 없습니다.")
+        return 1
+
+    latencies, confidences, correct = [], [], []
+    for text, label in rows:
+        for _ in range(REPEAT):
+            t0 = time.perf_counter()
+            pred, conf = model.predict(text)
+            latencies.append(time.perf_counter() - t0)
+        confidences.append(conf)
+        truth = head_labels(label) if label else None
+        correct.append(truth is not None and all(pred[h] == truth[h] for h in pred))
+    lat = np.array(latencies) * 1e6
+    confidences, correct = np.array(confidences), np.array(correct)
+    print(f"발화 {len(rows)}개 × {REPEAT}회: 예측 지연 p50 {np.percentile(lat, 50):.0f}µs, p95 {np.percentile(lat, 95):.0f}µs")
+    print(f"{'임계값':>6} {'LLM 호출률':>10} {'로컬 정확도':>10}")
+    for t in THRESHOLDS:
+        accepted = confidences >= t
+        acc = correct[accepted].mean() if accepted.any() else float("nan")
+        print(f"{t:>6.2f} {1 - accepted.mean():>10.1%} {acc:>10.1%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
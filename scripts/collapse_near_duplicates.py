@@ -0,0 +1,95 @@
+"""
+카탈로그 근접 중복(연사·거의 같은 구도) 사진 묶기 — 검색 인덱스 축소용 오프라인 작업
+
+verify_and_fix_place_photo.py는 photo_file_nm이 완전히 같은 경우만 잡습니다.
+이 스크립트는 embedding_cache/features.npy(서버가 만든 CLIP 임베딩)로 유사도가 임계값 이상인 사진을 묶고,
+묶음마다 대표 사진 1장만 검색에 쓰도록 embedding_cache/dedup.json에 대표 행과 묶음 구성을 기록합니다.
+서버는 시작 시 dedup.json이 현재 임베딩 캐시와 맞으면 대표 행만 로드합니다. (DB/캐시 원본은 수정하지 않음)
+
+실행: backend-fastapi 폴더에서 (서버를 한 번 띄워 embedding_cache가 만들어진 뒤)
+  python scripts/collapse_near_duplicates.py           # 묶음 통계만 출력
+  python scripts/collapse_near_duplicates.py --write   # dedup.json 저장 → 서버 재시작 시 반영
+환경변수(선택):
+- NEAR_DUP_THRESHOLD: 같은 사진으로 볼 코사인 유사도 (기본 0.95)
+- NEAR_DUP_SCOPE: place(같은 장소 사진끼리만 비교, 기본) | all(전체 비교, 행이 많으면 느림)
+"""
+import json
+import os
+import sys
+import time
+
+# Windows 콘솔 한글 출력
+if sys.platform == "win32":
+    try:
+        sys.stdout.reconfigure(encoding="utf-8")
+    except Exception:
+        pass
+
+BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE)
+
+import numpy as np
+
+from app.services.near_dup import DEDUP_FILE_NAME, cluster_near_duplicates, filenames_digest
+
+CACHE_DIR = os.path.join(BASE, "embedding_cache")
+THRESHOLD = float(os.environ.get("NEAR_DUP_THRESHOLD", "0.95"))
+SCOPE = os.environ.get("NEAR_DUP_SCOPE", "place").strip().lower()
+
+
+def main():
+    features_path = os.path.join(CACHE_DIR, "features.npy")
+    filenames_path = os.path.join(CACHE_DIR, "filenames.json")
+    if not os.path.isfile(features_path) or not os.path.isfile(filenames_path):
+        print(f"임베딩 캐시 없음: {CACHE_DIR} — 서버를 한 번 실행해 캐시를 만든 뒤 다시 실행하세요.")
+        return 1
+    features = np.load(features_path, mmap_mode="r")
+    with open(filenames_path, "r", encoding="utf-8") as f:
+        filenames = json.load(f)
+    if len(filenames) != features.shape[0]:
+        print("features.npy와 filenames.json 건수가 다릅니다. embedding_cache를 지우고 서버를 다시 실행하세요.")
+        return 1
+
+    group_keys = None
+    if SCOPE == "place":
+        if any("|" in k for k in filenames):
+            group_keys = [k.split("|", 1)[0] if "|" in k else k for k in filenames]
+        else:
+            print("캐시 키에 장소 ID가 없어(images 폴더 모드) 전체 비교로 진행합니다.")
+
+    t0 = time.perf_counter()
+    rep = cluster_near_duplicates(features, threshold=THRESHOLD, group_keys=group_keys)
+    elapsed = time.perf_counter() - t0
+
+    representatives = np.unique(rep)
+    clusters = {}
+    for row, r in enumerate(rep.tolist()):
+        if row != r:
+            clusters.setdefault(filenames[r], [filenames[r]]).append(filenames[row])
+    removed = len(filenames) - representatives.size
+    print(f"임계값 {THRESHOLD}, 범위 {SCOPE if group_keys is not None else 'all'}: {elapsed:.1f}초")
+    print(f"사진 {len(filenames)}장 → 대표 {representatives.size}장 (근접 중복 {removed}장, 묶음 {len(clusters)}개)")
+    for key, members in sorted(clusters.items(), key=lambda kv: -len(kv[1]))[:10]:
+        print(f"  - {key}: {len(members)}장")
+
+    if "--write" not in sys.argv:
+        print("[저장 대기] --write 옵션으로 실행하면 dedup.json을 저장합니다.")
+        return 0
+    out = {
+        "threshold": THRESHOLD,
+        "scope": SCOPE if group_keys is not None else "all",
+        "rows": len(filenames),
+        "filenames_sha1": filenames_digest(filenames),
+        "representatives": representatives.tolist(),
+        # 행별 대표 행 번호 (대표는 자기 자신) — 어떤 사진이 어느 대표로 묶였는지
+        "rep": rep.tolist(),
+    }
+    out_path = os.path.join(CACHE_DIR, DEDUP_FILE_NAME)
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(out, f, ensure_ascii=False)
+    print(f"[저장] {out_path} — FastAPI 서버 재시작 시 대표 사진만 검색 인덱스에 로드됩니다.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""
+여행 분류 의미 캐시 오프라인 평가 — 임계값별 LLM 호출 절약 vs 분류 일치율
+발화 목록을 순서대로 흘려 보내며 의미 캐시(app/services/semantic_cache.py)를 시뮬레이션합니다.
+각 발화는 캐시에서 임계값 이상으로 가까운 분류를 찾으면 재사용(= LLM 호출 절약), 없으면 정답 분류를 캐시에 추가합니다.
+재사용한 분류가 그 발화의 정답 분류(LLM 결과)와 같은지(who, why, transport, budget, season)로 일치율을 잽니다.
+목표 일치율(SEMANTIC_EVAL_TARGET) 이상인 가장 낮은 임계값을 SEMANTIC_CACHE_THRESHOLD 추천값으로 출력합니다.
+
+실행: backend-fastapi 폴더에서
+  python scripts/eval_semantic_cache.py                 # 정답 분류: Gemini (GOOGLE_API_KEY 필요, 결과는 파일에 캐시)
+  python scripts/eval_semantic_cache.py --fallback      # 정답 분류: 키워드 분류 (키 없이 동작 확인용)
+환경변수(선택):
+- SEMANTIC_EVAL_FILE: 발화 목록 jsonl ({"message": "...", "label": {...}(선택)}). 기본은 데모 프리셋 + 내장 예시 발화
+- SEMANTIC_EVAL_TARGET: 목표 일치율 (기본 0.95)
+- SEMANTIC_EVAL_SHUFFLES: 순서를 섞어 반복할 횟수 (기본 5, 평균)
+"""
+import asyncio
+import json
+import os
+import random
+import sys
+
+# Windows 콘솔 한글 출력
+if sys.platform == "win32":
+    try:
+        sys.stdout.reconfigure(encoding="utf-8")
+    except Exception:
+        pass
+
+BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE)
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv(os.path.join(BASE, ".env"))
+
+from app.api.v1.endpoints.demo import DEMO_PRESETS
+from app.graph.nodes import TRAVEL_CLASSIFIER_SYSTEM, _fallback_classify_travel
+from app.services.llm_service import llm_service
+from app.services.semantic_cache import SemanticClassifierCache
+
+EVAL_FILE = os.environ.get("SEMANTIC_EVAL_FILE", "").strip()
+TARGET = float(os.environ.get("SEMANTIC_EVAL_TARGET", "0.95"))
+SHUFFLES = int(os.environ.get("SEMANTIC_EVAL_SHUFFLES", "5") or 1)
+LABELS_PATH = os.path.join(BASE, "embedding_cache", "semantic_eval_labels.json")
+THRESHOLDS = [round(t, 2) for t in np.arange(0.70, 0.99, 0.02)]
+
+# 같은 뜻을 다르게 쓴 발화 묶음 + 비슷하지만 분류가 다른 발화 (기본 평가 세트)
+SAMPLE_MESSAGES = [
+    "아이랑 부산", "부산에서 아이랑 갈 만한 곳", "아이 데리고 부산 여행 어디가 좋아?", "유모차 끌고 다닐 수 있는 부산 여행지",
+    "아이랑 제주", "제주에서 아이랑 갈 만한 곳", "가족 여행 강릉 추천",
+    "여자친구랑 강릉 데이트", "연인이랑 강릉 바다 카페", "커플 여행 부산 야경",
+    "혼자 제주 힐링", "나홀로 제주 여행 조용한 곳", "혼자 여행 서울 카페",
+    "부모님 모시고 경주", "효도 여행 경주 한옥", "부모님이랑 부산 온천",
+    "겨울에 강릉 여행", "여름에 강릉 여행", "가을 단풍 설악산", "봄 벚꽃 경주",
+    "자가용으로 전주 맛집 투어", "대중교통으로 전주 맛집 투어", "가성비 부산 맛집", "럭셔리 부산 호텔",
+    "서핑하러 양양", "양양 서핑 체험", "등산하러 지리산", "미술관 많은 서울 여행",
+]
+
+
+def load_messages():
+    if EVAL_FILE:
+        with open(EVAL_FILE, "r", encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+        return [(r["message"], r.get("label")) for r in rows]
+    return [(m, None) for m in [p["message"] for p in DEMO_PRESETS] + SAMPLE_MESSAGES]
+
+
+async def llm_label(message: str):
+    prompt = f"대화 맥락:\n(대화 없음)\n\n현재 사용자 발화: {message}\n\n위 규칙에 따라 JSON만 출력하세요."
+    raw = (await llm_service.generate(prompt, site="travel_classifier", system=TRAVEL_CLASSIFIER_SYSTEM, temperature=0)).strip()
+    if "```" in raw:
+        raw = raw.split("```")[1]
+        raw = raw[4:] if raw.lower().startswith("json") else raw
+    return json.loads(raw.strip())
+
+
+def label_all(rows, use_fallback: bool):
+    """정답 분류 채우기. LLM 결과는 LABELS_PATH에 캐시해 다시 실행할 때 호출하지 않음."""
+    cached = {}
+    if not use_fallback and os.path.isfile(LABELS_PATH):
+        with open(LABELS_PATH, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+    todo = [m for m, label in rows if label is None and m not in cached]
+    if todo and not use_fallback:
+        if not llm_service.available:
+            print("GOOGLE_API_KEY(GEMINI_API_KEY)가 없습니다. --fallback으로 키워드 분류를 정답으로 쓰거나 키를 설정하세요.")
+            sys.exit(1)
+
+        async def run():
+            for m in todo:  # 순서대로 (호출 한도 안에서)
+                try:
+                    cached[m] = await llm_label(m)
+                except Exception as e:
+                    print(f"  분류 실패 {m}: {e}")
+
+        asyncio.run(run())
+        os.makedirs(os.path.dirname(LABELS_PATH), exist_ok=True)
+        with open(LABELS_PATH, "w", encoding="utf-8") as f:
+            json.dump(cached, f, ensure_ascii=False)
+    out = []
+    for m, label in rows:
+        label = label or (_fallback_classify_travel(m) if use_fallback else cached.get(m))
+        if label:
+            out.append((m, label))
+    return out
+
+
+def signature(label: dict) -> tuple:
+    """일치 비교 항목: who, why, transport, budget, season"""
+    c = label.get("constraints") or {}
+    w = label.get("when_info") or {}
+    return (label.get("who"), label.get("why"), c.get("transport"), c.get("budget"), w.get("season"))
+
+
+def simulate(vecs, labels, order, threshold):
+    """(재사용 수, 재사용 중 일치 수)"""
+    cache = SemanticClassifierCache(encoder=lambda texts: None, threshold=threshold, max_items=len(order) + 1, ttl_sec=float("inf"))
+    reused = agree = 0
+    for i in order:
+        hit = cache.lookup(vecs[i])
+        if hit is None:
+            cache.add(vecs[i], str(i), labels[i])
+            continue
+        reused += 1
+        agree += signature(hit) == signature(labels[i])
+    return reused, agree
+
+
+def main():
+    use_fallback = "--fallback" in sys.argv
+    rows = label_all(load_messages(), use_fallback)
+    if len(rows) < 2:
+        print("평가할 발화가 부족합니다.")
+        return 1
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer("all-MiniLM-L6-v2")
+    vecs = np.asarray(model.encode([m for m, _ in rows]), dtype=np.float32)
+    vecs /= np.maximum(np.linalg.norm(vecs, axis=1, keepdims=True), 1e-12)
+    labels = [label for _, label in rows]
+    print(f"발화 {len(rows)}개, 정답: {'키워드 분류' if use_fallback else 'Gemini'}, 순서 섞기 {SHUFFLES}회 평균\n")
+
+    rng = random.Random(0)
+    orders = [list(range(len(rows)))] + [rng.sample(range(len(rows)), len(rows)) for _ in range(SHUFFLES - 1)]
+    print(f"{'임계값':>6} {'LLM 절약':>9} {'일치율':>7}")
+    best = None
+    for t in THRESHOLDS:
+        reused = agree = 0
+        for order in orders:
+            r, a = simulate(vecs, labels, order, t)
+            reused += r
+            agree += a
+        saved = reused / (len(rows) * len(orders))
+        rate = agree / reused if reused else 1.0
+        print(f"{t:>6.2f} {saved:>8.1%} {rate:>7.1%}")
+        if best is None and reused and rate >= TARGET:
+            best = (t, saved, rate)
+    if best:
+        print(f"\n추천 SEMANTIC_CACHE_THRESHOLD={best[0]:.2f} (LLM 호출 {best[1]:.1%} 절약, 일치율 {best[2]:.1%} ≥ 목표 {TARGET:.0%})")
+    else:
+        print(f"\n목표 일치율 {TARGET:.0%}를 만족하는 임계값이 없습니다. 의미 캐시를 끄거나(SEMANTIC_CACHE_ENABLED=false) 발화를 늘려 다시 평가하세요.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -17,6 +17,12 @@
 - ONLY_EXISTING_IMAGES=1: 실제 이미지 파일이 있는 행만 INSERT
 - INSERT_SAMPLE_RATIO=0.1: 지역별 10%만 (수도권/동부권/서부권/제주도 각 10%)
 - CLEAR_BEFORE_INSERT=1: 실행 전 place_photo, place 테이블 비우고 넣기
+
+INSERT 후 방문지정보 전체(여행별 방문 순서)로 동시 방문 인덱스를 만들어 embedding_cache/covisit.npz에 저장합니다.
+(추천 API의 "이곳에 간 사람들이 함께 간 곳" — 요청마다 집계하지 않음)
+장소별 집계(사진 수, 평균 만족도, 체류 시간 중앙값, 재방문 비율, 대표 사진)는 place_summary 테이블에 저장합니다.
+(추천 API의 "상세 정보 보기" — 서버 시작 시 이 테이블을 그대로 로드)
+이어서 python scripts/precompute_image_placeholders.py 로 썸네일·LQIP를 미리 만들어 두면 첫 조회도 원본 디코딩이 없습니다.
 """
 import os
 import sys
@@ -26,6 +32,10 @@ import pandas as pd
 import pymysql
 from dotenv import load_dotenv
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from app.services.covisit import COVISIT_FILE_NAME, CovisitIndex, source_fingerprint
+from app.services.place_stats import PLACE_SUMMARY_TABLE, aggregate_place_stats
+
 # .env 로드 (backend-fastapi/.env 에 MARIADB_HOST, MARIADB_PORT 등 있으면 사용)
 load_dotenv(Path(__file__).resolve().parent.parent / ".env")
 
@@ -186,6 +196,109 @@ def _get_photo_df_and_place_lookup():
     return photo_df, visit_area_nm_map, region_photo_dirs
 
 
+def _get_all_visits_df():
+    """4개 지역 방문지정보 전체 (중복 제거 없음). TRAVEL_ID·visit_area_id_prefixed에 지역 접미사(A_, B_ …)를 붙임."""
+    dfs = []
+    for region_name, suffix in REGIONS:
+        path = TRAVEL_DATA_ROOT / f"국내 여행로그 데이터({region_name})" / "Sample" / "02.라벨링데이터" / "csv" / f"tn_visit_area_info_방문지정보_{suffix}.csv"
+        if not path.exists():
+            continue
+        try:
+            df = pd.read_csv(path, encoding="utf-8-sig")
+        except Exception as e:
+            print(f"  읽기 실패 {path}: {e}")
+            continue
+        # 지역마다 TRAVEL_ID가 겹치지 않도록 지역 접미사를 붙여 여행 구분
+        df["TRAVEL_ID"] = suffix + "_" + df["TRAVEL_ID"].astype(str)
+        df["visit_area_id_prefixed"] = suffix + "_" + df["VISIT_AREA_ID"].astype(str)
+        dfs.append(df)
+    return pd.concat(dfs, ignore_index=True) if dfs else pd.DataFrame()
+
+
+def save_covisit_index(prefix_ids=False, visits_df=None):
+    """
+    4개 지역 방문지정보 전체(중복 제거 없이, 여행별 방문 순서 유지)로 동시 방문 인덱스 생성 → embedding_cache/covisit.npz.
+    prefix_ids: 샘플 INSERT처럼 visit_area_id에 지역 접두어(A_, B_ …)를 붙였으면 별칭도 같은 형식으로.
+    """
+    df = visits_df if visits_df is not None else _get_all_visits_df()
+    if df.empty:
+        print("covisit: 읽을 방문지정보 CSV 없음 (건너뜀)")
+        return None
+    index = CovisitIndex.build(df, id_column="visit_area_id_prefixed" if prefix_ids else "VISIT_AREA_ID")
+    # 적재 시점의 data/place.csv 지문 — 이후 place.csv만 바뀌면 서비스가 다시 만듦
+    index.source = source_fingerprint(ROOT / "data" / "place.csv")
+    out_dir = ROOT / "embedding_cache"
+    out_dir.mkdir(exist_ok=True)
+    index.save(str(out_dir / COVISIT_FILE_NAME))
+    print(f"covisit: 장소 {len(index)}개, 동시 방문 쌍 {index.nnz}개 → {out_dir / COVISIT_FILE_NAME}")
+    return index
+
+
+def save_place_summary(conn, prefix_ids=False, visits_df=None):
+    """
+    장소별 집계 → place_summary 테이블 (없으면 생성, 있으면 덮어씀).
+    방문 통계는 방문지정보 전체, 사진 수·대표 사진은 이번에 들어간 place_photo 기준.
+    """
+    df = visits_df if visits_df is not None else _get_all_visits_df()
+    id_column = "visit_area_id_prefixed" if prefix_ids else "VISIT_AREA_ID"
+    with conn.cursor() as cur:
+        try:
+            cur.execute("SELECT visit_area_id AS VISIT_AREA_ID, photo_file_nm AS PHOTO_FILE_NM, image_url FROM place_photo")
+        except Exception:
+            cur.execute("SELECT visit_area_id AS VISIT_AREA_ID, photo_file_nm AS PHOTO_FILE_NM FROM place_photo")
+        photo_df = pd.DataFrame(cur.fetchall())
+    if not df.empty and id_column != "VISIT_AREA_ID":
+        df = df.drop(columns=["VISIT_AREA_ID"]).rename(columns={id_column: "VISIT_AREA_ID"})
+    stats = aggregate_place_stats(df if not df.empty else None, photo_df if not photo_df.empty else None)
+    if stats.empty:
+        print(f"{PLACE_SUMMARY_TABLE}: 집계할 데이터 없음 (건너뜀)")
+        return 0
+    # 사진이 들어간 장소만 (DB에 없는 방문지까지 저장하지 않음)
+    if "photo_count" in stats.columns:
+        stats = stats[stats["photo_count"].notna()]
+
+    def _val(v):
+        return None if v is None or (isinstance(v, float) and pd.isna(v)) else v
+
+    with conn.cursor() as cur:
+        cur.execute(f"""
+            CREATE TABLE IF NOT EXISTS {PLACE_SUMMARY_TABLE} (
+                visit_area_id VARCHAR(30) PRIMARY KEY,
+                place_name VARCHAR(200),
+                photo_count INT NOT NULL DEFAULT 0,
+                visit_count INT NOT NULL DEFAULT 0,
+                avg_dgstfn DOUBLE NULL,
+                median_residence_time_min DOUBLE NULL,
+                revisit_rate DOUBLE NULL,
+                photos TEXT
+            ) DEFAULT CHARSET=utf8mb4
+        """)
+        cur.execute(f"DELETE FROM {PLACE_SUMMARY_TABLE}")
+        cur.executemany(
+            f"""
+            INSERT INTO {PLACE_SUMMARY_TABLE}
+            (visit_area_id, place_name, photo_count, visit_count, avg_dgstfn, median_residence_time_min, revisit_rate, photos)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+            """,
+            [
+                (
+                    _safe_str(vid, 30),
+                    _safe_str(r.get("place_name"), 200),
+                    int(_val(r.get("photo_count")) or 0),
+                    int(_val(r.get("visit_count")) or 0),
+                    _val(r.get("avg_dgstfn")),
+                    _val(r.get("median_residence_time_min")),
+                    _val(r.get("revisit_rate")),
+                    _val(r.get("photos")) or "[]",
+                )
+                for vid, r in stats.iterrows()
+            ],
+        )
+        conn.commit()
+    print(f"{PLACE_SUMMARY_TABLE}: {len(stats)}개 장소 집계 저장")
+    return len(stats)
+
+
 def insert_place(conn, place_df=None, id_column="VISIT_AREA_ID"):
     """국내 여행로그 데이터 방문지정보 → place 테이블. id_column 있으면 그 컬럼을 visit_area_id로 사용 (지역 접두어용)."""
     df = place_df if place_df is not None else _get_place_df()
@@ -374,6 +487,7 @@ def main():
     try:
         if CLEAR_BEFORE_INSERT:
             _clear_tables(conn)
+        prefixed_ids = False
         if INSERT_SAMPLE_RATIO < 1.0:
             photo_df, visit_area_nm_map, region_photo_dirs = _get_photo_df_and_place_lookup()
             if photo_df.empty:
@@ -399,9 +513,13 @@ def main():
                     print(f"  - {r}: {c}건")
                 insert_place(conn, place_filtered, id_column="visit_area_id_prefixed")
                 insert_place_photo(conn, photo_sampled, visit_area_nm_map, region_photo_dirs, id_column="visit_area_id_prefixed")
+                prefixed_ids = True
         else:
             insert_place(conn)
             insert_place_photo(conn)
+        visits_df = _get_all_visits_df()
+        save_covisit_index(prefix_ids=prefixed_ids, visits_df=visits_df)
+        save_place_summary(conn, prefix_ids=prefixed_ids, visits_df=visits_df)
     finally:
         conn.close()
     print("완료.")
@@ -0,0 +1,147 @@
+"""
+카탈로그 사진 썸네일·LQIP 사전 생성 — insert_place_data.py 다음에 실행하는 적재 작업
+
+place_photo(DB) 또는 data/tour.csv 각 사진을 한 번만 디코딩해
+- /images 축소본 캐시(image_cache/, ?w=160|320|480|960&fmt=webp)를 미리 채우고 (첫 조회도 원본 디코딩 없음)
+- LQIP(16px 흐린 미리보기 JPEG data URI, 약 0.5KB)를 만들어 embedding_cache/placeholders.json에 저장합니다.
+추천 API는 서버 시작 시 placeholders.json을 읽어 결과마다 placeholder를 함께 반환합니다. (추가 요청 없이 먼저 그리기)
+사진별 작업은 프로세스 풀로 병렬 처리합니다.
+
+실행: backend-fastapi 폴더에서
+  python scripts/precompute_image_placeholders.py           # 새 사진만
+  python scripts/precompute_image_placeholders.py --force   # 전체 다시 생성
+환경변수(선택):
+- PLACEHOLDER_SOURCE: db(기본, 연결 실패 시 csv) | csv
+- PLACEHOLDER_WORKERS: 프로세스 수 (기본 CPU 수)
+- PLACEHOLDER_FORMAT: 축소본 형식 webp(기본) | jpeg
+- DB: MARIADB_HOST, MARIADB_PORT, MARIADB_USER, MARIADB_PASSWORD, MARIADB_DATABASE / TRAVEL_DATA_ROOT
+"""
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Windows 콘솔 한글 출력
+if sys.platform == "win32":
+    try:
+        sys.stdout.reconfigure(encoding="utf-8")
+    except Exception:
+        pass
+
+BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE)
+
+import pandas as pd
+from dotenv import load_dotenv
+
+from app.services.image_derivatives import ALLOWED_WIDTHS, PLACEHOLDERS_FILE_NAME, precompute_derivatives
+from app.services.image_paths import get_image_path_index, resolve_served_image
+
+load_dotenv(os.path.join(BASE, ".env"))
+
+SOURCE = os.environ.get("PLACEHOLDER_SOURCE", "db").strip().lower()
+WORKERS = int(os.environ.get("PLACEHOLDER_WORKERS", "0") or 0) or (os.cpu_count() or 1)
+FORMAT = os.environ.get("PLACEHOLDER_FORMAT", "webp").strip().lower()
+OUT_PATH = os.path.join(BASE, "embedding_cache", PLACEHOLDERS_FILE_NAME)
+
+
+def _rows_from_db():
+    """place_photo 사진 파일명 목록. 연결/조회 실패 시 None."""
+    try:
+        import pymysql
+
+        conn = pymysql.connect(
+            host=os.environ.get("MARIADB_HOST", "localhost"),
+            port=int(os.environ.get("MARIADB_PORT", "3306")),
+            user=os.environ.get("MARIADB_USER", "root"),
+            password=os.environ.get("MARIADB_PASSWORD", "1234"),
+            database=os.environ.get("MARIADB_DATABASE", "travel"),
+            charset="utf8mb4",
+            cursorclass=pymysql.cursors.DictCursor,
+        )
+    except Exception as e:
+        print(f"DB 연결 실패 ({e}) → data/tour.csv 사용")
+        return None
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT photo_file_nm FROM place_photo")
+            return [str(r.get("photo_file_nm") or "").strip() for r in cur.fetchall()]
+    finally:
+        conn.close()
+
+
+def _rows_from_csv():
+    path = os.path.join(BASE, "data", "tour.csv")
+    if not os.path.isfile(path):
+        return []
+    df = pd.read_csv(path, encoding="utf-8-sig")
+    return [str(n).strip() for n in df.get("PHOTO_FILE_NM", pd.Series(dtype=str)).dropna()]
+
+
+def _work(job):
+    """프로세스 풀 작업: (파일명, 경로) → (파일명, data URI 또는 None, 오류)"""
+    name, path = job
+    try:
+        return name, precompute_derivatives(path, ALLOWED_WIDTHS, FORMAT), None
+    except Exception as e:
+        return name, None, str(e)
+
+
+def main():
+    force = "--force" in sys.argv
+    rows = _rows_from_db() if SOURCE == "db" else None
+    if rows is None:
+        rows = _rows_from_csv()
+    existing = {}
+    if os.path.isfile(OUT_PATH) and not force:
+        with open(OUT_PATH, "r", encoding="utf-8") as f:
+            existing = json.load(f).get("items", {})
+
+    index = get_image_path_index().refresh()
+    jobs, missing, seen = [], 0, set()
+    for name in rows:
+        if not name or name in seen:
+            continue
+        seen.add(name)
+        if name in existing:
+            continue
+        # /images/{name} 요청이 내보내는 것과 같은 원본 → 축소본 캐시 키가 서버 요청과 일치
+        path = resolve_served_image(name, index)
+        if path is None:
+            missing += 1
+            continue
+        jobs.append((name, path))
+    print(f"사진 {len(seen)}장 중 새로 처리 {len(jobs)}장 (기존 {len(existing)}장, 파일 없음 {missing}장), 프로세스 {WORKERS}개")
+
+    items = dict(existing)
+    failed = 0
+    t0 = time.perf_counter()
+    if jobs:
+        report_every = max(50, len(jobs) // 20)
+        with ProcessPoolExecutor(max_workers=WORKERS) as pool:
+            futures = [pool.submit(_work, job) for job in jobs]
+            for i, fut in enumerate(as_completed(futures), 1):
+                name, uri, err = fut.result()
+                if uri:
+                    items[name] = uri
+                else:
+                    failed += 1
+                    print(f"  실패 {name}: {err}")
+                if i % report_every == 0 or i == len(jobs):
+                    print(f"처리 중... {i}/{len(jobs)}")
+    elapsed = time.perf_counter() - t0
+
+    os.makedirs(os.path.dirname(OUT_PATH), exist_ok=True)
+    tmp = OUT_PATH + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"format": FORMAT, "widths": list(ALLOWED_WIDTHS), "items": items}, f, ensure_ascii=False)
+    os.replace(tmp, OUT_PATH)
+    avg = sum(len(v) for v in items.values()) / len(items) if items else 0
+    print(f"[저장] {OUT_PATH}: placeholder {len(items)}개 (평균 {avg:.0f}자), 실패 {failed}장, {elapsed:.1f}초")
+    print("FastAPI 서버 재시작 시 추천 결과에 placeholder가 포함됩니다.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
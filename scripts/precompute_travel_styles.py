@@ -0,0 +1,101 @@
+"""
+여행 스타일 분석 사전 계산 — 관심사 3개 조합 전체를 Gemini로 미리 분석해 테이블로 저장
+INTEREST_OPTIONS 고정 키워드(35개)의 3개 조합(6,545개)마다 analyze 결과(이유·추천 여행지 등)를 만들어
+embedding_cache/travel_style_table.json에 저장합니다. /travel-style/analyze는 이 테이블로 바로 응답하고,
+테이블에 없는 조합만 실시간으로 Gemini를 호출합니다. (실행 중인 서버도 TRAVEL_STYLE_TABLE_REFRESH_SEC 안에 새 파일을 읽음)
+
+실행: backend-fastapi 폴더에서 (GOOGLE_API_KEY 또는 GEMINI_API_KEY 필요)
+  python scripts/precompute_travel_styles.py            # 테이블에 없는 조합만
+  python scripts/precompute_travel_styles.py --force    # 전체 다시 분석
+환경변수(선택):
+- TRAVEL_STYLE_CONCURRENCY: 동시 분석 수 (기본 4, LLM 게이트웨이 호출 한도 안에서 동작)
+- TRAVEL_STYLE_LIMIT: 이번 실행에서 분석할 최대 조합 수 (기본 전체)
+"""
+import asyncio
+import os
+import sys
+import time
+from itertools import combinations
+
+# Windows 콘솔 한글 출력
+if sys.platform == "win32":
+    try:
+        sys.stdout.reconfigure(encoding="utf-8")
+    except Exception:
+        pass
+
+BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE)
+
+from dotenv import load_dotenv
+
+load_dotenv(os.path.join(BASE, ".env"))
+
+from app.domain.travel_style import INTEREST_OPTIONS
+from app.services.llm_service import llm_service
+from app.services.travel_style import analyze_interests_live
+from app.services.travel_style_table import combo_key, get_travel_style_table, save_table, table_entry
+
+CONCURRENCY = int(os.environ.get("TRAVEL_STYLE_CONCURRENCY", "4") or 4)
+LIMIT = int(os.environ.get("TRAVEL_STYLE_LIMIT", "0") or 0)
+CHECKPOINT_EVERY = 100
+
+
+def all_keywords() -> list:
+    """INTEREST_OPTIONS 키워드 (여러 타입에 나오는 키워드는 한 번만, 처음 나온 순서)"""
+    seen = []
+    for option in INTEREST_OPTIONS:
+        for kw in option["keywords"]:
+            if kw not in seen:
+                seen.append(kw)
+    return seen
+
+
+async def run(combos, items: dict, path: str) -> tuple:
+    sem = asyncio.Semaphore(CONCURRENCY)
+    done, failed = 0, 0
+
+    async def one(combo):
+        nonlocal done, failed
+        async with sem:
+            result = await analyze_interests_live(list(combo))
+        if result is None:
+            failed += 1
+            return
+        items[combo_key(combo)] = table_entry(result)
+        done += 1
+        if done % CHECKPOINT_EVERY == 0:
+            save_table(path, items, {"generated_at": int(time.time())})
+            print(f"처리 중... 성공 {done} / 실패 {failed} / 대상 {len(combos)}")
+
+    await asyncio.gather(*(one(c) for c in combos))
+    return done, failed
+
+
+def main():
+    if not llm_service.available:
+        print("GOOGLE_API_KEY(GEMINI_API_KEY)가 없습니다. .env에 설정 후 다시 실행하세요.")
+        return 1
+    force = "--force" in sys.argv
+    table = get_travel_style_table()
+    path = table.path
+    items = {} if force else table.file_items()
+
+    keywords = all_keywords()
+    combos = [c for c in combinations(keywords, 3) if combo_key(c) not in items]
+    total = len(combos) + len(items)
+    if LIMIT:
+        combos = combos[:LIMIT]
+    print(f"키워드 {len(keywords)}개, 조합 {total}개 중 이번에 분석 {len(combos)}개 (기존 {len(items)}개), 동시 {CONCURRENCY}개")
+
+    t0 = time.perf_counter()
+    done, failed = asyncio.run(run(combos, items, path)) if combos else (0, 0)
+    save_table(path, items, {"generated_at": int(time.time())})
+    print(f"[저장] {path}: 조합 {len(items)}개, 이번 성공 {done} / 실패 {failed}, {time.perf_counter() - t0:.1f}초")
+    if failed:
+        print("실패한 조합은 다시 실행하면 이어서 분석합니다. (서킷 브레이커가 열렸으면 잠시 후 재실행)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -91,6 +91,838 @@ def test_resolve_image_path():
             break
     return "Pass"
 
+def _clustered_features(n_places=200, per_place=8, dim=64, seed=5):
+    """장소마다 중심 주변에 사진 벡터가 모인 합성 데이터 (행, 장소 키, 정규화 벡터)"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((n_places, dim)).astype(np.float32)
+    keys = np.repeat(np.arange(n_places), per_place)
+    feats = centers[keys] + 0.4 * rng.standard_normal((keys.size, dim)).astype(np.float32)
+    perm = rng.permutation(keys.size)  # 같은 장소 행이 붙어 있지 않게
+    feats, keys = feats[perm], keys[perm]
+    return feats / np.linalg.norm(feats, axis=1, keepdims=True), [f"P{k}" for k in keys], rng
+
+def test_compressed_index():
+    """user-031 CompressedIndex: 모드별 근사 shortlist가 정확 top-k를 포함, 저장/로드 후 같은 결과"""
+    import tempfile
+    from app.services.compressed_index import CompressedIndex
+    feats, _, rng = _clustered_features(dim=128)
+    queries = feats[rng.integers(len(feats), size=20)] + 0.3 * rng.standard_normal((20, 128)).astype(np.float32)
+    for mode in ("pca", "int8", "pca_int8"):
+        index = CompressedIndex.build(feats, mode=mode, dim=64)
+        recalls = []
+        for q in queries:
+            exact = np.argsort(-(feats @ q))[:10]
+            recalls.append(np.isin(exact, index.shortlist(q, 100)).mean())
+        assert np.mean(recalls) >= 0.95, (mode, np.mean(recalls))
+    assert index.nbytes < feats.nbytes / 4
+    rows = np.arange(0, len(feats), 3)
+    assert np.isin(index.shortlist(queries[0], 50, rows=rows), rows).all()
+    path = os.path.join(tempfile.mkdtemp(), "compressed.npz")
+    index.save(path, {"rows": len(feats), "dim": 64})
+    assert CompressedIndex.load(path, {"rows": len(feats) + 1, "dim": 64}) is None
+    loaded = CompressedIndex.load(path, {"rows": len(feats), "dim": 64})
+    assert np.allclose(loaded.approx_scores(queries[0]), index.approx_scores(queries[0]))
+    return "Pass"
+
+def test_analyze_multi_limit():
+    """user-029 /analyze-multi: 최대 장수를 넘으면 파일을 읽기 전에 400 (500 아님)"""
+    try:
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+        from starlette.datastructures import UploadFile
+        from app.api.v1.endpoints import recommend
+    except ImportError as e:
+        return f"Skip (의존성 없음: {e.name})"
+    reads = []
+    real_read, real_analyze = UploadFile.read, recommend.recommend_service.analyze_images
+
+    async def spy_read(self, *args):
+        reads.append(self.filename)
+        return await real_read(self, *args)
+
+    UploadFile.read = spy_read
+    recommend.recommend_service.analyze_images = lambda contents, **kwargs: {"success": False, "message": "테스트", "results": []}
+    try:
+        app = FastAPI()
+        app.include_router(recommend.router)
+        client = TestClient(app)
+        files = [("files", (f"{i}.jpg", b"x", "image/jpeg")) for i in range(recommend.MAX_QUERY_IMAGES + 1)]
+        res = client.post("/analyze-multi", files=files)
+        assert res.status_code == 400 and str(recommend.MAX_QUERY_IMAGES) in res.json()["detail"] and reads == []
+        res = client.post("/analyze-multi", files=files[:2])
+        assert res.status_code == 200 and reads == ["0.jpg", "1.jpg"]
+    finally:
+        UploadFile.read = real_read
+        recommend.recommend_service.analyze_images = real_analyze
+    return "Pass"
+
+def test_two_stage_compressed_shortlist():
+    """user-031 기본 검색 모드(two_stage)에서 압축 계층 shortlist가 실제로 쓰이는지"""
+    try:
+        from app.core.config import Settings
+        from app.services.compressed_index import CompressedIndex
+        from app.services.place_index import PlaceCentroidIndex
+        from app.services.recommend_service import RecommendService
+    except ImportError as e:
+        return f"Skip (의존성 없음: {e.name})"
+    rng = np.random.default_rng(0)
+    feats = rng.standard_normal((600, 32)).astype(np.float32)
+    feats /= np.linalg.norm(feats, axis=1, keepdims=True)
+    keys = [f"P{i // 10}" for i in range(len(feats))]
+    calls = []
+
+    class SpyIndex(CompressedIndex):
+        def shortlist(self, query_emb, n, rows=None):
+            calls.append((n, None if rows is None else rows.size))
+            return super().shortlist(query_emb, n, rows)
+
+    base = CompressedIndex.build(feats, mode="int8")
+    svc = RecommendService.__new__(RecommendService)
+    svc.db_features = feats
+    svc.place_index = PlaceCentroidIndex(feats, keys)
+    svc.compressed_index = SpyIndex(base.codes, base.projection, base.scale, mode=base.mode)
+    svc._retrieval_mode = Settings.model_fields["RECOMMEND_RETRIEVAL_MODE"].default
+    svc._coarse_places = 30
+    svc._rerank_n = 50
+    rows, scores = svc._rank_rows(feats[0], None, k=20)
+    assert svc._retrieval_mode == "two_stage"
+    assert calls and calls[0] == (50, 300), calls
+    assert 0 < len(rows) <= 20 and len({keys[r] for r in rows}) == len(rows)
+    assert rows[0] == 0 and np.all(np.diff(scores) <= 1e-6)
+    return "Pass"
+
+def test_place_knn():
+    """user-033 PlaceKnn: 이웃은 유사도 내림차순·자기 자신 제외, 장소 벡터가 바뀌면 저장된 목록을 쓰지 않음"""
+    import tempfile
+    from app.services.place_knn import PlaceKnn, build_place_knn, vectors_digest
+    rng = np.random.default_rng(8)
+    vectors = rng.standard_normal((50, 16)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    ids = [f"V{i}" for i in range(50)]
+    neighbors, scores = build_place_knn(vectors, k=5, block=16)
+    sims = vectors @ vectors.T
+    np.fill_diagonal(sims, -np.inf)
+    assert np.array_equal(neighbors, np.argsort(-sims, axis=1, kind="stable")[:, :5])
+    assert np.all(np.diff(scores.astype(np.float32), axis=1) <= 0) and not np.any(neighbors == np.arange(50)[:, None])
+    knn = PlaceKnn(ids, neighbors, scores, vectors_digest(vectors))
+    top = knn.similar("V0", limit=3, exclude=[ids[neighbors[0, 0]]])
+    assert [j for j, _ in top] == neighbors[0, 1:4].tolist() and knn.similar("없음") == []
+    assert build_place_knn(vectors[:3], k=5)[0][:, 2:].tolist() == [[-1] * 3] * 3
+    path = os.path.join(tempfile.mkdtemp(), "place_knn.npz")
+    knn.save(path)
+    assert np.array_equal(PlaceKnn.load(path, ids, 5, vectors_digest(vectors)).neighbors, neighbors)
+    changed = vectors.copy()
+    changed[7] = -changed[7]  # 임베딩 재계산/근접 중복 정리로 중심 벡터가 바뀐 경우
+    assert PlaceKnn.load(path, ids, 5, vectors_digest(changed)) is None
+    assert PlaceKnn.load(path, ids, 6, vectors_digest(vectors)) is None
+    assert PlaceKnn.load(path, ids[::-1], 5, vectors_digest(vectors)) is None
+    return "Pass"
+
+def test_similar_places():
+    """user-033 RecommendService.similar_places: 저장된 이웃 목록 재사용/재계산, 기준 장소는 결과에서 제외"""
+    import tempfile
+    try:
+        from app.services.place_index import PlaceCentroidIndex
+        from app.services.recommend_service import RecommendService
+    except ImportError as e:
+        return f"Skip (의존성 없음: {e.name})"
+    feats, keys, _ = _clustered_features(n_places=30, per_place=4, dim=16)
+    svc = RecommendService.__new__(RecommendService)
+    svc._base_dir = tempfile.mkdtemp()
+    svc._placeholders = {}
+    svc.db_filenames = [f"{k}|{i}.jpg" for i, k in enumerate(keys)]
+    svc.place_index = PlaceCentroidIndex(feats, keys)
+    svc._get_place_info_by_row = lambda row: {"success": True, "place_name": keys[row], "address": ""}
+    svc.place_knn = svc._build_place_knn()
+    cents = svc.place_index.centroids
+    first = svc.place_index.place_keys.index("P0")
+    expect = [svc.place_index.place_keys[j] for j in np.argsort(-(cents @ cents[first]))[1:6]]
+    out = svc.similar_places("P0", limit=5)
+    assert out["success"] and [r["visit_area_id"] for r in out["results"]] == expect
+    assert all(r["place_name"] == r["visit_area_id"] for r in out["results"])
+    out = svc.similar_places("P0", limit=5, exclude_visit_area_ids=expect[:2])
+    assert [r["visit_area_id"] for r in out["results"]][:3] == expect[2:]
+    assert not svc.similar_places("없음")["success"]
+    assert np.array_equal(svc._build_place_knn().neighbors, svc.place_knn.neighbors)
+    # 같은 장소 목록이라도 사진 임베딩이 바뀌면 place_knn.npz를 다시 만듦
+    feats2, _, _ = _clustered_features(n_places=30, per_place=4, dim=16, seed=9)
+    svc.place_index = PlaceCentroidIndex(feats2, keys)
+    assert svc.place_index.place_keys == svc.place_knn.place_ids
+    rebuilt = svc._build_place_knn()
+    assert not np.array_equal(rebuilt.neighbors, svc.place_knn.neighbors)
+    assert np.array_equal(svc._build_place_knn().neighbors, rebuilt.neighbors)
+    return "Pass"
+
+def test_near_dup_clusters():
+    """user-032 cluster_near_duplicates: 연사는 한 장으로, 사슬(A~B~C…)은 대표와 먼 사진을 따로 남김"""
+    import json
+    import tempfile
+    from app.services.near_dup import DEDUP_FILE_NAME, cluster_near_duplicates, filenames_digest, load_dedup
+    rng = np.random.default_rng(1)
+    base = rng.standard_normal((3, 64))
+    burst = np.stack([base[0] + 0.01 * rng.standard_normal(64) for _ in range(4)])
+    rep = cluster_near_duplicates(np.vstack([burst, base[1:]]), threshold=0.95)
+    assert len(set(rep[:4].tolist())) == 1 and rep[4] == 4 and rep[5] == 5
+    # 한 축에서 조금씩 돌린 사진 10장: 이웃끼리 cos≈0.99, 양 끝은 직교
+    angles = np.linspace(0, np.pi / 2, 10)
+    chain = np.stack([np.cos(angles), np.sin(angles)], axis=1)
+    assert np.all(np.sum(chain[1:] * chain[:-1], axis=1) >= 0.95)
+    rep = cluster_near_duplicates(chain, threshold=0.95)
+    assert len(set(rep.tolist())) > 1
+    for i, r in enumerate(rep):
+        assert float(chain[i] @ chain[r]) >= 0.95 - 1e-6
+    # group_keys: 다른 장소끼리는 같아도 묶지 않음
+    rep = cluster_near_duplicates(np.vstack([base[0], base[0]]), threshold=0.95, group_keys=["A", "B"])
+    assert rep.tolist() == [0, 1]
+    # dedup.json: 행별 대표(rep)를 저장/로드 → 빠진 사진이 어느 대표(medoid)에 묶였는지 알 수 있음
+    feats = np.vstack([burst, base[1:]])
+    rep = cluster_near_duplicates(feats, threshold=0.95)
+    normed = feats[:4] / np.linalg.norm(feats[:4], axis=1, keepdims=True)
+    medoid = int(np.argmax((normed @ normed.T).sum(axis=1)))
+    assert rep[:4].tolist() == [medoid] * 4
+    filenames = [f"V1|p{i}.jpg" for i in range(len(feats))]
+    path = os.path.join(tempfile.mkdtemp(), DEDUP_FILE_NAME)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"rows": len(filenames), "filenames_sha1": filenames_digest(filenames),
+                   "representatives": np.unique(rep).tolist(), "rep": rep.tolist()}, f)
+    loaded = load_dedup(path, filenames)
+    collapsed = next(i for i in range(4) if i != medoid)
+    assert np.array_equal(loaded, rep) and loaded[collapsed] == medoid
+    assert load_dedup(path, filenames[::-1]) is None
+    with open(path, "w", encoding="utf-8") as f:  # 묶음 구성이 없는 예전 형식
+        json.dump({"rows": len(filenames), "filenames_sha1": filenames_digest(filenames), "representatives": [0, 4, 5]}, f)
+    assert load_dedup(path, filenames) is None
+    return "Pass"
+
+def test_map_clusters():
+    """user-036 MapClusterIndex: 줌이 낮을수록 적게 묶이고, 개수 합은 보존, limit로 잘림"""
+    from app.services.map_cluster import MapClusterIndex
+    rng = np.random.default_rng(2)
+    lats = np.concatenate([35.1 + 0.01 * rng.random(50), 37.5 + 0.01 * rng.random(50)])
+    lngs = np.concatenate([129.0 + 0.01 * rng.random(50), 127.0 + 0.01 * rng.random(50)])
+    index = MapClusterIndex(lats, lngs, max_zoom=16)
+    low, _ = index.get_clusters(3, 33, 124, 39, 132, limit=1000)
+    high, _ = index.get_clusters(17, 33, 124, 39, 132, limit=1000)
+    assert len(low) <= 2 and sum(c["count"] for c in low) == 100
+    assert len(high) == 100 and all(c["count"] == 1 for c in high)
+    sizes = [len(index.get_clusters(z, 33, 124, 39, 132, limit=1000)[0]) for z in range(0, 18)]
+    assert all(a <= b for a, b in zip(sizes, sizes[1:])), sizes
+    busan, _ = index.get_clusters(17, 35.0, 128.9, 35.2, 129.1, limit=1000)
+    assert len(busan) == 50
+    top, truncated = index.get_clusters(17, 33, 124, 39, 132, limit=10)
+    assert truncated and len(top) == 10
+    assert all(c["expansion_zoom"] > 3 for c in low if c["count"] > 1)
+    return "Pass"
+
+def test_travel_style_table():
+    """user-045 TravelStyleTable: 순서 무관 조회, 자유 입력 조합은 저장 안 함, 실시간 결과 LRU 상한"""
+    import tempfile
+    from app.services.travel_style_table import TravelStyleTable, interest_keywords, save_table
+    path = os.path.join(tempfile.mkdtemp(), "table.json")
+    save_table(path, {"등산|서핑|카페": {"reason": "file"}})
+    table = TravelStyleTable(path, refresh_sec=0, allowed_keywords=interest_keywords(), max_live=2)
+    assert table.get(["카페", "서핑", "등산"]) == {"reason": "file"}
+    assert not table.put(["아무말", "카페", "등산"], {"reason": "free"})
+    assert table.get(["아무말", "카페", "등산"]) is None
+    for combo in (["요가", "독서", "캠핑"], ["요가", "독서", "낚시"], ["요가", "독서", "와인"]):
+        assert table.put(combo, {"reason": "live"})
+    assert len(table) == 3 and table.get(["캠핑", "독서", "요가"]) is None
+    assert table.get(["와인", "독서", "요가"])["reason"] == "live"
+    return "Pass"
+
+def test_semantic_cache():
+    """user-047 SemanticClassifierCache: 임계값 이상만 재사용, 대화 단계는 저장 안 함, 가득 차면 오래된 행부터 덮어씀"""
+    from app.services.semantic_cache import SemanticClassifierCache
+    cache = SemanticClassifierCache(encoder=lambda texts: None, threshold=0.9, max_items=2, ttl_sec=3600)
+    a, b, c = np.eye(3, dtype=np.float32)
+    label = {"who": "couple", "why": "food", "constraints": {}, "when_info": {}, "conversation_stage": "refinement"}
+    cache.add(a, "a", label)
+    near = np.array([0.95, 0.31, 0.0], dtype=np.float32)
+    near /= np.linalg.norm(near)
+    hit = cache.lookup(near)
+    assert hit is not None and hit["who"] == "couple" and "conversation_stage" not in hit
+    assert cache.lookup(np.array([0.8, 0.6, 0.0], dtype=np.float32)) is None
+    assert cache.lookup(near, threshold=0.99) is None
+    cache.add(b, "b", dict(label, who="solo"))
+    cache.add(c, "c", dict(label, who="parents_trip"))
+    assert cache.lookup(a) is None
+    assert cache.lookup(b)["who"] == "solo" and cache.lookup(c)["who"] == "parents_trip"
+    assert cache.stats()["items"] == 2
+    return "Pass"
+
+def test_semantic_hit_conflict():
+    """user-047 분류 노드: 의미 캐시 적중이라도 발화의 계절/교통/예산/who/why 키워드와 어긋나면 버리고 LLM 호출"""
+    import asyncio
+    import json
+    try:
+        from app.graph import nodes
+    except ImportError as e:
+        return f"Skip (의존성 없음: {e.name})"
+    from app.services.classifier_cache import ClassifierCache
+    from app.services.semantic_cache import SemanticClassifierCache
+
+    summer = {"who": "couple", "why": "relaxation", "constraints": {"transport": "car"}, "when_info": {"season": "summer"}}
+    assert not nodes._semantic_hit_conflicts(summer, "강릉 여행 추천해줘")
+    assert not nodes._semantic_hit_conflicts(summer, "여름에 커플 힐링 여행")
+    for message in ("겨울에 강릉 여행", "혼자 강릉 여행", "대중교통으로 강릉", "강릉 럭셔리 숙소", "강릉 맛집 투어"):
+        assert nodes._semantic_hit_conflicts(summer, message), message
+
+    class FakeLLM:
+        calls = []
+
+        async def generate(self, prompt, **kwargs):
+            self.calls.append(prompt)
+            return json.dumps({"who": "couple", "why": "relaxation", "constraints": {}, "when_info": {"season": "winter"}, "conversation_stage": "refinement"})
+
+    semantic = SemanticClassifierCache(encoder=lambda texts: np.ones((len(texts), 4)), threshold=0.9)  # 모든 발화가 같은 임베딩
+    semantic.add(semantic.encode("여름에 강릉 여행"), "여름에 강릉 여행", summer)
+    saved = {name: getattr(nodes, name) for name in ("get_classifier_cache", "get_local_classifier", "get_semantic_cache", "_get_travel_llm", "_semantic_cache_enabled")}
+    nodes.get_classifier_cache = lambda: ClassifierCache(None)
+    nodes.get_local_classifier = lambda: None
+    nodes.get_semantic_cache = lambda: semantic
+    nodes._get_travel_llm = lambda: FakeLLM()
+    nodes._semantic_cache_enabled = lambda: True
+    try:
+        run = lambda message: asyncio.run(nodes.travel_classifier_llm_node({"latest_message": message, "user_input": []}))
+        out = run("겨울에 강릉 여행")
+        assert out["when_info"] == {"season": "winter"} and len(FakeLLM.calls) == 1 and semantic.counters["conflicts"] == 1
+        semantic = SemanticClassifierCache(encoder=lambda texts: np.ones((len(texts), 4)), threshold=0.9)
+        semantic.add(semantic.encode("여름에 강릉 여행"), "여름에 강릉 여행", summer)
+        out = run("강릉 여행 가고 싶어")  # 어긋나는 키워드 없음 → 재사용
+        assert out["when_info"] == {"season": "summer"} and len(FakeLLM.calls) == 1
+    finally:
+        for name, value in saved.items():
+            setattr(nodes, name, value)
+    return "Pass"
+
+def test_travel_graph_branches():
+    """user-050 그래프: LLM 분류∥규칙 추출∥추측 검색 → 합류 후 병합, 검색 조건이 같으면 추측 검색 재사용, 찜 의도는 세 분기를 건너뜀"""
+    import asyncio
+    try:
+        from app.graph import nodes
+        from app.graph.graph import get_travel_graph
+    except ImportError as e:
+        return f"Skip (의존성 없음: {e.name})"
+    from app.services.classifier_cache import ClassifierCache
+
+    message = "여름에 커플끼리 자가용으로 가성비 있게 부산 바다 힐링 여행 추천해줘"
+    retrieve_calls = []
+    real_retrieve = nodes._retrieve
+
+    def spy_retrieve(key):
+        retrieve_calls.append(key)
+        return real_retrieve(key)
+
+    def run(text, seed=None):
+        seed = seed or {}
+        state = {
+            "user_input": [], "latest_message": text, "intent": None,
+            "who": seed.get("who"), "why": seed.get("why"),
+            "constraints": seed.get("constraints") or {}, "when_info": seed.get("when_info") or {},
+            "conversation_stage": None, "filters": {}, "missing_info": [], "retrieved_docs": [],
+            "speculative_retrieval": {}, "recommendations": [], "itinerary": {}, "user_id": None,
+            "clarifying_question": None, "response": None, "post_actions": [], "favorite_items": [],
+        }
+        retrieve_calls.clear()
+        return asyncio.run(get_travel_graph().ainvoke(state))
+
+    saved = {name: getattr(nodes, name) for name in ("get_classifier_cache", "get_local_classifier", "_get_travel_llm", "_retrieve")}
+    nodes.get_classifier_cache = lambda: ClassifierCache(None)
+    nodes.get_local_classifier = lambda: None
+    nodes._get_travel_llm = lambda: None  # API 키 없음 → 키워드 분류
+    nodes._retrieve = spy_retrieve
+    try:
+        # 첫 턴: 추측 검색은 분류 전(who/why 없음) 조건이라 분류 후 다시 검색
+        out = run(message)
+        filters = out["filters"]
+        assert filters["region"] == "부산" and filters["theme"] == ["바다", "힐링", "커플"] and filters["budget"] == "저렴"  # 규칙 추출
+        assert filters["who"] == "couple" and filters["why"] == "relaxation" and filters["season"] == "summer"  # 분류 병합
+        assert filters["constraint_transport"] == "car" and filters["conversation_stage"] == "refinement"
+        assert out["missing_info"] == [] and out["recommendations"]
+        assert out["speculative_retrieval"]["key"][2:4] == (None, None)
+        assert len(retrieve_calls) == 2 and retrieve_calls[1] == nodes._retrieval_key(out)
+        # 다음 턴: 이전 분류와 같은 결과 → 추측 검색 결과 그대로 사용 (검색 1번)
+        seed = {"who": out["who"], "why": out["why"], "constraints": out["constraints"], "when_info": out["when_info"]}
+        again = run(message, seed)
+        assert len(retrieve_calls) == 1 and again["speculative_retrieval"]["key"] == nodes._retrieval_key(again)
+        assert again["retrieved_docs"] == again["speculative_retrieval"]["docs"] == out["retrieved_docs"]
+        # 분류가 who를 바꾸면(이전 턴 couple → 이번 발화 혼자) 다시 검색
+        changed = run(message.replace("커플끼리", "혼자"), seed)
+        assert changed["who"] == "solo" and len(retrieve_calls) == 2
+        assert changed["speculative_retrieval"]["key"][2] == "couple" and retrieve_calls[1][2] == "solo"
+        # 찜 의도: 분류·추출·추측 검색을 거치지 않음
+        for text, intent in (("부산 바다 찜해줘", "add_favorite"), ("찜 목록 보여줘", "show_favorites")):
+            out = run(text)
+            assert out["intent"] == intent and retrieve_calls == []
+            assert out["who"] is None and out["filters"] == {} and out["speculative_retrieval"] == {}
+    finally:
+        for name, value in saved.items():
+            setattr(nodes, name, value)
+    return "Pass"
+
+def test_geo_index():
+    """user-026 haversine_km, GeoGridIndex bbox/반경 조회 = 전수 비교 결과"""
+    from app.services.geo_index import GeoGridIndex, haversine_km
+    assert abs(float(haversine_km(37.5665, 126.9780, 35.1796, 129.0756)) - 325) < 5  # 서울 시청 ↔ 부산 시청
+    assert float(haversine_km(35.0, 129.0, 35.0, 129.0)) == 0.0
+    rng = np.random.default_rng(3)
+    lats = 33 + 5 * rng.random(2000)
+    lngs = 125 + 5 * rng.random(2000)
+    lats[:3] = [np.nan, 0.0, 95.0]
+    lngs[:3] = [127.0, 0.0, 127.0]
+    index = GeoGridIndex(lats, lngs, cell_deg=0.05)
+    assert len(index) == 1997
+    rows = index.query_bbox(36.0, 127.0, 35.0, 126.0)  # 뒤바뀐 모서리도 허용
+    expect = np.nonzero((lats >= 35.0) & (lats <= 36.0) & (lngs >= 126.0) & (lngs <= 127.0))[0]
+    assert np.array_equal(rows, expect)
+    rows = index.query_radius(35.5, 127.5, 30)
+    with np.errstate(invalid="ignore"):
+        dist = haversine_km(35.5, 127.5, lats, lngs)
+    expect = np.nonzero(dist <= 30)[0]
+    assert np.array_equal(rows, expect) and rows.size > 0
+    assert index.query_radius(35.5, 127.5, 0).size == 0
+    return "Pass"
+
+def test_facet_index():
+    """user-027 FacetIndex 비트맵: 같은 패싯은 OR, 다른 패싯끼리는 AND"""
+    from app.services.facet_index import FacetIndex, month_to_season, place_class_of
+    rng = np.random.default_rng(7)
+    n = 1001  # 8의 배수가 아닌 행 수 (packbits 끝 비트)
+    types = rng.choice(["1", "2", "3", ""], size=n)
+    seasons = [month_to_season(m) for m in rng.integers(0, 13, size=n)]  # 0월 → 빈 값
+    index = FacetIndex(n)
+    index.add_facet("visit_area_type", types.tolist())
+    index.add_facet("season", seasons)
+    seasons = np.array(seasons)
+    assert index.facets()["visit_area_type"] == {v: int((types == v).sum()) for v in ("1", "2", "3")}
+    assert index.rows({}) is None and index.rows({"season": []}) is None
+    rows = index.rows({"visit_area_type": ["1", "3"]})
+    assert np.array_equal(rows, np.flatnonzero((types == "1") | (types == "3")))
+    rows = index.rows({"visit_area_type": ["2"], "season": ["summer", "winter"]})
+    expect = np.flatnonzero((types == "2") & ((seasons == "summer") | (seasons == "winter")))
+    assert np.array_equal(rows, expect) and rows.size > 0
+    assert index.rows({"visit_area_type": ["9"]}).size == 0
+    assert index.rows({"unknown": ["x"], "season": ["spring"]}).size == 0
+    assert place_class_of("해운대 해수욕장") == "beach" and place_class_of("피자집") == "restaurant"
+    return "Pass"
+
+def test_search_session_store():
+    """user-028 SearchSessionStore: 접근 시 TTL 연장, 만료 후 None, max_sessions 초과 시 가장 오래 안 쓴 세션 제거"""
+    import types
+    from app.services import search_session
+    clock = [1000.0]
+    real_time = search_session.time
+    search_session.time = types.SimpleNamespace(monotonic=lambda: clock[0])
+    try:
+        store = search_session.SearchSessionStore(ttl_sec=10, max_sessions=2)
+        a = store.create({"name": "a"})
+        clock[0] += 8
+        assert store.get(a) == {"name": "a"}  # 여기서 만료가 1018로 연장
+        clock[0] += 8
+        assert store.get(a) is not None
+        clock[0] += 11
+        assert store.get(a) is None and len(store) == 0
+        a, b = store.create({"name": "a"}), store.create({"name": "b"})
+        store.get(a)
+        c = store.create({"name": "c"})
+        assert store.get(b) is None and store.get(a) is not None and store.get(c) is not None
+        assert store.delete(c) and not store.delete(c) and len(store) == 1
+    finally:
+        search_session.time = real_time
+    return "Pass"
+
+def test_place_centroid_index():
+    """user-030 PlaceCentroidIndex: 상위 장소 사진만 골라도 정확 top-k 행을 대부분 포함, rows 후보 밖 행은 안 나옴"""
+    from app.services.place_index import PlaceCentroidIndex
+    feats, keys, rng = _clustered_features()
+    index = PlaceCentroidIndex(feats, keys, use_medoids=True)
+    assert len(index) == 200 and index.avg_photos_per_place == 8
+    recalls = []
+    for _ in range(20):
+        q = feats[rng.integers(len(feats))] + 0.3 * rng.standard_normal(feats.shape[1]).astype(np.float32)
+        exact = np.argsort(-(feats @ q))[:10]
+        cand = index.candidate_rows(q, top_places=10)
+        recalls.append(np.isin(exact, cand).mean())
+    assert np.mean(recalls) >= 0.9, np.mean(recalls)
+    allowed = np.sort(rng.choice(len(feats), 300, replace=False))
+    cand = index.candidate_rows(q, top_places=10, rows=allowed)
+    assert cand.size > 0 and np.isin(cand, allowed).all()
+    assert index.candidate_rows(q, top_places=10, rows=np.empty(0, dtype=np.int64)).size == 0
+    ranked = np.argsort(-(feats @ q))
+    rows, _ = index.best_row_per_place(ranked, (feats @ q)[ranked])
+    assert len(rows) == 200 and rows[0] == ranked[0]
+    return "Pass"
+
+def test_covisit_index():
+    """user-034 CovisitIndex: CSR 행 = 전수 집계한 가중치 상위 top_n (내림차순), 집 등 제외, 저장/로드 동일"""
+    import tempfile
+    from app.services.covisit import CovisitIndex
+    rng = np.random.default_rng(11)
+    rows = []
+    for t in range(60):
+        for order, poi in enumerate(rng.integers(0, 15, size=6), 1):
+            rows.append({
+                "TRAVEL_ID": f"T{t}", "VISIT_ORDER": order, "POI_ID": f"{poi}.0" if poi else None,
+                "VISIT_AREA_ID": f"V{t}_{order}", "VISIT_AREA_NM": f"장소{poi}",
+                "VISIT_AREA_TYPE_CD": "21" if poi == 14 else "1",
+                "DGSTFN": rng.integers(1, 6), "REVISIT_INTENTION": np.nan if poi == 3 else rng.integers(1, 6),
+            })
+    df = pd.DataFrame(rows)
+    index = CovisitIndex.build(df, window=2, top_n=4)
+    assert "14" not in index.keys and "0" not in index.keys and len(index) == 13
+    expect = {}
+    valid = df[df["POI_ID"].notna() & (df["VISIT_AREA_TYPE_CD"] != "21")]
+    for _, trip in valid.groupby("TRAVEL_ID"):
+        trip = trip.sort_values("VISIT_ORDER").to_dict("records")
+        for i, a in enumerate(trip):
+            for d, b in enumerate(trip[i + 1:i + 3], 1):  # 제외한 방문을 뺀 순서 기준 거리
+                if a["POI_ID"] == b["POI_ID"]:
+                    continue
+                for x, y in ((a, b), (b, a)):
+                    sat = np.nanmean([y["DGSTFN"], y["REVISIT_INTENTION"]]) / 5.0
+                    key = (x["POI_ID"][:-2], y["POI_ID"][:-2])
+                    expect[key] = expect.get(key, 0.0) + min(max(sat, 0.2), 1.0) / d
+    for src in index.keys:
+        got = index.also_visited(poi_id=src, limit=10)
+        assert len(got) <= 4
+        weights = sorted((w for (a, _), w in expect.items() if a == src), reverse=True)[:4]
+        assert np.allclose([g["weight"] for g in got], weights, atol=1e-3), (src, got, weights)
+        assert all(abs(expect[(src, g["poi_id"])] - g["weight"]) < 1e-3 for g in got)
+    assert index.also_visited(visit_area_id="V0_1", limit=2) == index.also_visited(poi_id=index.keys[index.lookup("V0_1")], limit=2)
+    assert index.also_visited(poi_id="없음") == []
+    path = os.path.join(tempfile.mkdtemp(), "covisit.npz")
+    index.save(path)
+    loaded = CovisitIndex.load(path)
+    assert all(loaded.also_visited(poi_id=k) == index.also_visited(poi_id=k) for k in index.keys)
+    return "Pass"
+
+def test_covisit_source():
+    """user-034 covisit.npz는 저장 당시 data/place.csv 지문과 다르면(또는 지문 없는 예전 파일이면) 다시 만듦"""
+    import tempfile
+    from app.services.covisit import COVISIT_FILE_NAME, CovisitIndex, source_fingerprint
+    try:
+        from app.services.recommend_service import RecommendService
+    except ImportError as e:
+        return f"Skip (의존성 없음: {e.name})"
+
+    def visits(pairs):
+        return pd.DataFrame([
+            {"TRAVEL_ID": f"T{t}", "VISIT_ORDER": order, "POI_ID": poi, "VISIT_AREA_ID": f"V{t}_{order}",
+             "VISIT_AREA_NM": f"장소{poi}", "VISIT_AREA_TYPE_CD": "1", "DGSTFN": 5, "REVISIT_INTENTION": 5}
+            for t, trip in enumerate(pairs) for order, poi in enumerate(trip, 1)
+        ])
+
+    svc = RecommendService.__new__(RecommendService)
+    svc._base_dir = tempfile.mkdtemp()
+    os.makedirs(os.path.join(svc._base_dir, "data"))
+    place_path = os.path.join(svc._base_dir, "data", "place.csv")
+    npz_path = os.path.join(svc._base_dir, "embedding_cache", COVISIT_FILE_NAME)
+    visits([["A", "B"], ["A", "B"]]).to_csv(place_path, index=False, encoding="utf-8-sig")
+    index = svc._load_covisit_index()
+    assert index.source == source_fingerprint(place_path) != ""
+    assert [r["poi_id"] for r in index.also_visited(poi_id="A")] == ["B"]
+    assert CovisitIndex.load(npz_path).source == index.source
+    # 같은 지문이면 저장본을 그대로 사용 (다시 만들지 않음)
+    CovisitIndex(["X"], ["x"], [0, 0], [], [], source=index.source).save(npz_path)
+    assert svc._load_covisit_index().keys == ["X"]
+    # insert_place_data.py 재실행 없이 place.csv만 바뀌면 다시 만듦
+    visits([["A", "C"], ["A", "C"], ["B"]]).to_csv(place_path, index=False, encoding="utf-8-sig")
+    st = os.stat(place_path)
+    os.utime(place_path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    index = svc._load_covisit_index()
+    assert [r["poi_id"] for r in index.also_visited(poi_id="A")] == ["C"]
+    assert CovisitIndex.load(npz_path).source == source_fingerprint(place_path)
+    # source 없이 저장된 예전 파일도 재생성 대상
+    index.source = ""
+    index.save(npz_path)
+    with np.load(npz_path) as z:
+        np.savez(npz_path, **{k: z[k] for k in z.files if k != "source"})
+    assert CovisitIndex.load(npz_path).source == ""
+    assert svc._load_covisit_index().source == source_fingerprint(place_path)
+    return "Pass"
+
+def test_itinerary():
+    """user-035 2-opt는 최근접 이웃 경로보다 길어지지 않음, 일정은 하루 가용 시간 안으로 나뉨"""
+    import time
+    from app.services.itinerary import distance_matrix_km, nearest_neighbor_order, plan_itinerary, two_opt
+    rng = np.random.default_rng(4)
+    length = lambda path, dist: float(dist[path[:-1], path[1:]].sum())
+    for n in (4, 12, 40):
+        dist = distance_matrix_km(33.2 + 0.4 * rng.random(n), 126.2 + 0.7 * rng.random(n))
+        nn = nearest_neighbor_order(dist, 0)
+        path, converged = two_opt(nn, dist, time.monotonic() + 5)
+        assert converged and path[0] == 0 and sorted(path.tolist()) == list(range(n))
+        assert length(path, dist) <= length(nn, dist) + 1e-9
+    path, converged = two_opt(nn, dist, time.monotonic() - 1)
+    assert not converged and np.array_equal(path, nn)
+    places = [{"name": f"P{i}", "lat": 33.2 + 0.4 * rng.random(), "lng": 126.2 + 0.7 * rng.random(), "residence_time_min": 90} for i in range(12)]
+    places.append({"name": "좌표없음", "lat": None, "lng": 126.5})
+    plan = plan_itinerary(places, days=2, day_minutes=480, deadline_ms=1000)
+    assert len(plan["days"]) == 2 and plan["optimized"]
+    for day in plan["days"]:
+        assert day["total_min"] <= 480 and day["stops"][0]["travel_min"] == 0
+        assert all(a["leave_min"] <= b["arrive_min"] for a, b in zip(day["stops"], day["stops"][1:]))
+    scheduled = [s["name"] for d in plan["days"] for s in d["stops"]]
+    unscheduled = {u["name"]: u["reason"] for u in plan["unscheduled"]}
+    assert unscheduled["좌표없음"] == "좌표 없음"
+    assert sorted(scheduled + list(unscheduled)) == sorted(p["name"] for p in places)
+    assert scheduled[0] == "P0" and len(scheduled) <= 2 * 480 // 90
+    return "Pass"
+
+def test_place_stats():
+    """user-037 aggregate_place_stats / PlaceStatsStore: 장소별 평균·중앙값·재방문 비율·대표 사진, 내용이 바뀌면 ETag도 바뀜"""
+    from app.services.place_stats import PlaceStatsStore, aggregate_place_stats
+    place_df = pd.DataFrame([
+        {"VISIT_AREA_ID": 101.0, "VISIT_AREA_NM": "해운대", "DGSTFN": 5, "RESIDENCE_TIME_MIN": 60, "REVISIT_YN": "Y"},
+        {"VISIT_AREA_ID": 101.0, "VISIT_AREA_NM": "해운대", "DGSTFN": 3, "RESIDENCE_TIME_MIN": 120, "REVISIT_YN": "n"},
+        {"VISIT_AREA_ID": 101.0, "VISIT_AREA_NM": "해운대", "DGSTFN": "", "RESIDENCE_TIME_MIN": 30, "REVISIT_YN": ""},
+        {"VISIT_AREA_ID": 102.0, "VISIT_AREA_NM": "광안리", "DGSTFN": 4, "RESIDENCE_TIME_MIN": 45, "REVISIT_YN": None},
+        {"VISIT_AREA_ID": None, "VISIT_AREA_NM": "무효", "DGSTFN": 1, "RESIDENCE_TIME_MIN": 1, "REVISIT_YN": "Y"},
+    ])
+    photo_df = pd.DataFrame(
+        [{"VISIT_AREA_ID": "101", "PHOTO_FILE_NM": f"a{i}.jpg", "image_url": f"http://x/a{i}.jpg"} for i in range(7)]
+        + [{"VISIT_AREA_ID": "101", "PHOTO_FILE_NM": "a0.jpg", "image_url": ""},
+           {"VISIT_AREA_ID": "103", "PHOTO_FILE_NM": "c.jpg", "image_url": None, "VISIT_AREA_NM": "송정"}]
+    )
+    stats = aggregate_place_stats(place_df, photo_df, max_photos=5)
+    assert sorted(stats.index) == ["101", "102", "103"]
+    store = PlaceStatsStore(stats)
+    item, etag = store.get(" 101 ")
+    assert item["visit_count"] == 3 and item["avg_dgstfn"] == 4.0 and item["median_residence_time_min"] == 60.0
+    assert item["revisit_rate"] == 0.5 and item["photo_count"] == 7 and len(item["photos"]) == 5
+    assert item["photos"][0] == {"image_file": "a0.jpg", "image_url": "http://x/a0.jpg"}
+    item, _ = store.get("102")
+    assert item["photo_count"] == 0 and item["photos"] == [] and item["revisit_rate"] is None
+    item, _ = store.get("103")
+    assert item["place_name"] == "송정" and item["visit_count"] == 0 and item["photos"] == [{"image_file": "c.jpg"}]
+    assert store.get("999") is None and len(PlaceStatsStore(aggregate_place_stats())) == 0
+    changed = PlaceStatsStore(aggregate_place_stats(place_df.assign(DGSTFN=[5, 5, "", 4, 1]), photo_df))
+    assert changed.get("101")[1] != etag and changed.get("102")[1] == store.get("102")[1]
+    return "Pass"
+
+def test_llm_guard():
+    """user-043 ModelGuard: 오류율로 회로 열림 → 쿨다운(Retry-After) 후 시험 호출 1건 → 성공 시 닫힘/실패 시 다시 열림, TokenBucket"""
+    import types
+    from app.services import llm_guard
+    assert llm_guard.is_breaker_failure(None) and llm_guard.is_breaker_failure(503) and not llm_guard.is_breaker_failure(401)
+    clock = [1000.0]
+    real_time = llm_guard.time
+    llm_guard.time = types.SimpleNamespace(monotonic=lambda: clock[0])
+    try:
+        bucket = llm_guard.TokenBucket(rate=2, burst=3)
+        assert [bucket.try_acquire(1000.0) for _ in range(4)] == [True, True, True, False]
+        assert bucket.try_acquire(1000.5) and not bucket.try_acquire(1000.5)
+        assert bucket.tokens(1100.0) == 3.0
+        guard = llm_guard.ModelGuard("m", window_sec=30, min_calls=4, error_rate=0.5, cooldown_sec=10, rate_per_sec=100, burst=100, max_concurrency=2)
+
+        def call(status, retry_after=None):
+            ok, reason = guard.admit()
+            if ok:
+                guard.record(status, retry_after)
+            return ok, reason
+
+        for status in (200, 401, 429):  # 401은 오류율에 안 들어감
+            call(status)
+        assert guard.snapshot()["state"] == "closed"
+        call(None, retry_after=20)  # 4건 중 실패 2건 → 열림, Retry-After가 쿨다운보다 김
+        assert guard.snapshot()["state"] == "open" and call(200) == (False, "circuit_open")
+        clock[0] += 15
+        assert guard.snapshot()["state"] == "open"
+        clock[0] += 6
+        assert guard.admit() == (True, None)  # 시험 호출
+        assert guard.admit() == (False, "circuit_open")
+        guard.record(503)
+        assert guard.snapshot()["state"] == "open" and guard.counters["opened"] == 2
+        clock[0] += 11
+        assert guard.admit() == (True, None)
+        guard.release()  # 취소된 시험 호출은 다음 호출에 자리를 넘김
+        assert call(200) == (True, None) and guard.snapshot()["state"] == "closed"
+        assert guard.admit()[0] and guard.admit()[0] and guard.admit() == (False, "concurrency_limit")
+        guard.release()
+        guard.release()
+        guard.bucket = llm_guard.TokenBucket(rate=0, burst=1)
+        assert call(200) == (True, None) and call(200) == (False, "rate_limited")
+        assert guard.snapshot()["in_flight"] == 0
+    finally:
+        llm_guard.time = real_time
+    return "Pass"
+
+def test_travel_style_hedging():
+    """user-044 _hedged_analyze: 헤지 지연 후 다음 모델 추가, 먼저 성공한 결과 사용 후 나머지 취소, 실패는 바로 다음 모델, 마감 초과면 None"""
+    import asyncio
+    import json
+    try:
+        from app.services import travel_style
+    except ImportError as e:
+        return f"Skip (의존성 없음: {e.name})"
+    models = travel_style.GEMINI_MODELS_ORDER[:3]
+
+    class FakeLLM:
+        """모델별 (지연 초, 성공 여부)로 응답하는 가짜 게이트웨이"""
+
+        def __init__(self, plan):
+            self.plan, self.started, self.cancelled = plan, [], []
+
+        async def generate(self, prompt, *, site, model, temperature, json_mode):
+            if json_mode:
+                self.started.append(model)
+            delay, ok = self.plan.get(model, (10.0, False))
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                self.cancelled.append(model)
+                raise
+            if not ok:
+                raise RuntimeError(f"{model} 오류")
+            return json.dumps({"reason": model, "destinations": [{"name": "부산"}]})
+
+    def run(plan, deadline=1.0):
+        fake = FakeLLM(plan)
+        saved = travel_style.llm_service, travel_style.HEDGE_DELAY_SEC, travel_style.DEADLINE_SEC, travel_style.GEMINI_MODELS_ORDER
+        travel_style.llm_service, travel_style.HEDGE_DELAY_SEC, travel_style.DEADLINE_SEC = fake, 0.05, deadline
+        travel_style.GEMINI_MODELS_ORDER = models
+        try:
+            result = asyncio.run(travel_style._hedged_analyze("prompt", ["서핑", "등산", "카페"]))
+        finally:
+            travel_style.llm_service, travel_style.HEDGE_DELAY_SEC, travel_style.DEADLINE_SEC, travel_style.GEMINI_MODELS_ORDER = saved
+        return result, fake
+
+    result, fake = run({models[0]: (0.5, True), models[1]: (0.02, True)})  # 첫 모델이 느림 → 헤지한 둘째 모델 결과
+    assert result["reason"] == models[1] and result["type_info"]["destinations"] == [{"name": "부산"}]
+    assert fake.started == models[:2] and fake.cancelled == [models[0]]
+    result, fake = run({models[0]: (0.0, False), models[1]: (0.0, False), models[2]: (0.01, True)})  # 실패는 지연 없이 다음 모델
+    assert result["reason"] == models[2] and fake.started == models and fake.cancelled == []
+    result, fake = run({}, deadline=0.2)  # 모두 마감보다 느림
+    assert result is None and fake.started == models and sorted(fake.cancelled) == sorted(models)
+    return "Pass"
+
+def test_classifier_cache():
+    """user-046 ClassifierCache: 정규화 키, TTL 안만 get, 만료 후엔 stale_sec 안에서만 get_stale, 디스크 계층은 다른 인스턴스와 공유"""
+    import tempfile
+    import types
+    from app.services import classifier_cache as cc
+    key = cc.context_key([("user", "안녕")], "부산  가족여행!!")
+    assert key == cc.context_key([("user", "안녕.")], "부산 가족여행") != cc.context_key([], "부산 가족여행")
+    assert cc.context_key([], "부산", namespace="v2") != cc.context_key([], "부산", namespace="v1")
+    clock = [1000.0]
+    real_time = cc.time
+    cc.time = types.SimpleNamespace(time=lambda: clock[0])
+    try:
+        db = os.path.join(tempfile.mkdtemp(), cc.CACHE_FILE_NAME)
+        cache = cc.ClassifierCache(db, max_items=2, ttl_sec=10, stale_sec=100)
+        label = {"who": "family_with_kids", "constraints": {"budget": "value"}}
+        cache.put(key, label)
+        hit = cache.get(key)
+        hit["constraints"]["budget"] = "luxury"  # 사본이라 캐시 값은 그대로
+        assert cache.get(key) == label
+        clock[0] += 11
+        assert cache.get(key) is None and cache.get_stale(key) == label
+        clock[0] += 90
+        assert cache.get_stale(key) is None
+        cache.put("a", {"who": "solo"})
+        cache.put("b", {"who": "couple"})
+        cache.put("c", {"who": "parents_trip"})
+        assert "a" not in cache._memory and cache.get("a") == {"who": "solo"}  # 메모리에서 밀려나도 디스크에서
+        other = cc.ClassifierCache(db, ttl_sec=10)
+        assert other.get("c") == {"who": "parents_trip"} and other.counters["disk_hits"] == 1
+        cache.log("부산 가족여행", label)
+        clock[0] += 1
+        cache.log("부산 가족여행", dict(label, who="couple"))
+        assert cache.read_log() == [("부산 가족여행", dict(label, who="couple"))]
+        memory_only = cc.ClassifierCache(None, ttl_sec=10)
+        memory_only.put(key, label)
+        assert memory_only.get(key) == label and memory_only.read_log() == []
+    finally:
+        cc.time = real_time
+    return "Pass"
+
+def test_local_classifier():
+    """user-048 LocalClassifier: 학습한 표현은 맞히고, 처음 보는 표현은 확신도 0(LLM으로), 저장/로드 후 같은 예측"""
+    import tempfile
+    from app.services.local_classifier import LocalClassifier, SparseRows, featurize, fit_head, head_labels
+    n_features = 1 << 12
+    who = {"family_with_kids": ["아이랑 가족 여행", "아이와 함께 가족끼리", "유모차 끌고 가족 나들이"],
+           "couple": ["연인이랑 데이트", "커플 여행 데이트 코스", "둘이 연인 여행"],
+           "solo": ["혼자 여행", "나홀로 혼자 떠나는", "혼자 조용히 여행"]}
+    rows = [(f"{region} {text}", {"who": label, "when_info": {"season": "summer"} if i % 2 else {}})
+            for label, texts in who.items() for text in texts for i, region in enumerate(["부산", "제주", "강릉", "여수"])]
+    X = SparseRows([featurize(text, n_features) for text, _ in rows])
+    heads = {}
+    for head in ("who", "season"):
+        labels = [head_labels(label)[head] for _, label in rows]
+        classes = sorted(set(labels))
+        W, b = fit_head(X, np.array([classes.index(v) for v in labels]), len(classes), n_features=n_features, epochs=100)
+        heads[head] = (W, b, classes, 1.0)
+    assert heads["season"][2] == ["none", "summer"]
+    seen = np.zeros(n_features, dtype=bool)
+    seen[X.indices] = True
+    model = LocalClassifier(heads, {"heads": ["who", "season"], "n_features": n_features, "min_coverage": 0.6}, seen)
+    pred, confidence = model.predict("제주 연인이랑 데이트")
+    assert pred["who"] == "couple" and confidence > 0.5
+    assert model.predict("혼자 여행")[0]["who"] == "solo"
+    assert model.predict("qxz wvy 7788 ###")[1] == 0.0
+    path = os.path.join(tempfile.mkdtemp(), "local_classifier.npz")
+    model.save(path)
+    loaded = LocalClassifier.load(path)
+    assert np.array_equal(loaded.seen, seen) and loaded.heads["who"][2] == heads["who"][2]
+    for text in ("제주 연인이랑 데이트", "부산 아이랑 가족 여행", "qxz wvy 7788 ###"):
+        (p1, c1), (p2, c2) = model.predict(text), loaded.predict(text)
+        assert p1 == p2 and abs(c1 - c2) < 1e-2
+    return "Pass"
+
+def test_keyword_matcher():
+    """user-049 KeywordMatcher: first는 표 우선순위, earliest는 발화 위치, 같은 슬롯의 긴 적중 안 짧은 적중은 버림, 지역 사전"""
+    import tempfile
+    from app.services.keyword_matcher import KeywordMatcher, clipped_aliases, load_region_gazetteer, match_keywords
+    matcher = KeywordMatcher({
+        "intent": [("recommend_place", ["추천"]), ("add_favorite", ["찜"]), ("show_favorites", ["찜 목록"])],
+        "budget": [("value", ["싼"]), ("luxury", ["비싼"])],
+        "region": [("부산", ["부산", "해운대"]), ("제주", ["제주"])],
+    })
+    hits = matcher.match("제주 말고 해운대 찜 목록에서 추천")
+    assert hits.first("region") == "부산" and hits.earliest("region") == "제주"
+    assert hits.values("region") == ["부산", "제주"]
+    assert hits.values("intent") == ["recommend_place", "show_favorites"]  # "찜 목록" 안의 "찜"은 버림
+    assert hits.earliest("intent") == "show_favorites"
+    assert matcher.match("너무 비싼 곳").values("budget") == ["luxury"]
+    assert matcher.match("싼 곳, 비싼 곳").values("budget") == ["value", "luxury"]
+    assert "budget" not in matcher.match("강릉") and matcher.match("강릉").first("region", "없음") == "없음"
+    path = os.path.join(tempfile.mkdtemp(), "place.csv")
+    pd.DataFrame([
+        {"ROAD_NM_ADDR": "부산 해운대구 우동", "LOTNO_ADDR": ""},
+        {"ROAD_NM_ADDR": "경남 진주시 망경동", "LOTNO_ADDR": "경상남도 진주시 망경동"},
+        {"ROAD_NM_ADDR": "서울 중구 명동", "LOTNO_ADDR": "부산광역시 중구 남포동"},
+        {"ROAD_NM_ADDR": "충남 예산군 예산읍", "LOTNO_ADDR": "주소 없음"},
+    ]).to_csv(path, index=False)
+    assert load_region_gazetteer(path) == [("부산", ["해운대구", "해운대"]), ("진주", ["진주시", "진주"]), ("예산", ["예산군"])]
+    assert load_region_gazetteer(path + ".missing") == []
+    assert clipped_aliases(load_region_gazetteer(path)) == {"해운대", "진주"}
+    # 접미사를 뗀 지명 약칭은 다른 단어의 앞부분이면 무시 ("고양이" ≠ 고양시)
+    assert match_keywords("고양이랑 갈 만한 곳").earliest("region") is None
+    assert match_keywords("고양에서 놀거리").earliest("region") == "고양"
+    assert match_keywords("고양시 카페").first("region") == "고양" and match_keywords("진주여행").first("region") == "진주"
+    assert match_keywords("해운대에서 바다 보기").first("region") == "부산"
+    hits = match_keywords("부산 비싼 호텔 예약")
+    assert hits.first("region") == "부산" and hits.values("budget") == ["luxury"] and hits.first("intent") == "recommend_accommodation"
+    return "Pass"
+
+def test_served_image_path():
+    """user-041 축소본 사전 생성과 /images 서빙이 같은 원본(images/ 우선)을 고름 → 같은 캐시 키"""
+    import tempfile
+    from app.services.image_paths import ImagePathIndex, region_photo_dir, resolve_served_image
+    root = tempfile.mkdtemp()
+    images_dir = os.path.join(root, "images")
+    region_dir = region_photo_dir(root, "수도권")
+    for folder, names in ((images_dir, ["both.jpg"]), (region_dir, ["both.jpg", "region.jpg"])):
+        os.makedirs(folder)
+        for name in names:
+            open(os.path.join(folder, name), "wb").close()
+    index = ImagePathIndex(images_dir, root, regions=["수도권"])
+    assert resolve_served_image(" both.jpg ", index) == os.path.join(images_dir, "both.jpg")
+    assert resolve_served_image("region.jpg", index) == os.path.join(region_dir, "region.jpg")
+    assert resolve_served_image("../both.jpg", index) is None and resolve_served_image("", index) is None
+    return "Pass"
+
 def main():
     results = {}
     for name, fn in [
@@ -98,14 +930,40 @@ def main():
         ("No 16 _gemini_error_reason", test_gemini_error_reason),
         ("No 18,19 _get_place_info", test_get_place_info),
         ("No 24 _resolve_image_path", test_resolve_image_path),
+        ("user-026 geo_index", test_geo_index),
+        ("user-027 facet_index AND/OR", test_facet_index),
+        ("user-028 검색 세션 TTL/LRU", test_search_session_store),
+        ("user-029 여러 장 검색 장수 제한", test_analyze_multi_limit),
+        ("user-030 장소 중심 인덱스 recall", test_place_centroid_index),
+        ("user-031 압축 인덱스 shortlist recall", test_compressed_index),
+        ("user-031 two_stage 압축 shortlist", test_two_stage_compressed_shortlist),
+        ("user-032 near_dup 묶음", test_near_dup_clusters),
+        ("user-033 장소 이웃 목록", test_place_knn),
+        ("user-033 비슷한 장소 추천", test_similar_places),
+        ("user-034 동시 방문 CSR top-k", test_covisit_index),
+        ("user-034 place.csv 변경 시 covisit.npz 재생성", test_covisit_source),
+        ("user-035 일정 2-opt/일자 분할", test_itinerary),
+        ("user-036 map_cluster 줌/limit", test_map_clusters),
+        ("user-037 장소 집계/ETag", test_place_stats),
+        ("user-041 서빙 원본 경로", test_served_image_path),
+        ("user-043 LLM 서킷 브레이커/토큰 버킷", test_llm_guard),
+        ("user-044 여행 스타일 모델 헤징", test_travel_style_hedging),
+        ("user-045 여행 스타일 테이블", test_travel_style_table),
+        ("user-046 분류 캐시 TTL/stale", test_classifier_cache),
+        ("user-047 의미 캐시", test_semantic_cache),
+        ("user-047 의미 캐시 키워드 충돌", test_semantic_hit_conflict),
+        ("user-048 로컬 분류기 저장/로드, 처음 보는 표현", test_local_classifier),
+        ("user-049 키워드 매처 우선순위/위치", test_keyword_matcher),
+        ("user-050 그래프 병렬 분기/합류", test_travel_graph_branches),
     ]:
         try:
             results[name] = fn()
         except Exception as e:
-            results[name] = f"Fail: {e}"
+            results[name] = f"Fail: {type(e).__name__} {e}"
     for k, v in results.items():
         print(f"{k}: {v}")
     return results
 
 if __name__ == "__main__":
-    main()
+    failed = [k for k, v in main().items() if str(v).startswith("Fail")]
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,116 @@
+"""
+로컬 여행 분류기 학습 — Gemini 분류 기록으로 문자 n-gram 로지스틱 회귀 학습 후 embedding_cache/local_classifier.npz 저장
+travel_classifier_llm_node는 이 모델의 확신도가 CLASSIFIER_LOCAL_THRESHOLD 이상이면 Gemini를 부르지 않습니다.
+
+학습 데이터 (app/services/local_classifier.py labeled_rows):
+- embedding_cache/classifier_cache.sqlite3의 classifier_log (서버가 LLM 분류 때마다 기록)
+- embedding_cache/semantic_eval_labels.json (scripts/eval_semantic_cache.py가 받은 LLM 분류)
+- LOCAL_CLASSIFIER_DATA: 추가 jsonl 파일 (쉼표 구분, 줄마다 {"message": ..., "label": {...}})
+- LOCAL_CLASSIFIER_MIN_COVERAGE: 처음 보는 표현 기준 (기본 0.6)
+
+80%로 학습·20% 홀드아웃으로 확신도 온도 보정과 임계값별 LLM 호출률/정확도를 본 뒤, 전체로 다시 학습해 저장합니다.
+실행: backend-fastapi 폴더에서  python scripts/train_local_classifier.py
+서버는 재시작 시 새 모델을 읽습니다.
+"""
+import os
+import random
+import sys
+import time
+
+# Windows 콘솔 한글 출력
+if sys.platform == "win32":
+    try:
+        sys.stdout.reconfigure(encoding="utf-8")
+    except Exception:
+        pass
+
+BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE)
+
+import numpy as np
+
+from app.services.local_classifier import (
+    HEADS,
+    N_FEATURES,
+    NGRAM_RANGE,
+    LocalClassifier,
+    SparseRows,
+    softmax,
+    default_model_path,
+    featurize,
+    fit_head,
+    fit_temperature,
+    head_labels,
+    labeled_rows,
+)
+
+MIN_SAMPLES = 30
+HOLDOUT = 0.2
+THRESHOLDS = [0.5, 0.6, 0.7, 0.8, 0.85, 0.9, 0.95]
+MIN_COVERAGE = float(os.environ.get("LOCAL_CLASSIFIER_MIN_COVERAGE", "0.6"))  # 발화 n-gram 중 학습 때 본 비율이 이보다 낮으면 LLM으로
+
+
+def main():
+    extra = [p.strip() for p in os.environ.get("LOCAL_CLASSIFIER_DATA", "").split(",") if p.strip()]
+    rows = labeled_rows(extra)
+    print(f"학습 데이터 {len(rows)}건")
+    if len(rows) < MIN_SAMPLES:
+        print(f"최소 {MIN_SAMPLES}건이 필요합니다. 서버를 Gemini 키와 함께 운영해 classifier_log를 쌓거나 LOCAL_CLASSIFIER_DATA를 지정하세요.")
+        return 1
+
+    random.Random(0).shuffle(rows)
+    X = SparseRows([featurize(text) for text, _ in rows])
+    labels = [head_labels(label) for _, label in rows]
+    n_hold = max(1, int(len(rows) * HOLDOUT))
+    hold, train = np.arange(n_hold), np.arange(n_hold, len(rows))
+    X_train, X_hold = X.take(train), X.take(hold)
+
+    t0 = time.perf_counter()
+    heads, accuracy, hold_probs, hold_correct = {}, {}, [], []
+    for head in HEADS:
+        classes = sorted({lab[head] for lab in labels})
+        y = np.array([classes.index(lab[head]) for lab in labels])
+        W, b = fit_head(X_train, y[train], len(classes))
+        logits = X_hold.dot(W, b)
+        temperature = fit_temperature(logits, y[hold])
+        probs = softmax(logits / temperature)
+        hold_probs.append(probs.max(axis=1))
+        hold_correct.append(probs.argmax(axis=1) == y[hold])
+        accuracy[head] = round(float(hold_correct[-1].mean()), 3)
+        W, b = fit_head(X, y, len(classes))  # 전체로 다시 학습 (온도는 홀드아웃 값 유지)
+        heads[head] = (W, b, classes, temperature)
+        print(f"  {head}: 클래스 {len(classes)}개, 홀드아웃 정확도 {accuracy[head]:.1%}, 온도 {temperature:.2f}")
+
+    # 처음 보는 표현 판별: 학습 데이터(홀드아웃 제외)에 나온 특징
+    seen_train = np.zeros(N_FEATURES, dtype=bool)
+    seen_train[X_train.indices] = True
+    coverage = np.array([seen_train[X_hold.indices[X_hold.indptr[r]:X_hold.indptr[r + 1]]].mean() for r in range(n_hold)])
+
+    # 확신도(항목별 최소) 임계값별: LLM으로 넘기는 비율, 로컬로 처리한 것 중 4개 항목 모두 맞은 비율
+    confidence = np.where(coverage >= MIN_COVERAGE, np.min(np.stack(hold_probs), axis=0), 0.0)
+    all_correct = np.all(np.stack(hold_correct), axis=0)
+    print(f"\n홀드아웃 {n_hold}건: {'임계값':>6} {'LLM 호출률':>10} {'로컬 정확도':>10}")
+    for t in THRESHOLDS:
+        accepted = confidence >= t
+        acc = all_correct[accepted].mean() if accepted.any() else float("nan")
+        print(f"{'':>14}{t:>6.2f} {1 - accepted.mean():>10.1%} {acc:>10.1%}")
+
+    meta = {
+        "heads": list(HEADS),
+        "n_features": N_FEATURES,
+        "ngram_range": list(NGRAM_RANGE),
+        "n_samples": len(rows),
+        "accuracy": accuracy,
+        "min_coverage": MIN_COVERAGE,
+        "trained_at": int(time.time()),
+    }
+    seen = np.zeros(N_FEATURES, dtype=bool)
+    seen[X.indices] = True
+    path = default_model_path()
+    LocalClassifier(heads, meta, seen).save(path)
+    print(f"\n[저장] {path} ({os.path.getsize(path) / 1024:.0f}KB), 학습 {time.perf_counter() - t0:.1f}초")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())